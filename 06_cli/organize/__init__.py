@@ -0,0 +1,32 @@
+"""
+organize
+
+Shared engine behind the 06_cli download organizers:
+    scan     (organize.scan)         lazy walk with destination pruning and filters
+    plan     (organize.engine)       file -> category through a Categorizer plugin
+    execute  (organize.execute)      rename / cross-device copy, parallel per-category queues
+    copy     (organize.fastcopy)     in-kernel cross-device copy, shared with Dpractice1
+
+Usage:
+    from organize import organize_folder
+    moved, processed = organize_folder(Path("~/Downloads").expanduser(), dest, workers=4)
+
+Custom categorizers subclass Categorizer and are registered with register_categorizer().
+"""
+
+from .categorizers import (DEFAULT_CATEGORIES, Categorizer, ExtensionCategorizer,
+                           available_categorizers, build_extension_map, create_categorizer,
+                           normalize_ext, register_categorizer)
+from .engine import organize_folder, plan
+from .execute import (METADATA_POLICIES, CategoryDispatcher, CategoryMover, ProgressReporter,
+                      claim_name, move_to, safe_move_file)
+from .scan import filter_extensions, list_files
+
+__all__ = [
+    "DEFAULT_CATEGORIES", "Categorizer", "ExtensionCategorizer", "available_categorizers",
+    "build_extension_map", "create_categorizer", "normalize_ext", "register_categorizer",
+    "organize_folder", "plan",
+    "METADATA_POLICIES", "CategoryDispatcher", "CategoryMover", "ProgressReporter",
+    "claim_name", "move_to", "safe_move_file",
+    "filter_extensions", "list_files",
+]
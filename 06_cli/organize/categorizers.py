@@ -0,0 +1,97 @@
+"""
+organize.categorizers
+
+Categorizer plugins: map a file to the name of its category folder.
+The engine only calls Categorizer.categorize(path, ext); new schemes (by size,
+by date, by content sniffing ...) subclass Categorizer and are registered by name.
+"""
+
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+# ----------------------------
+# 默认分类映射（可按需扩展）
+# ----------------------------
+DEFAULT_CATEGORIES: Dict[str, List[str]] = {
+    "pdf": ["pdf"],
+    "images": ["jpg", "jpeg", "png", "gif", "bmp", "webp", "tiff"],
+    "archives": ["zip", "tar", "gz", "tar.gz", "rar", "7z"],
+    "documents": ["doc", "docx", "xls", "xlsx", "ppt", "pptx", "txt", "md"],
+    "videos": ["mp4", "avi", "mkv", "mov", "wmv"],
+    "audio": ["mp3", "wav", "flac", "aac"],
+    "code": ["py", "js", "java", "c", "cpp", "go", "rs", "sh"],
+    "installers": ["exe", "msi", "deb", "rpm"],
+    # 未匹配的放到 "others"
+}
+
+def normalize_ext(ext: str) -> str:
+    return ext.lower().lstrip(".")
+
+def build_extension_map(categories: Dict[str, List[str]]) -> Dict[str, str]:
+    """Build a reverse map ext -> category for quick lookup (keys may be multi-dot, e.g. "tar.gz")."""
+    ext_map: Dict[str, str] = {}
+    for cat, exts in categories.items():
+        for ext in exts:
+            ext_map[normalize_ext(ext)] = cat
+    return ext_map
+
+class Categorizer(ABC):
+    """Base class for categorizer plugins."""
+
+    @abstractmethod
+    def categorize(self, path: Path, ext: str) -> str:
+        """
+        Return the category folder name for a file.
+        `ext` is the already normalized extension (lowercase, no dot, "" if none),
+        so plugins that only look at names need no extra string work per file.
+        """
+
+class ExtensionCategorizer(Categorizer):
+    """
+    Categorize by extension through a precomputed ext -> category table.
+    Multi-dot entries such as "tar.gz" are matched longest first (a.tar.gz: "tar.gz", then "gz"),
+    the same way Dpractice1's CategoryTable does; without them only `ext` is looked up.
+    """
+
+    def __init__(self, categories: Optional[Dict[str, List[str]]] = None,
+                 default: str = "others", noext: str = "noext"):
+        self.ext_map = build_extension_map(DEFAULT_CATEGORIES if categories is None else categories)
+        self.default = default
+        self.noext = noext
+        # most dot-separated parts of any configured extension ("tar.gz" -> 2)
+        self.max_parts = max((key.count(".") + 1 for key in self.ext_map), default=1)
+
+    def categorize(self, path: Path, ext: str) -> str:
+        if not ext:
+            return self.noext
+        if self.max_parts > 1:
+            # a leading dot belongs to a hidden name, not to the suffix (like Path.suffix)
+            parts = path.name.lstrip(".").lower().split(".")
+            for n in range(min(self.max_parts, len(parts) - 1), 1, -1):
+                category = self.ext_map.get(".".join(parts[-n:]))
+                if category is not None:
+                    return category
+        return self.ext_map.get(ext, self.default)
+
+# ----------------------------
+# 插件注册
+# ----------------------------
+_CATEGORIZERS: Dict[str, Callable[..., Categorizer]] = {
+    "extension": ExtensionCategorizer,
+}
+
+def register_categorizer(name: str, factory: Callable[..., Categorizer]) -> None:
+    """Register a categorizer factory (usually the class) under `name`."""
+    _CATEGORIZERS[name] = factory
+
+def available_categorizers() -> List[str]:
+    return sorted(_CATEGORIZERS)
+
+def create_categorizer(name: str, **options) -> Categorizer:
+    """Instantiate a registered categorizer; raises ValueError for unknown names."""
+    try:
+        factory = _CATEGORIZERS[name]
+    except KeyError:
+        raise ValueError(f"Unknown categorizer: {name} (available: {', '.join(available_categorizers())})")
+    return factory(**options)
@@ -0,0 +1,109 @@
+"""
+organize.engine
+
+scan -> plan -> execute:
+- plan() chains list_files -> filter_extensions -> top-N -> categorizer lazily,
+  so the walk stops as soon as N qualifying files have been found
+- organize_folder() feeds the plan to a CategoryMover (serial) or to a
+  CategoryDispatcher (N worker threads, one queue per category)
+"""
+
+import itertools
+import logging
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .categorizers import Categorizer, ExtensionCategorizer, normalize_ext
+from .execute import METADATA_POLICIES, CategoryDispatcher, CategoryMover, ProgressReporter
+from .scan import filter_extensions, list_files
+
+logger = logging.getLogger(__name__)
+
+def plan(
+    src: Path,
+    dest: Path,
+    categorizer: Categorizer,
+    recursive: bool = False,
+    only_exts: Optional[Iterable[str]] = None,
+    top_n: int = 0,
+    skipped: Optional[Counter] = None
+) -> Iterator[Tuple[Path, str]]:
+    """
+    Lazily yield (file, category) for every file to move.
+    src and dest must already be resolved; dest is pruned from the walk.
+    Per-stage skip counts are added to `skipped`.
+    """
+    if skipped is None:
+        skipped = Counter()
+    filter_exts = set(normalize_ext(e) for e in only_exts) if only_exts else None
+    # don't move files from the destination folder into itself if dest is inside src
+    files_iter = list_files(src, recursive, exclude=[dest], skipped=skipped)
+    candidates = filter_extensions(files_iter, filter_exts, skipped)
+    if top_n:
+        candidates = itertools.islice(candidates, top_n)
+    for file_path, ext in candidates:
+        yield file_path, categorizer.categorize(file_path, ext)
+
+# ----------------------------
+# 主功能：组织函数
+# ----------------------------
+def organize_folder(
+    src: Path,
+    dest: Path,
+    categories: Optional[Dict[str, List[str]]] = None,
+    recursive: bool = False,
+    dry_run: bool = False,
+    only_exts: List[str] = None,
+    top_n: int = 0,
+    workers: int = 0,
+    preserve_metadata: str = "cross-device",
+    progress_interval: float = 2.0,
+    categorizer: Optional[Categorizer] = None
+) -> Tuple[int, int]:
+    """
+    Organize files from src into dest.
+    Files are categorized by `categorizer`, or by extension using `categories`
+    (DEFAULT_CATEGORIES when both are None).
+    With workers > 0 moves run on that many threads (see CategoryDispatcher).
+    preserve_metadata selects the cross-device copy function (see METADATA_POLICIES).
+    Returns (moved_count, total_processed); only files passing the filters are processed.
+    """
+    if not src.exists() or not src.is_dir():
+        logger.error(f"Source folder does not exist or is not a directory: {src}")
+        return 0, 0
+
+    if categorizer is None:
+        categorizer = ExtensionCategorizer(categories)
+    copy_function = METADATA_POLICIES[preserve_metadata]
+
+    # resolve once; the walk then prunes dest (e.g. src/_sorted) at directory level
+    src = src.resolve()
+    dest = dest.resolve()
+
+    processed = 0
+    skipped: Counter = Counter()
+    progress = ProgressReporter(progress_interval, label="Would move" if dry_run else "Moved")
+    if workers > 0:
+        executor = CategoryDispatcher(dest, workers, dry_run, copy_function, progress)
+        submit = executor.submit
+    else:
+        executor = CategoryMover(dest, dry_run, copy_function, progress)
+        submit = executor.move
+
+    try:
+        for file_path, category in plan(src, dest, categorizer, recursive, only_exts, top_n, skipped):
+            processed += 1
+            submit(file_path, category)
+    except Exception as e:
+        logger.error(f"Failed while scanning files: {e}")
+    finally:
+        moved = executor.close() if workers > 0 else executor.moved
+
+    progress.finish()
+    if top_n and processed == top_n:
+        logger.info("Reached top_n limit, stopped scanning.")
+    logger.info(f"Processed: {processed} files. Moved: {moved} files. "
+                f"Skipped by extension filter: {skipped['extension']}. "
+                f"Pruned destination dirs: {skipped['pruned_dirs']}.")
+    return moved, processed
@@ -0,0 +1,182 @@
+"""
+organize.execute
+
+Moving files:
+- move_to: rename on the same filesystem; across devices copy with the run's
+  copy function (chosen once from METADATA_POLICIES, in-kernel via fastcopy) and remove the source
+- CategoryMover: one destination directory per category, created and listed once,
+  then free names ("name (k).ext") are assigned from an in-memory set
+- CategoryDispatcher: N worker threads, every category owned by exactly one of them
+- ProgressReporter: rate-limited progress instead of one log line per file
+"""
+
+import errno
+import functools
+import logging
+import os
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Optional, Set
+
+from .fastcopy import copy_file
+
+logger = logging.getLogger(__name__)
+
+# metadata policy -> copy function used for cross-device moves (chosen once per run);
+# a same-filesystem rename keeps timestamps and permissions by itself under both policies
+METADATA_POLICIES: Dict[str, Callable] = {
+    "cross-device": copy_file,                              # contents plus timestamps/permissions
+    "none": functools.partial(copy_file, metadata=False),   # contents only
+}
+
+def move_to(src: Path, target: Path, dry_run: bool = False,
+            copy_function: Callable = copy_file) -> None:
+    """
+    Move src to an already chosen, free target path:
+    rename on the same filesystem; across devices copy with copy_function
+    and then remove the source (a partial target is removed on failure).
+    """
+    logger.debug(f"Moving: {src} -> {target}")
+    if dry_run:
+        logger.info(f"[DRY-RUN] Would move: {src} -> {target}")
+        return
+    try:
+        os.rename(src, target)
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+        try:
+            copy_function(src, target)
+            os.unlink(src)
+        except BaseException:
+            Path(target).unlink(missing_ok=True)
+            raise
+
+def claim_name(src: Path, used: Set[str]) -> str:
+    """Pick a free name for src among `used` (name, name (1).ext, ...) and reserve it."""
+    name = src.name
+    counter = 1
+    while name in used:
+        name = f"{src.stem} ({counter}){src.suffix}"
+        counter += 1
+    used.add(name)
+    return name
+
+def safe_move_file(src: Path, dest_dir: Path, dry_run: bool = False,
+                   copy_function: Callable = copy_file) -> Path:
+    """
+    Move a single file into dest_dir without overwriting (name (1).ext, ...).
+    For many files use CategoryMover, which lists each directory only once.
+    Returns the final destination path (would be or was moved to).
+    """
+    dest_dir.mkdir(parents=True, exist_ok=True)
+    target = dest_dir / src.name
+    counter = 1
+    while target.exists():
+        target = dest_dir / f"{src.stem} ({counter}){src.suffix}"
+        counter += 1
+    move_to(src, target, dry_run=dry_run, copy_function=copy_function)
+    return target
+
+class ProgressReporter:
+    """Count finished moves; log at most once every `interval` seconds (thread-safe)."""
+
+    def __init__(self, interval: float = 2.0, label: str = "Moved"):
+        self.interval = interval
+        self.label = label
+        self.count = 0
+        self.start = time.monotonic()
+        self._next = self.start + interval
+        self._lock = threading.Lock()
+
+    def update(self, n: int = 1) -> None:
+        with self._lock:
+            self.count += n
+            now = time.monotonic()
+            if now < self._next:
+                return
+            self._next = now + self.interval
+            count = self.count
+        logger.info(f"{self.label} {count} files ({count / (now - self.start):.0f}/s)")
+
+    def finish(self) -> None:
+        logger.info(f"{self.label} {self.count} files in {time.monotonic() - self.start:.2f}s")
+
+class CategoryMover:
+    """
+    Move files into dest/<category>. Each category directory is created once and
+    listed once; later names are resolved in memory, with no exists() probing per file.
+    Not thread-safe: one mover per thread (CategoryDispatcher gives each category one owner).
+    """
+
+    def __init__(self, dest: Path, dry_run: bool = False, copy_function: Callable = copy_file,
+                 progress: Optional[ProgressReporter] = None):
+        self.dest = dest
+        self.dry_run = dry_run
+        self.copy_function = copy_function
+        self.progress = progress
+        self.used: Dict[str, Set[str]] = {}
+        self.moved = 0
+
+    def move(self, file_path: Path, category: str) -> Optional[Path]:
+        """Move one file; failures are logged and return None so the run continues."""
+        dest_dir = self.dest / category
+        try:
+            names = self.used.get(category)
+            if names is None:
+                if not self.dry_run:
+                    dest_dir.mkdir(parents=True, exist_ok=True)
+                names = set(os.listdir(dest_dir)) if dest_dir.is_dir() else set()
+                self.used[category] = names
+            target = dest_dir / claim_name(file_path, names)
+            move_to(file_path, target, dry_run=self.dry_run, copy_function=self.copy_function)
+        except Exception as e:
+            logger.warning(f"Failed to move {file_path}: {e}")
+            return None
+        self.moved += 1
+        if self.progress is not None:
+            self.progress.update()
+        return target
+
+class CategoryDispatcher:
+    """
+    Pipelined moves: the scanning thread submits (file, category) pairs,
+    `workers` threads move them. Every category is owned by exactly one worker queue
+    (and its CategoryMover), so concurrent moves never race on "name (k).ext".
+    """
+
+    def __init__(self, dest: Path, workers: int, dry_run: bool = False,
+                 copy_function: Callable = copy_file, progress: Optional[ProgressReporter] = None,
+                 queue_size: int = 1024):
+        self.queues = [queue.Queue(maxsize=queue_size) for _ in range(workers)]
+        self.movers = [CategoryMover(dest, dry_run, copy_function, progress) for _ in range(workers)]
+        self.owner: Dict[str, int] = {}
+        self.threads = [
+            threading.Thread(target=self._run, args=(i,), name=f"mover-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        for t in self.threads:
+            t.start()
+
+    def submit(self, file_path: Path, category: str) -> None:
+        # categories are assigned to queues round-robin in order of first appearance
+        i = self.owner.setdefault(category, len(self.owner) % len(self.queues))
+        self.queues[i].put((file_path, category))
+
+    def close(self) -> int:
+        """Wait for all queued moves; returns the number of files moved."""
+        for q in self.queues:
+            q.put(None)
+        for t in self.threads:
+            t.join()
+        return sum(m.moved for m in self.movers)
+
+    def _run(self, index: int) -> None:
+        q, mover = self.queues[index], self.movers[index]
+        while True:
+            item = q.get()
+            if item is None:
+                return
+            mover.move(*item)
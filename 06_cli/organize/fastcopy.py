@@ -0,0 +1,103 @@
+"""
+organize.fastcopy
+
+In-kernel file copy used for cross-device moves (instead of shutil.copy2).
+Shared with Dpractice1 (FileOrganizer / MoveExecutor), which imports it from here.
+Tries, in order:
+1. os.copy_file_range: copies inside the kernel; some filesystems share data blocks
+2. os.sendfile: copies inside the kernel, no Python buffer
+3. a readinto loop over one large reusable buffer: generic fallback
+Each fallback is taken only if the faster call fails before copying anything.
+Metadata is preserved like copy2 (optional) and the destination size is verified.
+No imports from the rest of the package, so it can be used standalone.
+"""
+
+import errno
+import logging
+import os
+import shutil
+
+logger = logging.getLogger(__name__)
+
+# max bytes per copy_file_range/sendfile call
+CHUNK_SIZE = 64 * 1024 * 1024
+# buffer size of the readinto fallback
+BUFFER_SIZE = 1 << 20
+
+# on these errors, before any data was copied, fall back to the next method
+_FALLBACK_ERRNOS = {
+    errno.ENOSYS, errno.EXDEV, errno.EINVAL, errno.EOPNOTSUPP,
+    errno.ENOTSUP, errno.EBADF, errno.EPERM, errno.ETXTBSY,
+}
+
+def _copy_file_range(infd: int, outfd: int, size: int) -> bool:
+    """Copy with copy_file_range; False if unsupported."""
+    if not hasattr(os, "copy_file_range"):
+        return False
+    copied = 0
+    while True:
+        try:
+            n = os.copy_file_range(infd, outfd, CHUNK_SIZE)
+        except OSError as e:
+            if copied == 0 and e.errno in _FALLBACK_ERRNOS:
+                return False
+            raise
+        if n == 0:
+            # some pseudo filesystems return 0 right away: treat as unsupported
+            return copied > 0 or size == 0
+        copied += n
+
+def _sendfile(infd: int, outfd: int, size: int) -> bool:
+    """Copy with sendfile; False if unsupported."""
+    if not hasattr(os, "sendfile"):
+        return False
+    copied = 0
+    while True:
+        try:
+            n = os.sendfile(outfd, infd, None, CHUNK_SIZE)
+        except OSError as e:
+            if copied == 0 and e.errno in _FALLBACK_ERRNOS:
+                return False
+            raise
+        if n == 0:
+            return copied > 0 or size == 0
+        copied += n
+
+def _readinto(fsrc, fdst) -> bool:
+    """Read/write loop over one reusable buffer."""
+    buf = bytearray(BUFFER_SIZE)
+    view = memoryview(buf)
+    while True:
+        n = fsrc.readinto(buf)
+        if not n:
+            return True
+        # an unbuffered FileIO.write may write only part of it: loop until n bytes are written
+        written = 0
+        while written < n:
+            written += fdst.write(view[written:n])
+
+def copy_file(src, dst, metadata: bool = True) -> str:
+    """
+    Copy file contents (and, like shutil.copy2, metadata); dst is a file path.
+    metadata=False copies contents only (like shutil.copyfile).
+    Returns dst. Raises OSError on failure or if the copied size differs from the source.
+    """
+    with open(src, "rb", buffering=0) as fsrc, open(dst, "wb", buffering=0) as fdst:
+        infd, outfd = fsrc.fileno(), fdst.fileno()
+        size = os.fstat(infd).st_size
+        if _copy_file_range(infd, outfd, size):
+            method = "copy_file_range"
+        elif _sendfile(infd, outfd, size):
+            method = "sendfile"
+        else:
+            _readinto(fsrc, fdst)
+            method = "readinto"
+
+    if metadata:
+        shutil.copystat(src, dst)
+
+    copied_size = os.stat(dst).st_size
+    if copied_size != size:
+        raise OSError(errno.EIO, f"Size mismatch after copy: {size} -> {copied_size}", str(dst))
+    logger.debug(f"Copied ({method}): {src} -> {dst}")
+    return str(dst)
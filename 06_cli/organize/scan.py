@@ -0,0 +1,56 @@
+"""
+organize.scan
+
+Lazy file discovery: list_files -> filter_extensions. Nothing is materialized,
+so a consumer that stops early (top-N) also stops the directory walk.
+"""
+
+import logging
+import os
+from collections import Counter
+from pathlib import Path
+from typing import Iterable, Iterator, Optional, Set, Tuple
+
+from .categorizers import normalize_ext
+
+logger = logging.getLogger(__name__)
+
+def list_files(src: Path, recursive: bool, exclude: Iterable[Path] = (),
+               skipped: Optional[Counter] = None) -> Iterator[Path]:
+    """
+    Yield files to process. Excludes directories.
+    Subtrees listed in `exclude` (resolved paths, e.g. the destination) are pruned
+    when the walk reaches them, so nothing below them is listed or checked per file;
+    they are counted in skipped["pruned_dirs"].
+    The walk is lazy: it stops as soon as the consumer stops pulling.
+    """
+    pruned = {os.fspath(p) for p in exclude}
+    stack = [os.fspath(src)]
+    while stack:
+        directory = stack.pop()
+        try:
+            it = os.scandir(directory)
+        except OSError as e:
+            # unreadable or vanished directory: skip it, keep walking the rest
+            logger.warning(f"Cannot list {directory}: {e}")
+            continue
+        with it:
+            for entry in it:
+                if entry.is_file():
+                    yield Path(entry.path)
+                elif recursive and entry.is_dir(follow_symlinks=False):
+                    if entry.path not in pruned:
+                        stack.append(entry.path)
+                    elif skipped is not None:
+                        skipped["pruned_dirs"] += 1
+
+def filter_extensions(files: Iterable[Path], only_exts: Optional[Set[str]],
+                      skipped: Counter) -> Iterator[Tuple[Path, str]]:
+    """Yield (file, normalized ext) for files passing the extension filter (None keeps all)."""
+    for file_path in files:
+        ext = normalize_ext(file_path.suffix)
+        if only_exts and ext not in only_exts:
+            skipped["extension"] += 1
+            logger.debug(f"Skipping (ext not in filter): {file_path}")
+            continue
+        yield file_path, ext
@@ -0,0 +1,22 @@
+# 06_cli/tests/conftest.py
+import sys
+from pathlib import Path
+
+import pytest
+
+# organize 包位于 06_cli 目录下
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+@pytest.fixture
+def make_files(tmp_path):
+    """按 {相对路径: 内容} 创建文件，返回根目录"""
+    def make(files, root="src"):
+        base = tmp_path / root
+        base.mkdir(exist_ok=True)
+        for rel, content in files.items():
+            path = base / rel
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(content if isinstance(content, bytes) else content.encode())
+        return base
+    return make
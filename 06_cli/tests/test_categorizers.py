@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+organize.categorizers：插件基类、扩展名分类、多段后缀
+"""
+from pathlib import Path
+
+import pytest
+
+from organize import (Categorizer, ExtensionCategorizer, available_categorizers,
+                      create_categorizer, normalize_ext, register_categorizer)
+
+
+def _categorize(categorizer, name):
+    path = Path(name)
+    return categorizer.categorize(path, normalize_ext(path.suffix))
+
+
+def test_base_class_is_abstract():
+    with pytest.raises(TypeError):
+        Categorizer()
+
+    class Incomplete(Categorizer):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+@pytest.mark.parametrize("name, expected", [
+    ("backup.tar.gz", "tarballs"),
+    ("BACKUP.TAR.GZ", "tarballs"),
+    ("log.gz", "gzip"),
+    ("log.2024.gz", "gzip"),
+    ("notes.final.txt", "text"),
+    (".hidden.tar.gz", "tarballs"),
+    (".tar.gz", "gzip"),           # 开头的点属于隐藏文件名
+    ("archive.tar", "others"),
+    ("README", "noext"),
+])
+def test_compound_suffixes(name, expected):
+    categorizer = ExtensionCategorizer({"tarballs": [".tar.gz"], "gzip": ["gz"], "text": ["TXT"]})
+    assert _categorize(categorizer, name) == expected
+
+
+def test_default_categories():
+    categorizer = ExtensionCategorizer()
+    assert _categorize(categorizer, "photo.JPG") == "images"
+    assert _categorize(categorizer, "src.tar.gz") == "archives"
+    assert _categorize(categorizer, "x.unknown") == "others"
+
+
+def test_register_custom_categorizer():
+    class BySize(Categorizer):
+        def __init__(self, limit=10):
+            self.limit = limit
+
+        def categorize(self, path, ext):
+            return "big" if len(path.name) > self.limit else "small"
+
+    register_categorizer("test-by-name-length", BySize)
+    categorizer = create_categorizer("test-by-name-length", limit=5)
+
+    assert "test-by-name-length" in available_categorizers()
+    assert _categorize(categorizer, "a.txt") == "small"
+    assert _categorize(categorizer, "longer.txt") == "big"
+
+
+def test_unknown_categorizer():
+    with pytest.raises(ValueError):
+        create_categorizer("no-such-thing")
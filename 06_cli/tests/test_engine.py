@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+organize.engine：plan / organize_folder
+"""
+import logging
+
+from organize import ExtensionCategorizer, organize_folder, plan
+
+
+def _tree(make_files):
+    return make_files({
+        "a.pdf": "1", "b.JPG": "2", "c.tar.gz": "3", "README": "4",
+        "sub/d.pdf": "5",
+        "_sorted/pdf/old.pdf": "6",
+    })
+
+
+def test_plan_is_lazy_and_prunes_dest(make_files):
+    src = _tree(make_files)
+    dest = src / "_sorted"
+    planned = dict(plan(src, dest, ExtensionCategorizer(), recursive=True))
+
+    assert {p.name: c for p, c in planned.items()} == {
+        "a.pdf": "pdf", "b.JPG": "images", "c.tar.gz": "archives", "README": "noext", "d.pdf": "pdf",
+    }
+
+
+def test_plan_top_n_and_filter(make_files):
+    src = _tree(make_files)
+    planned = list(plan(src, src / "_sorted", ExtensionCategorizer(), recursive=True,
+                        only_exts=[".PDF"], top_n=1))
+    assert len(planned) == 1
+    assert planned[0][1] == "pdf"
+
+
+def test_dry_run_dispatcher_moves_nothing(make_files, caplog):
+    src = _tree(make_files)
+    dest = src / "_sorted"
+    before = sorted(p.relative_to(src) for p in src.rglob("*"))
+
+    with caplog.at_level(logging.INFO, logger="organize"):
+        moved, processed = organize_folder(src, dest, recursive=True, dry_run=True, workers=2)
+
+    assert (moved, processed) == (5, 5)
+    assert sorted(p.relative_to(src) for p in src.rglob("*")) == before
+    messages = [r.getMessage() for r in caplog.records]
+    assert any(m.startswith("Would move 5 files") for m in messages)
+    assert not any(m.startswith("Moved ") for m in messages)
+
+
+def test_organize_folder_moves_by_category(make_files):
+    src = _tree(make_files)
+    dest = src / "_sorted"
+
+    moved, processed = organize_folder(src, dest, recursive=True, workers=2)
+
+    assert (moved, processed) == (5, 5)
+    assert sorted(p.name for p in (dest / "pdf").iterdir()) == ["a.pdf", "d.pdf", "old.pdf"]
+    assert (dest / "archives" / "c.tar.gz").exists()
+    assert (dest / "noext" / "README").exists()
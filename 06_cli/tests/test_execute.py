@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+organize.execute：重名处理、跨盘移动、按分类分派
+"""
+import errno
+import os
+
+import pytest
+
+from organize import CategoryDispatcher, CategoryMover, claim_name, move_to, safe_move_file
+
+
+def test_claim_name_suffixes(tmp_path):
+    used = {"a.txt", "a (1).txt"}
+    assert claim_name(tmp_path / "a.txt", used) == "a (2).txt"
+    assert claim_name(tmp_path / "a.txt", used) == "a (3).txt"
+    assert claim_name(tmp_path / "b.txt", used) == "b.txt"
+    assert {"a (2).txt", "a (3).txt", "b.txt"} <= used
+
+
+def test_safe_move_file_renames_on_collision(make_files, tmp_path):
+    src = make_files({"one/a.txt": "new"})
+    dest = tmp_path / "dest"
+    dest.mkdir()
+    (dest / "a.txt").write_text("old")
+
+    target = safe_move_file(src / "one" / "a.txt", dest)
+
+    assert target == dest / "a (1).txt"
+    assert target.read_text() == "new"
+    assert (dest / "a.txt").read_text() == "old"
+
+
+def test_mover_resolves_collisions_in_memory(make_files, tmp_path):
+    src = make_files({"x/a.pdf": "1", "y/a.pdf": "2", "z/a.pdf": "3"})
+    dest = tmp_path / "dest"
+    (dest / "pdf").mkdir(parents=True)
+    (dest / "pdf" / "a.pdf").write_text("existing")
+    mover = CategoryMover(dest)
+
+    targets = [mover.move(src / d / "a.pdf", "pdf").name for d in ("x", "y", "z")]
+
+    assert targets == ["a (1).pdf", "a (2).pdf", "a (3).pdf"]
+    assert mover.moved == 3
+    assert (dest / "pdf" / "a.pdf").read_text() == "existing"
+
+
+def test_move_to_cross_device_uses_copy_function(make_files, tmp_path, monkeypatch):
+    src = make_files({"a.txt": "data"})
+    copied = []
+
+    def rename(a, b):
+        raise OSError(errno.EXDEV, "cross-device")
+
+    def copy(a, b):
+        copied.append((a, b))
+        with open(a, "rb") as fa, open(b, "wb") as fb:
+            fb.write(fa.read())
+
+    monkeypatch.setattr(os, "rename", rename)
+    move_to(src / "a.txt", tmp_path / "b.txt", copy_function=copy)
+
+    assert copied and (tmp_path / "b.txt").read_text() == "data"
+    assert not (src / "a.txt").exists()
+
+
+def test_move_to_failed_copy_removes_partial_target(make_files, tmp_path, monkeypatch):
+    src = make_files({"a.txt": "data"})
+
+    def rename(a, b):
+        raise OSError(errno.EXDEV, "cross-device")
+
+    def copy(a, b):
+        open(b, "wb").write(b"da")
+        raise OSError(errno.ENOSPC, "disk full")
+
+    monkeypatch.setattr(os, "rename", rename)
+    with pytest.raises(OSError):
+        move_to(src / "a.txt", tmp_path / "b.txt", copy_function=copy)
+
+    assert (src / "a.txt").read_text() == "data"
+    assert not (tmp_path / "b.txt").exists()
+
+
+def test_move_to_dry_run(make_files, tmp_path):
+    src = make_files({"a.txt": "data"})
+    move_to(src / "a.txt", tmp_path / "b.txt", dry_run=True)
+    assert (src / "a.txt").exists() and not (tmp_path / "b.txt").exists()
+
+
+def test_dispatcher_dry_run(make_files, tmp_path):
+    """试运行：名字照常分配（同一分类内不重复），但不创建目录、不移动文件"""
+    src = make_files({f"d{i}/a.pdf": str(i) for i in range(4)} | {"b.jpg": "x"})
+    dest = tmp_path / "dest"
+    dispatcher = CategoryDispatcher(dest, workers=2, dry_run=True)
+    for i in range(4):
+        dispatcher.submit(src / f"d{i}" / "a.pdf", "pdf")
+    dispatcher.submit(src / "b.jpg", "images")
+
+    assert dispatcher.close() == 5
+    assert not dest.exists()
+    assert all((src / f"d{i}" / "a.pdf").exists() for i in range(4))
+    pdf_names = next(m.used["pdf"] for m in dispatcher.movers if "pdf" in m.used)
+    assert pdf_names == {"a.pdf", "a (1).pdf", "a (2).pdf", "a (3).pdf"}
+
+
+def test_dispatcher_moves_every_file_once(make_files, tmp_path):
+    files = {f"d{i}/f{i % 3}.txt": str(i) for i in range(30)}
+    src = make_files(files)
+    dest = tmp_path / "dest"
+    dispatcher = CategoryDispatcher(dest, workers=3)
+    for rel in files:
+        dispatcher.submit(src / rel, f"cat{int(rel[1:rel.index('/')]) % 4}")
+
+    assert dispatcher.close() == 30
+    moved = sorted(p.read_text() for p in dest.rglob("*.txt"))
+    assert moved == sorted(files.values())
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+organize.fastcopy：回退顺序、短写、大小校验
+"""
+import errno
+import logging
+import os
+
+import pytest
+
+from organize import fastcopy
+from organize.fastcopy import copy_file
+
+DATA = os.urandom(300_000)
+
+
+def _unsupported(*args, **kwargs):
+    raise OSError(errno.ENOSYS, "not supported")
+
+
+@pytest.fixture
+def src(tmp_path):
+    path = tmp_path / "src.bin"
+    path.write_bytes(DATA)
+    os.utime(path, ns=(1_000_000_000_000_000_000, 1_000_000_000_000_000_000))
+    return path
+
+
+def _method(caplog):
+    return [r.getMessage().split(")")[0] for r in caplog.records if r.getMessage().startswith("Copied")]
+
+
+def test_default_copies_contents_and_metadata(src, tmp_path):
+    dst = tmp_path / "dst.bin"
+    assert copy_file(src, dst) == str(dst)
+    assert dst.read_bytes() == DATA
+    assert dst.stat().st_mtime_ns == src.stat().st_mtime_ns
+
+
+def test_metadata_false_copies_contents_only(src, tmp_path):
+    dst = tmp_path / "dst.bin"
+    copy_file(src, dst, metadata=False)
+    assert dst.read_bytes() == DATA
+    assert dst.stat().st_mtime_ns != src.stat().st_mtime_ns
+
+
+@pytest.mark.skipif(not hasattr(os, "sendfile"), reason="sendfile 不可用")
+def test_falls_back_to_sendfile(src, tmp_path, monkeypatch, caplog):
+    monkeypatch.setattr(os, "copy_file_range", _unsupported, raising=False)
+    caplog.set_level(logging.DEBUG, logger=fastcopy.__name__)
+    dst = tmp_path / "dst.bin"
+    copy_file(src, dst)
+    assert dst.read_bytes() == DATA
+    assert _method(caplog) == ["Copied (sendfile"]
+
+
+def test_falls_back_to_readinto(src, tmp_path, monkeypatch, caplog):
+    monkeypatch.setattr(os, "copy_file_range", _unsupported, raising=False)
+    monkeypatch.setattr(os, "sendfile", _unsupported, raising=False)
+    monkeypatch.setattr(fastcopy, "BUFFER_SIZE", 4096)
+    caplog.set_level(logging.DEBUG, logger=fastcopy.__name__)
+    dst = tmp_path / "dst.bin"
+    copy_file(src, dst)
+    assert dst.read_bytes() == DATA
+    assert _method(caplog) == ["Copied (readinto"]
+
+
+def test_zero_return_on_first_call_means_unsupported(src, tmp_path, monkeypatch, caplog):
+    """copy_file_range 一开始就返回 0（伪文件系统）时换下一种方式，而不是得到空文件"""
+    monkeypatch.setattr(os, "copy_file_range", lambda *a: 0, raising=False)
+    monkeypatch.setattr(os, "sendfile", _unsupported, raising=False)
+    caplog.set_level(logging.DEBUG, logger=fastcopy.__name__)
+    dst = tmp_path / "dst.bin"
+    copy_file(src, dst)
+    assert dst.read_bytes() == DATA
+    assert _method(caplog) == ["Copied (readinto"]
+
+
+def test_error_after_partial_copy_is_raised(src, tmp_path, monkeypatch):
+    """已经复制了一部分数据后出错不能换方式重来（目标已写入一半），直接抛出"""
+    calls = []
+
+    def flaky(infd, outfd, count):
+        if calls:
+            raise OSError(errno.EINVAL, "boom")
+        calls.append(count)
+        return os.write(outfd, os.read(infd, 1000))
+
+    monkeypatch.setattr(os, "copy_file_range", flaky, raising=False)
+    with pytest.raises(OSError):
+        copy_file(src, tmp_path / "dst.bin")
+
+
+def test_readinto_handles_short_writes(tmp_path):
+    class ShortWriter:
+        def __init__(self):
+            self.data = bytearray()
+
+        def write(self, view):
+            chunk = bytes(view[:7])
+            self.data += chunk
+            return len(chunk)
+
+    with open(tmp_path / "x", "wb") as f:
+        f.write(DATA[:1000])
+    out = ShortWriter()
+    with open(tmp_path / "x", "rb", buffering=0) as fsrc:
+        fastcopy._readinto(fsrc, out)
+    assert bytes(out.data) == DATA[:1000]
+
+
+def test_size_mismatch_raises(src, tmp_path, monkeypatch):
+    def truncated(infd, outfd, size):
+        os.write(outfd, os.read(infd, size // 2))
+        return True
+
+    monkeypatch.setattr(fastcopy, "_copy_file_range", truncated)
+    with pytest.raises(OSError) as exc:
+        copy_file(src, tmp_path / "dst.bin")
+    assert exc.value.errno == errno.EIO
+
+
+def test_empty_file(tmp_path):
+    (tmp_path / "empty").write_bytes(b"")
+    copy_file(tmp_path / "empty", tmp_path / "copy")
+    assert (tmp_path / "copy").read_bytes() == b""
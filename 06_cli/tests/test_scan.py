@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+organize.scan：目标目录剪枝、扩展名过滤、无法列出的目录
+"""
+import os
+from collections import Counter
+
+from organize import filter_extensions, list_files
+
+
+def _names(paths):
+    return sorted(p.name for p in paths)
+
+
+def test_recursive_walk_prunes_dest(make_files):
+    src = make_files({"a.pdf": "", "sub/b.pdf": "", "_sorted/pdf/c.pdf": "", "_sorted/x/d.txt": ""})
+    skipped = Counter()
+
+    files = list_files(src, recursive=True, exclude=[src / "_sorted"], skipped=skipped)
+
+    assert _names(files) == ["a.pdf", "b.pdf"]
+    assert skipped["pruned_dirs"] == 1          # 只在入口处剪掉一次，不按文件计
+
+
+def test_non_recursive(make_files):
+    src = make_files({"a.pdf": "", "sub/b.pdf": ""})
+    assert _names(list_files(src, recursive=False)) == ["a.pdf"]
+
+
+def test_walk_is_lazy(make_files, monkeypatch):
+    src = make_files({"a.txt": "", "sub/b.txt": "", "sub/deep/c.txt": ""})
+    listed = []
+    real_scandir = os.scandir
+    monkeypatch.setattr(os, "scandir", lambda d: listed.append(d) or real_scandir(d))
+
+    first = next(iter(list_files(src, recursive=True)))
+
+    assert first.name == "a.txt"
+    assert listed == [os.fspath(src)]
+
+
+def test_unreadable_dir_is_skipped(make_files, monkeypatch, caplog):
+    src = make_files({"a.txt": "", "locked/b.txt": "", "open/c.txt": ""})
+    real_scandir = os.scandir
+
+    def scandir(directory):
+        if directory.endswith("locked"):
+            raise PermissionError(13, "Permission denied", directory)
+        return real_scandir(directory)
+
+    monkeypatch.setattr(os, "scandir", scandir)
+
+    assert _names(list_files(src, recursive=True)) == ["a.txt", "c.txt"]
+    assert any("Cannot list" in r.getMessage() for r in caplog.records)
+
+
+def test_filter_extensions(make_files):
+    src = make_files({"a.PDF": "", "b.txt": "", "c": "", "d.pdf": ""})
+    skipped = Counter()
+
+    kept = list(filter_extensions(sorted(list_files(src, False)), {"pdf"}, skipped))
+
+    assert [(p.name, ext) for p, ext in kept] == [("a.PDF", "pdf"), ("d.pdf", "pdf")]
+    assert skipped["extension"] == 2
+
+
+def test_no_filter_keeps_everything(make_files):
+    src = make_files({"a.PDF": "", "c": ""})
+    kept = list(filter_extensions(sorted(list_files(src, False)), None, Counter()))
+    assert [(p.name, ext) for p, ext in kept] == [("a.PDF", "pdf"), ("c", "")]
@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+整理器性能基准
+在临时目录中生成合成目录树（文件数、大小分布、重复比例、深度可配置），
+对 v001-v007 和 master 的各个整理模式分别计时，并统计：
+- 耗时、每秒处理文件数
+- 读取字节数（/proc/self/io 的 rchar，即哈希和复制时 read 的数据量；非 Linux 为 null）
+- stat / scandir / listdir 调用次数（运行期间替换 os 中对应函数计数，DirEntry.stat 也计入）
+结果写入 JSON，便于对比不同版本、发现性能回退
+
+用法：
+    python benchmark.py --files 5000 --dup-ratio 0.2 --versions v006 v007 master -o bench.json
+"""
+
+import argparse
+import datetime
+import importlib.util
+import json
+import logging
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional
+
+HERE = Path(__file__).resolve().parent
+
+VERSIONS = ["v001", "v002", "v003", "v004", "v005", "v006", "v007", "master"]
+
+# 操作名 -> 调用方式；版本没有对应方法时跳过
+OPERATIONS = {
+    "scan_files": lambda org: org.scan_files(),
+    "organize_by_category": lambda org: org.organize_by_category(dry_run=False),
+    "organize_by_date": lambda org: org.organize_by_date(dry_run=False),
+    "organize_by_size": lambda org: org.organize_by_size(dry_run=False),
+    "find_duplicates": lambda org: org.find_duplicates(),
+    "dedup": lambda org: org.dedup(mode="link"),
+}
+
+EXTENSIONS = [".pdf", ".txt", ".docx", ".jpg", ".png", ".mp4", ".mp3", ".zip", ".py", ".json",
+              ".epub", ".ttf", ".yaml", ".xyz", ""]
+
+# 大小分布：(最小字节, 最大字节)，在对数尺度上均匀取值
+SIZE_PROFILES = {
+    "small": (256, 64 * 1024),
+    "mixed": (256, 4 * 1024 * 1024),
+    "large": (1024 * 1024, 32 * 1024 * 1024),
+}
+
+logger = logging.getLogger("benchmark")
+
+
+# ---------- 合成目录树 ----------
+
+def generate_tree(root: Path, files: int, depth: int = 3, fanout: int = 4,
+                  sizes: str = "small", dup_ratio: float = 0.1, seed: int = 0) -> Dict[str, int]:
+    """
+    生成合成目录树
+    Args:
+        root: 根目录（需为空）
+        files: 文件数
+        depth: 目录深度
+        fanout: 每层子目录数
+        sizes: 大小分布（SIZE_PROFILES 的键）
+        dup_ratio: 重复文件（与之前某个文件内容相同）的比例
+        seed: 随机种子，相同参数生成相同的树
+    Returns:
+        {"files": 文件数, "bytes": 总字节数, "duplicates": 重复文件数, "dirs": 目录数}
+    """
+    rng = random.Random(seed)
+    low, high = SIZE_PROFILES[sizes]
+
+    dirs = [root]
+    level = [root]
+    for _ in range(depth):
+        level = [d / f"d{i}" for d in level for i in range(fanout)]
+        dirs.extend(level)
+    for d in dirs:
+        d.mkdir(parents=True, exist_ok=True)
+
+    total_bytes = 0
+    duplicates = 0
+    originals: List[Path] = []
+    # 复用一块随机数据，每个文件取不同的偏移并写入序号，避免生成大量随机数本身成为瓶颈
+    pool = rng.randbytes(high + 4096)
+    for n in range(files):
+        path = rng.choice(dirs) / f"f{n}{rng.choice(EXTENSIONS)}"
+        if originals and rng.random() < dup_ratio:
+            shutil.copyfile(rng.choice(originals), path)
+            duplicates += 1
+        else:
+            size = int(low * (high / low) ** rng.random())
+            offset = rng.randrange(0, 4096)
+            with open(path, "wb") as f:
+                f.write(n.to_bytes(8, "little"))
+                f.write(pool[offset:offset + max(0, size - 8)])
+            originals.append(path)
+        total_bytes += path.stat().st_size
+    return {"files": files, "bytes": total_bytes, "duplicates": duplicates, "dirs": len(dirs)}
+
+
+def clone_tree(src: Path, dst: Path) -> None:
+    """用硬链接复制目录树（整理只改目录项，不改内容，硬链接即可）"""
+    try:
+        shutil.copytree(src, dst, copy_function=os.link)
+    except OSError:
+        shutil.rmtree(dst, ignore_errors=True)
+        shutil.copytree(src, dst)
+
+
+# ---------- 计数 ----------
+
+def _read_rchar() -> Optional[int]:
+    try:
+        with open("/proc/self/io") as f:
+            for line in f:
+                if line.startswith("rchar:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+class _CountingEntry:
+    """DirEntry 代理：stat() 计数"""
+
+    __slots__ = ("_entry", "_counts")
+
+    def __init__(self, entry, counts):
+        self._entry = entry
+        self._counts = counts
+
+    def stat(self, *args, **kwargs):
+        self._counts["stat"] += 1
+        return self._entry.stat(*args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._entry, name)
+
+    def __fspath__(self):
+        return self._entry.path
+
+
+class _CountingScandir:
+    def __init__(self, it, counts):
+        self._it = it
+        self._counts = counts
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return _CountingEntry(next(self._it), self._counts)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._it.close()
+
+
+@contextmanager
+def count_syscalls():
+    """在 with 块内统计 os.stat / os.lstat / os.scandir / os.listdir 调用次数"""
+    counts = {"stat": 0, "scandir": 0, "listdir": 0}
+    real_stat, real_lstat = os.stat, os.lstat
+    real_scandir, real_listdir = os.scandir, os.listdir
+
+    def stat(*args, **kwargs):
+        counts["stat"] += 1
+        return real_stat(*args, **kwargs)
+
+    def lstat(*args, **kwargs):
+        counts["stat"] += 1
+        return real_lstat(*args, **kwargs)
+
+    def scandir(*args, **kwargs):
+        counts["scandir"] += 1
+        return _CountingScandir(real_scandir(*args, **kwargs), counts)
+
+    def listdir(*args, **kwargs):
+        counts["listdir"] += 1
+        return real_listdir(*args, **kwargs)
+
+    os.stat, os.lstat, os.scandir, os.listdir = stat, lstat, scandir, listdir
+    try:
+        yield counts
+    finally:
+        os.stat, os.lstat, os.scandir, os.listdir = real_stat, real_lstat, real_scandir, real_listdir
+
+
+# ---------- 运行 ----------
+
+def load_version(name: str):
+    """按文件加载某个版本的模块（各版本都叫 FileOrganizer，需分别加载）"""
+    spec = importlib.util.spec_from_file_location(f"bench_{name}", HERE / f"{name}.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def run_one(module, operation: str, template: Path, workdir: Path, tree_info: Dict) -> Optional[Dict]:
+    """在模板树的一份副本上运行一次操作"""
+    organizer_cls = module.FileOrganizer
+    if not hasattr(organizer_cls, operation):
+        return None
+
+    src, dst = workdir / "src", workdir / "out"
+    shutil.rmtree(workdir, ignore_errors=True)
+    workdir.mkdir(parents=True)
+    clone_tree(template, src)
+    dst.mkdir()
+
+    result = {"operation": operation, "error": None}
+    try:
+        organizer = organizer_cls(str(src), str(dst))
+        rchar = _read_rchar()
+        with count_syscalls() as counts:
+            start = time.perf_counter()
+            OPERATIONS[operation](organizer)
+            wall = time.perf_counter() - start
+        if hasattr(organizer, "close"):
+            organizer.close()
+    except Exception as e:  # 旧版本的缺陷也是结果的一部分
+        result["error"] = f"{type(e).__name__}: {e}"
+        return result
+
+    end_rchar = _read_rchar()
+    result.update({
+        "wall_s": round(wall, 4),
+        "files_per_s": round(tree_info["files"] / wall, 1) if wall > 0 else None,
+        "bytes_read": end_rchar - rchar if rchar is not None and end_rchar is not None else None,
+        "stat_calls": counts["stat"],
+        "scandir_calls": counts["scandir"],
+        "listdir_calls": counts["listdir"],
+    })
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="整理器性能基准")
+    parser.add_argument("--files", type=int, default=2000, help="文件数（默认 2000）")
+    parser.add_argument("--depth", type=int, default=3, help="目录深度（默认 3）")
+    parser.add_argument("--fanout", type=int, default=4, help="每层子目录数（默认 4）")
+    parser.add_argument("--sizes", choices=sorted(SIZE_PROFILES), default="small",
+                        help="文件大小分布（默认 small）")
+    parser.add_argument("--dup-ratio", type=float, default=0.1, help="重复文件比例（默认 0.1）")
+    parser.add_argument("--seed", type=int, default=0, help="随机种子")
+    parser.add_argument("--versions", nargs="+", default=VERSIONS, choices=VERSIONS,
+                        help="要测试的版本（默认全部）")
+    parser.add_argument("--ops", nargs="+", default=list(OPERATIONS), choices=list(OPERATIONS),
+                        help="要测试的操作（默认全部，版本不支持的自动跳过）")
+    parser.add_argument("--repeat", type=int, default=1, help="每项重复次数，取最快一次")
+    parser.add_argument("--tmpdir", help="生成目录树的位置（默认系统临时目录）")
+    parser.add_argument("-o", "--output", default="benchmark.json", help="结果 JSON 路径")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    sys.path.insert(0, str(HERE))
+
+    with tempfile.TemporaryDirectory(prefix="organizer-bench-", dir=args.tmpdir) as tmp:
+        template = Path(tmp) / "template"
+        logger.info(f"生成目录树：{args.files} 个文件，深度 {args.depth}，{args.sizes}，重复 {args.dup_ratio:.0%}")
+        tree_info = generate_tree(template, args.files, args.depth, args.fanout,
+                                  args.sizes, args.dup_ratio, args.seed)
+
+        results = []
+        for version in args.versions:
+            try:
+                module = load_version(version)
+            except Exception as e:  # 如 v007 依赖的 tqdm 未安装
+                logger.warning(f"{version}: 无法加载（{e}）")
+                results.append({"version": version, "error": f"{type(e).__name__}: {e}"})
+                continue
+            # 各版本在导入时配置了 INFO 日志，逐文件日志会严重影响计时
+            logging.disable(logging.INFO)
+            try:
+                for operation in args.ops:
+                    best = None
+                    for _ in range(args.repeat):
+                        result = run_one(module, operation, template, Path(tmp) / "work", tree_info)
+                        if result is None or result["error"]:
+                            best = result
+                            break
+                        if best is None or result["wall_s"] < best["wall_s"]:
+                            best = result
+                    if best is None:
+                        continue
+                    best["version"] = version
+                    results.append(best)
+            finally:
+                logging.disable(logging.NOTSET)
+            for r in results:
+                if r.get("version") == version and "operation" in r:
+                    status = r["error"] or (f"{r['wall_s']:.3f}s，{r['files_per_s']} 文件/s，"
+                                            f"stat {r['stat_calls']} 次")
+                    logger.info(f"{version:>7} {r['operation']:<22} {status}")
+
+    report = {
+        "meta": {
+            "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "params": {k: v for k, v in vars(args).items() if k not in ("output", "tmpdir")},
+            "tree": tree_info,
+        },
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    logger.info(f"结果已写入 {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+拍摄时间提取
+文件被复制后 mtime 变成复制时间，按 mtime 分日期会把整个相册归到同一天。
+这里只读取文件头部的元数据，不解码图像/视频：
+- JPEG：逐段跳过，只读 APP1(Exif) 段，取 DateTimeOriginal（其次 DateTimeDigitized / DateTime）
+- MP4 / MOV：按 box 头跳转（mdat 直接 seek 越过），只读 moov/mvhd 中的 creation_time
+结果以 (设备号, inode, 大小, mtime_ns) 为键存入 HashCache 的 metadata 表，重跑时不再打开文件
+"""
+
+import datetime
+import logging
+import os
+import struct
+from typing import Dict, Iterable, Optional
+
+from hash_cache import HashCache
+from hashing import map_bounded
+from scanner import FileRecord
+
+logger = logging.getLogger(__name__)
+
+JPEG_SUFFIXES = {".jpg", ".jpeg", ".jpe"}
+MP4_SUFFIXES = {".mp4", ".m4v", ".mov", ".3gp"}
+
+# 缓存中的键（格式变化时改版本号，旧缓存自动失效）
+CACHE_KEY = "capture_time:v1"
+
+# Exif 标签
+_TAG_DATETIME = 0x0132
+_TAG_EXIF_IFD = 0x8769
+_TAG_DATETIME_ORIGINAL = 0x9003
+_TAG_DATETIME_DIGITIZED = 0x9004
+
+# MP4 时间从 1904-01-01 UTC 起算
+_MP4_EPOCH_OFFSET = 2082844800
+# 最多检查的 box 数，防止畸形文件导致长时间跳转
+_MAX_BOXES = 256
+
+
+def _parse_exif_datetime(value: bytes) -> Optional[float]:
+    """'YYYY:MM:DD HH:MM:SS' -> 时间戳（Exif 时间不带时区，按本地时间解释，与 mtime 一致）"""
+    try:
+        text = value.split(b"\0", 1)[0].decode("ascii").strip()
+        return datetime.datetime.strptime(text, "%Y:%m:%d %H:%M:%S").timestamp()
+    except (UnicodeDecodeError, ValueError, OverflowError, OSError):
+        return None
+
+
+def _parse_tiff(tiff: bytes) -> Optional[float]:
+    """从 Exif 中的 TIFF 结构读取拍摄时间"""
+    if tiff[:2] == b"II":
+        order = "<"
+    elif tiff[:2] == b"MM":
+        order = ">"
+    else:
+        return None
+
+    def ifd_entries(offset: int) -> Dict[int, tuple]:
+        """读取一个 IFD：{标签: (数量, 值或偏移, 条目中值字段的位置)}"""
+        (count,) = struct.unpack_from(order + "H", tiff, offset)
+        entries = {}
+        for i in range(count):
+            pos = offset + 2 + 12 * i
+            tag, _type, n, value = struct.unpack_from(order + "HHII", tiff, pos)
+            entries[tag] = (n, value, pos + 8)
+        return entries
+
+    def ascii_value(entry: tuple) -> bytes:
+        n, value, pos = entry
+        start = pos if n <= 4 else value
+        return tiff[start:start + n]
+
+    (ifd0_offset,) = struct.unpack_from(order + "I", tiff, 4)
+    ifd0 = ifd_entries(ifd0_offset)
+    if _TAG_EXIF_IFD in ifd0:
+        exif = ifd_entries(ifd0[_TAG_EXIF_IFD][1])
+        for tag in (_TAG_DATETIME_ORIGINAL, _TAG_DATETIME_DIGITIZED):
+            if tag in exif:
+                result = _parse_exif_datetime(ascii_value(exif[tag]))
+                if result is not None:
+                    return result
+    if _TAG_DATETIME in ifd0:
+        return _parse_exif_datetime(ascii_value(ifd0[_TAG_DATETIME]))
+    return None
+
+
+def jpeg_capture_time(f) -> Optional[float]:
+    """读取 JPEG 的 Exif 拍摄时间（只读到 APP1 段为止）"""
+    if f.read(2) != b"\xff\xd8":
+        return None
+    while True:
+        byte = f.read(1)
+        if byte != b"\xff":
+            return None
+        marker = f.read(1)
+        while marker == b"\xff":     # 填充字节
+            marker = f.read(1)
+        if not marker:
+            return None
+        m = marker[0]
+        if m in (0xDA, 0xD9):        # 图像数据开始 / 结束：后面不会再有 Exif
+            return None
+        if 0xD0 <= m <= 0xD8 or m == 0x01:   # 没有长度字段的标记
+            continue
+        header = f.read(2)
+        if len(header) < 2:
+            return None
+        length = int.from_bytes(header, "big") - 2
+        if length < 0:               # 长度字段包含自身 2 字节，小于 2 说明文件已损坏
+            return None
+        if m == 0xE1:
+            data = f.read(length)
+            if data[:6] == b"Exif\0\0":
+                return _parse_tiff(data[6:])
+        else:
+            f.seek(length, os.SEEK_CUR)
+
+
+def _boxes(f, start: int, end: int):
+    """遍历 [start, end) 范围内的 box，产出 (类型, 内容起点, box 终点)"""
+    pos = start
+    for _ in range(_MAX_BOXES):
+        if pos + 8 > end:
+            return
+        f.seek(pos)
+        header = f.read(8)
+        if len(header) < 8:
+            return
+        size, box_type = struct.unpack(">I4s", header)
+        header_size = 8
+        if size == 1:
+            size = struct.unpack(">Q", f.read(8))[0]
+            header_size = 16
+        elif size == 0:              # 延伸到文件末尾
+            size = end - pos
+        if size < header_size:
+            return
+        yield box_type, pos + header_size, pos + size
+        pos += size
+
+
+def mp4_capture_time(f) -> Optional[float]:
+    """读取 MP4 / MOV 的 moov/mvhd 创建时间"""
+    file_size = os.fstat(f.fileno()).st_size
+    for box_type, start, end in _boxes(f, 0, file_size):
+        if box_type != b"moov":
+            continue
+        for inner_type, inner_start, _ in _boxes(f, start, end):
+            if inner_type != b"mvhd":
+                continue
+            f.seek(inner_start)
+            data = f.read(12)
+            if len(data) < 8:
+                return None
+            if data[0] == 1:
+                created = struct.unpack(">Q", data[4:12])[0]
+            else:
+                created = struct.unpack(">I", data[4:8])[0]
+            # 很多设备不写创建时间（为 0）
+            if created <= _MP4_EPOCH_OFFSET:
+                return None
+            return float(created - _MP4_EPOCH_OFFSET)
+        return None
+    return None
+
+
+def read_capture_time(path) -> Optional[float]:
+    """
+    读取单个文件的拍摄时间
+    Returns:
+        时间戳（秒）；不支持的格式或没有拍摄时间时返回 None
+    """
+    suffix = os.path.splitext(os.fspath(path))[1].lower()
+    if suffix in JPEG_SUFFIXES:
+        reader = jpeg_capture_time
+    elif suffix in MP4_SUFFIXES:
+        reader = mp4_capture_time
+    else:
+        return None
+    try:
+        with open(path, "rb") as f:
+            return reader(f)
+    except (OSError, struct.error, ValueError, IndexError) as e:
+        logger.debug(f"读取拍摄时间失败 {path}: {e}")
+        return None
+
+
+def supports(path) -> bool:
+    """是否为能提取拍摄时间的格式"""
+    suffix = os.path.splitext(os.fspath(path))[1].lower()
+    return suffix in JPEG_SUFFIXES or suffix in MP4_SUFFIXES
+
+
+class CaptureTimeExtractor:
+    """批量提取拍摄时间：先查缓存，未命中的交给线程池"""
+
+    def __init__(self, cache: Optional[HashCache] = None, jobs: int = 1):
+        """
+        初始化
+            Args:
+                cache: 哈希缓存（可选），结果存入其中的 metadata 表
+                jobs: 并行读取的线程数
+        """
+        self.cache = cache
+        self.jobs = max(1, jobs)
+        self.read = 0        # 本次实际打开读取的文件数
+        self.found = 0       # 得到拍摄时间的文件数
+
+    def extract(self, records: Iterable[FileRecord]) -> Dict[str, float]:
+        """
+        Args:
+            records: 文件记录（不支持的格式自动跳过）
+        Returns:
+            {文件路径: 拍摄时间戳}，只包含读到拍摄时间的文件
+        """
+        times: Dict[str, float] = {}
+        misses = []
+        for record in records:
+            if not supports(record.path):
+                continue
+            cached = self.cache.get_meta(record, CACHE_KEY) if self.cache else None
+            if cached is None:
+                misses.append(record)
+            elif cached:
+                # 空字符串表示上次已确认没有拍摄时间
+                times[record.path] = float(cached)
+
+        for record, value in map_bounded(lambda r: read_capture_time(r.path), misses, jobs=self.jobs):
+            self.read += 1
+            if self.cache is not None:
+                self.cache.put_meta(record, CACHE_KEY, "" if value is None else repr(value))
+            if value is not None:
+                times[record.path] = value
+
+        self.found = len(times)
+        return times
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+扩展名 -> 分类 查找表
+- 预先把分类配置编译成 {小写后缀: 分类} 字典，每个文件只做 O(1) 查找，
+  不再逐个分类遍历扩展名列表
+- 支持多段后缀（如 .tar.gz），按从长到短的顺序匹配
+- 可选：没有扩展名的文件读取前 16 字节，按文件头魔数推断类型
+"""
+
+import logging
+import os
+from typing import Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+# 内容嗅探读取的字节数
+SNIFF_BYTES = 16
+
+# (偏移, 魔数, 对应扩展名)；扩展名再经查找表映射到分类，自定义分类同样生效
+MAGIC_SIGNATURES = [
+    (0, b"%PDF-", ".pdf"),
+    (0, b"\x89PNG\r\n\x1a\n", ".png"),
+    (0, b"\xff\xd8\xff", ".jpg"),
+    (0, b"GIF87a", ".gif"),
+    (0, b"GIF89a", ".gif"),
+    (0, b"BM", ".bmp"),
+    (0, b"II*\x00", ".tiff"),
+    (0, b"MM\x00*", ".tiff"),
+    (0, b"PK\x03\x04", ".zip"),
+    (0, b"Rar!\x1a\x07", ".rar"),
+    (0, b"7z\xbc\xaf\x27\x1c", ".7z"),
+    (0, b"\x1f\x8b", ".gz"),
+    (0, b"BZh", ".bz2"),
+    (0, b"ID3", ".mp3"),
+    (0, b"fLaC", ".flac"),
+    (0, b"OggS", ".ogg"),
+    (0, b"\x1a\x45\xdf\xa3", ".mkv"),
+    (4, b"ftyp", ".mp4"),
+    (0, b"MZ", ".exe"),
+    (0, b"#!", ".sh"),
+    (0, b"wOFF", ".woff"),
+    (0, b"wOF2", ".woff2"),
+    (0, b"OTTO", ".otf"),
+    (0, b"\x00\x01\x00\x00\x00", ".ttf"),
+]
+
+# RIFF 容器：第 8-11 字节区分具体格式
+_RIFF_FORMATS = {b"WAVE": ".wav", b"AVI ": ".avi", b"WEBP": ".webp"}
+
+
+def normalize_suffix(ext: str) -> str:
+    """统一为带点的小写后缀：'TAR.GZ' / '.tar.gz' -> '.tar.gz'"""
+    return "." + ext.strip().lower().lstrip(".")
+
+
+def sniff_suffix(head: bytes) -> Optional[str]:
+    """
+    根据文件头推断扩展名
+    Args:
+        head: 文件开头的若干字节（至少 SNIFF_BYTES 个时最准确）
+    Returns:
+        推断出的扩展名，无法识别时返回 None
+    """
+    if head[:4] == b"RIFF":
+        return _RIFF_FORMATS.get(head[8:12])
+    for offset, magic, suffix in MAGIC_SIGNATURES:
+        if head[offset:offset + len(magic)] == magic:
+            return suffix
+    return None
+
+
+class CategoryTable:
+    """编译后的分类查找表"""
+
+    def __init__(self, categories: Dict[str, Iterable[str]], default: str = "其他文件",
+                 sniff: bool = False):
+        """
+        编译分类配置
+            Args:
+                categories: {分类名: [扩展名, ...]}，扩展名带不带点均可
+                default: 未匹配时返回的分类
+                sniff: 没有扩展名的文件是否读取文件头推断类型
+        """
+        self.default = default
+        self.sniff = sniff
+        self._table: Dict[str, str] = {}
+        for category, extensions in categories.items():
+            for ext in extensions:
+                # 同一扩展名出现在多个分类中时，与逐个遍历时一样以先出现的为准
+                self._table.setdefault(normalize_suffix(ext), category)
+        # 配置中最长的后缀有几段，决定每个文件最多尝试几次
+        self._max_parts = max((key.count(".") for key in self._table), default=1)
+
+    def __len__(self) -> int:
+        return len(self._table)
+
+    def match_name(self, name: str) -> Optional[str]:
+        """
+        只按文件名匹配，多段后缀优先（a.tar.gz 先查 .tar.gz 再查 .gz）
+        Returns:
+            分类名，未匹配时返回 None
+        """
+        # 开头的点属于隐藏文件名，不算后缀（与 Path.suffix 一致）
+        parts = name.lstrip(".").lower().split(".")
+        for n in range(min(self._max_parts, len(parts) - 1), 0, -1):
+            category = self._table.get("." + ".".join(parts[-n:]))
+            if category is not None:
+                return category
+        return None
+
+    def lookup(self, path) -> str:
+        """
+        获取文件分类
+        Args:
+            path: 文件路径（str 或 Path）
+        Returns:
+            分类名；无法匹配时返回 default
+        """
+        name = os.path.basename(path)
+        category = self.match_name(name)
+        if category is not None:
+            return category
+
+        if self.sniff and "." not in name.lstrip("."):
+            try:
+                with open(path, "rb") as f:
+                    head = f.read(SNIFF_BYTES)
+            except OSError as e:
+                logger.debug(f"无法读取文件头 {path}: {e}")
+                return self.default
+            suffix = sniff_suffix(head)
+            if suffix is not None:
+                return self._table.get(suffix, self.default)
+        return self.default
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+分级去重引擎
+1. 按文件大小分组，大小唯一的文件不可能重复，直接排除
+2. 同大小的候选只哈希首尾各 64 KB
+3. 部分哈希仍相同的才计算全量哈希
+两级哈希结果都可写入 HashCache，文件未变化时重跑不再读取；
+未命中缓存的文件可交给线程池并行哈希
+"""
+
+import logging
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from hash_cache import HashCache
+from hashing import hash_file, hash_head_tail, map_bounded, resolve_algorithm
+from scanner import FileRecord, restat
+
+logger = logging.getLogger(__name__)
+
+# 部分哈希读取的首/尾字节数
+PARTIAL_BYTES = 64 * 1024
+
+
+@dataclass
+class DedupStats:
+    """一次去重扫描的统计"""
+    files: int = 0            # 参与比较的文件数
+    candidates: int = 0       # 存在同大小文件的候选数
+    partial_hashed: int = 0   # 计算了部分哈希的文件数
+    full_hashed: int = 0      # 计算了全量哈希的文件数
+    cache_hits: int = 0       # 命中哈希缓存的次数
+    bytes_read: int = 0       # 实际读取的字节数
+    bytes_total: int = 0      # 全部文件的总字节数（全量哈希需要读取的量）
+    hash_seconds: float = 0.0  # 读文件计算哈希的耗时
+
+    @property
+    def throughput(self) -> float:
+        """哈希吞吐量（MB/s）"""
+        if self.hash_seconds <= 0:
+            return 0.0
+        return self.bytes_read / 1024 / 1024 / self.hash_seconds
+
+
+class DedupEngine:
+    """按 大小 -> 部分哈希 -> 全量哈希 逐级筛选重复文件"""
+
+    def __init__(self, algorithm: str = "sha256", partial_bytes: int = PARTIAL_BYTES,
+                 cache: Optional[HashCache] = None, jobs: int = 1, refresh: bool = False):
+        """
+        初始化去重引擎
+            Args:
+                algorithm: 算法名（见 hashing.available_algorithms，别名会被解析）
+                partial_bytes: 部分哈希读取的首/尾字节数
+                cache: 哈希缓存（可选）
+                jobs: 并行哈希的线程数，1 为顺序执行
+                refresh: 哈希前重新 stat 候选文件（记录来自增量快照、可能过时的情况）
+        """
+        self.algorithm = resolve_algorithm(algorithm)
+        self.partial_bytes = partial_bytes
+        self.cache = cache
+        self.jobs = max(1, jobs)
+        self.refresh = refresh
+        self.stats = DedupStats()
+
+    def find_groups(self, records: Iterable[FileRecord]) -> Dict[str, List[FileRecord]]:
+        """
+        查找重复文件组
+        Args:
+            records: 扫描得到的文件记录
+        Returns:
+            字典: {"算法:全量哈希": [文件记录列表]}，只包含两个及以上文件的组；
+            键中带算法名，不同算法的结果不会混在一起
+        """
+        self.stats = DedupStats()
+
+        # ---------- 第一级：按大小分组 ----------
+        by_size: Dict[int, List[FileRecord]] = defaultdict(list)
+        for record in records:
+            by_size[record.size].append(record)
+            self.stats.files += 1
+            self.stats.bytes_total += record.size
+
+        groups: Dict[str, List[FileRecord]] = {}
+        for size, same_size in by_size.items():
+            if len(same_size) < 2:
+                continue
+            if self.refresh:
+                # 大小已变化的文件本轮不参与比较（宁可漏判，不可误判）
+                same_size = [r for r in map(restat, same_size) if r and r.size == size]
+                if len(same_size) < 2:
+                    continue
+            self.stats.candidates += len(same_size)
+
+            # ---------- 第二级：首尾部分哈希 ----------
+            by_partial = self._bucket(same_size, self._partial_digest,
+                                      f"partial:{self.partial_bytes}")
+
+            for partial, bucket in by_partial.items():
+                if len(bucket) < 2:
+                    continue
+                # 小文件的部分哈希已覆盖全部内容，无需再算全量哈希
+                if size <= 2 * self.partial_bytes:
+                    groups[f"{self.algorithm}:{partial}"] = bucket
+                    continue
+
+                # ---------- 第三级：全量哈希 ----------
+                for full, dup in self._bucket(bucket, self._full_digest, "full").items():
+                    if len(dup) >= 2:
+                        groups[f"{self.algorithm}:{full}"] = dup
+
+        if self.cache is not None:
+            self.cache.flush()
+
+        logger.info(
+            f"去重扫描：{self.stats.files} 个文件，{self.stats.candidates} 个同大小候选，"
+            f"部分哈希 {self.stats.partial_hashed} 个，全量哈希 {self.stats.full_hashed} 个，"
+            f"缓存命中 {self.stats.cache_hits} 次，"
+            f"读取 {self.stats.bytes_read / 1024 / 1024:.1f}MB"
+            f"（全量哈希需 {self.stats.bytes_total / 1024 / 1024:.1f}MB），"
+            f"{self.jobs} 线程 {self.stats.throughput:.1f}MB/s，算法 {self.algorithm}"
+        )
+        return groups
+
+    def _bucket(self, records: List[FileRecord], digest_func,
+                kind: str) -> Dict[str, List[FileRecord]]:
+        """
+        按摘要分桶
+        先在主线程查缓存，未命中的交给线程池计算；同一 inode 的硬链接只读一次
+        """
+        seen: Dict[tuple, Optional[str]] = {}
+        misses: List[FileRecord] = []
+        for record in records:
+            key = (record.dev, record.inode)
+            if key in seen:
+                continue
+            seen[key] = self.cache.get(record, self.algorithm, kind) if self.cache else None
+            if seen[key]:
+                self.stats.cache_hits += 1
+            else:
+                misses.append(record)
+
+        start = time.perf_counter()
+        for record, (digest, nbytes) in map_bounded(digest_func, misses, self.jobs):
+            self.stats.bytes_read += nbytes
+            if not digest:
+                continue
+            if kind == "full":
+                self.stats.full_hashed += 1
+            else:
+                self.stats.partial_hashed += 1
+            seen[(record.dev, record.inode)] = digest
+            if self.cache is not None:
+                self.cache.put(record, self.algorithm, digest, kind)
+        self.stats.hash_seconds += time.perf_counter() - start
+
+        buckets: Dict[str, List[FileRecord]] = defaultdict(list)
+        for record in records:
+            digest = seen[(record.dev, record.inode)]
+            if digest:
+                buckets[digest].append(record)
+        return buckets
+
+    def _partial_digest(self, record: FileRecord) -> Tuple[Optional[str], int]:
+        """哈希文件首尾各 partial_bytes 字节（在工作线程中执行）"""
+        try:
+            return hash_head_tail(record.path, record.size, self.partial_bytes, self.algorithm)
+        except OSError as e:
+            logger.error(f"计算部分哈希失败 {record.path}: {e}")
+            return None, 0
+
+    def _full_digest(self, record: FileRecord) -> Tuple[Optional[str], int]:
+        """哈希整个文件（在工作线程中执行）"""
+        try:
+            return hash_file(record.path, self.algorithm)
+        except OSError as e:
+            logger.error(f"计算哈希失败 {record.path}: {e}")
+            return None, 0
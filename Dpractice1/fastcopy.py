@@ -0,0 +1,13 @@
+#!/usr/bin/env python3
+"""
+零拷贝文件复制后端（copy_file_range -> sendfile -> readinto，见 organize.fastcopy）
+实现与 06_cli 的 organize 包共用，这里只保留原来的导入名 `from fastcopy import copy_file`
+"""
+
+import sys
+from pathlib import Path
+
+# organize.fastcopy 不依赖包内其他模块；追加在末尾，不遮挡本目录的同名模块
+sys.path.append(str(Path(__file__).resolve().parent.parent / "06_cli"))
+
+from organize.fastcopy import BUFFER_SIZE, CHUNK_SIZE, copy_file  # noqa: E402,F401
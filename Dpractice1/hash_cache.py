@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+持久化哈希缓存
+以 (设备号, inode, 大小, mtime_ns) 判断文件是否变化，未变化的文件直接复用上次的哈希，
+缓存存放在 SQLite 中，与 organizer.log 放在同一目录
+"""
+
+import logging
+import sqlite3
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from scanner import FileRecord
+
+logger = logging.getLogger(__name__)
+
+# 缓存文件名（以 . 开头，扫描时作为隐藏文件跳过）
+CACHE_FILENAME = ".organizer_cache.db"
+
+
+class HashCache:
+    """基于 SQLite 的文件哈希缓存"""
+
+    def __init__(self, db_path):
+        """
+        打开（或创建）缓存数据库
+            Args:
+                db_path: 数据库文件路径
+        """
+        self.db_path = Path(db_path)
+        self.hits = 0
+        self.misses = 0
+        self._pending: List[Tuple] = []
+        self._pending_chunks: List[Tuple] = []
+        self._pending_meta: List[Tuple] = []
+
+        self._conn = sqlite3.connect(str(self.db_path))
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        # 同一文件、同一算法、同一种摘要只保留一行，文件变化后直接覆盖旧值
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS hashes (
+                dev       INTEGER NOT NULL,
+                inode     INTEGER NOT NULL,
+                size      INTEGER NOT NULL,
+                mtime_ns  INTEGER NOT NULL,
+                algorithm TEXT    NOT NULL,
+                kind      TEXT    NOT NULL,
+                digest    TEXT    NOT NULL,
+                PRIMARY KEY (dev, inode, algorithm, kind)
+            )
+        """)
+        # 分块指纹（相似文件检测用），params 记录分块参数，参数不同不能混用
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS chunks (
+                dev          INTEGER NOT NULL,
+                inode        INTEGER NOT NULL,
+                size         INTEGER NOT NULL,
+                mtime_ns     INTEGER NOT NULL,
+                params       TEXT    NOT NULL,
+                fingerprints BLOB    NOT NULL,
+                PRIMARY KEY (dev, inode, params)
+            )
+        """)
+        # 从文件头读出的元数据（如拍摄时间），key 区分种类，空字符串表示"确认没有"
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS metadata (
+                dev      INTEGER NOT NULL,
+                inode    INTEGER NOT NULL,
+                size     INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                key      TEXT    NOT NULL,
+                value    TEXT    NOT NULL,
+                PRIMARY KEY (dev, inode, key)
+            )
+        """)
+        self._conn.commit()
+
+    def get(self, record: FileRecord, algorithm: str, kind: str = "full") -> Optional[str]:
+        """
+        查询缓存
+        Args:
+            record: 文件记录
+            algorithm: 哈希算法名
+            kind: 摘要类型，"full" 为全量哈希，部分哈希形如 "partial:65536"
+        Returns:
+            命中返回摘要；文件大小或修改时间变化、或没有记录时返回 None
+        """
+        row = self._conn.execute(
+            "SELECT size, mtime_ns, digest FROM hashes "
+            "WHERE dev = ? AND inode = ? AND algorithm = ? AND kind = ?",
+            (record.dev, record.inode, algorithm, kind),
+        ).fetchone()
+        if row and row[0] == record.size and row[1] == record.mtime_ns:
+            self.hits += 1
+            return row[2]
+        self.misses += 1
+        return None
+
+    def put(self, record: FileRecord, algorithm: str, digest: str, kind: str = "full") -> None:
+        """写入缓存（先暂存，flush 时批量提交）"""
+        self._pending.append(
+            (record.dev, record.inode, record.size, record.mtime_ns, algorithm, kind, digest)
+        )
+        if len(self._pending) >= 1000:
+            self.flush()
+
+    def get_chunks(self, record: FileRecord, params: str) -> Optional[bytes]:
+        """
+        查询分块指纹
+        Args:
+            record: 文件记录
+            params: 分块参数标识（见 similarity.Chunker.params）
+        Returns:
+            命中返回打包好的指纹；文件变化或没有记录时返回 None
+        """
+        row = self._conn.execute(
+            "SELECT size, mtime_ns, fingerprints FROM chunks "
+            "WHERE dev = ? AND inode = ? AND params = ?",
+            (record.dev, record.inode, params),
+        ).fetchone()
+        if row and row[0] == record.size and row[1] == record.mtime_ns:
+            self.hits += 1
+            return row[2]
+        self.misses += 1
+        return None
+
+    def put_chunks(self, record: FileRecord, params: str, fingerprints: bytes) -> None:
+        """写入分块指纹（先暂存，flush 时批量提交）"""
+        self._pending_chunks.append(
+            (record.dev, record.inode, record.size, record.mtime_ns, params, fingerprints)
+        )
+        # 每行可能有几十 KB，比哈希更早提交
+        if len(self._pending_chunks) >= 100:
+            self.flush()
+
+    def get_meta(self, record: FileRecord, key: str) -> Optional[str]:
+        """
+        查询元数据
+        Args:
+            record: 文件记录
+            key: 元数据种类（如 capture_time.CACHE_KEY）
+        Returns:
+            命中返回值；文件变化或没有记录时返回 None
+        """
+        row = self._conn.execute(
+            "SELECT size, mtime_ns, value FROM metadata "
+            "WHERE dev = ? AND inode = ? AND key = ?",
+            (record.dev, record.inode, key),
+        ).fetchone()
+        if row and row[0] == record.size and row[1] == record.mtime_ns:
+            self.hits += 1
+            return row[2]
+        self.misses += 1
+        return None
+
+    def put_meta(self, record: FileRecord, key: str, value: str) -> None:
+        """写入元数据（先暂存，flush 时批量提交）"""
+        self._pending_meta.append(
+            (record.dev, record.inode, record.size, record.mtime_ns, key, value)
+        )
+        if len(self._pending_meta) >= 1000:
+            self.flush()
+
+    def flush(self) -> None:
+        """批量提交暂存的写入"""
+        if not self._pending and not self._pending_chunks and not self._pending_meta:
+            return
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO hashes "
+                "(dev, inode, size, mtime_ns, algorithm, kind, digest) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                self._pending,
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO chunks "
+                "(dev, inode, size, mtime_ns, params, fingerprints) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                self._pending_chunks,
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO metadata "
+                "(dev, inode, size, mtime_ns, key, value) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                self._pending_meta,
+            )
+        self._pending.clear()
+        self._pending_chunks.clear()
+        self._pending_meta.clear()
+
+    def close(self) -> None:
+        """提交并关闭数据库"""
+        self.flush()
+        self._conn.close()
+        logger.debug(f"哈希缓存命中 {self.hits} 次，未命中 {self.misses} 次")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
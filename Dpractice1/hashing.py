@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+文件哈希工具
+- 用可复用的大缓冲区 + readinto 读取，避免每块都分配新的 bytes
+- 提供有界线程池，hashlib 处理大缓冲区时会释放 GIL，多线程可以同时占满磁盘和 CPU
+- 可插拔的哈希算法注册表：除 hashlib 算法外，去重可选用更快的非加密摘要
+"""
+
+import hashlib
+import itertools
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Iterable, Iterator, List, Tuple, TypeVar
+
+try:
+    import xxhash  # 可选依赖：pip install xxhash
+except ImportError:
+    xxhash = None
+
+# 每个线程复用的读缓冲区大小
+BUFFER_SIZE = 1 << 20  # 1 MB
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+_local = threading.local()
+
+# 哈希算法注册表：名称 -> 无参工厂函数，返回带 update()/hexdigest() 的对象
+HASHERS: Dict[str, Callable[[], object]] = {
+    # 128 位 blake2b：标准库自带，比 sha256 快，用于去重足够
+    "blake2b-128": lambda: hashlib.blake2b(digest_size=16),
+}
+if xxhash is not None:
+    HASHERS["xxh3"] = xxhash.xxh3_128
+
+
+def register_hasher(name: str, factory: Callable[[], object]) -> None:
+    """注册自定义哈希算法"""
+    HASHERS[name] = factory
+
+
+def resolve_algorithm(name: str) -> str:
+    """
+    把别名解析为具体算法名（缓存和报告里记录的都是具体名）
+    "fast": 装了 xxhash 用 xxh3，否则退回 blake2b-128
+    """
+    if name == "fast":
+        return "xxh3" if "xxh3" in HASHERS else "blake2b-128"
+    return name
+
+
+def available_algorithms() -> List[str]:
+    """列出可用的算法名（含别名 fast）"""
+    return sorted({"fast", *HASHERS, *hashlib.algorithms_guaranteed})
+
+
+def new_hasher(algorithm: str):
+    """按名称创建哈希对象：先查注册表，再交给 hashlib"""
+    algorithm = resolve_algorithm(algorithm)
+    factory = HASHERS.get(algorithm)
+    if factory is not None:
+        return factory()
+    return hashlib.new(algorithm)
+
+
+def _get_buffer(size: int) -> bytearray:
+    """取当前线程的读缓冲区（按需创建，之后一直复用）"""
+    buf = getattr(_local, "buffer", None)
+    if buf is None or len(buf) < size:
+        buf = _local.buffer = bytearray(size)
+    return buf
+
+
+def hash_file(path, algorithm: str = "sha256", buffer_size: int = BUFFER_SIZE) -> Tuple[str, int]:
+    """
+    计算整个文件的哈希
+    Args:
+        path: 文件路径
+        algorithm: 算法名（注册表或 hashlib）
+        buffer_size: 每次读取的字节数
+    Returns:
+        (十六进制摘要, 读取字节数)；读取失败时抛出 OSError
+    """
+    h = new_hasher(algorithm)
+    view = memoryview(_get_buffer(buffer_size))[:buffer_size]
+    total = 0
+    with open(path, "rb", buffering=0) as f:
+        while True:
+            n = f.readinto(view)
+            if not n:
+                break
+            h.update(view[:n])
+            total += n
+    return h.hexdigest(), total
+
+
+def hash_head_tail(path, size: int, block: int, algorithm: str = "sha256") -> Tuple[str, int]:
+    """
+    只哈希文件首尾各 block 字节；文件不超过 2*block 时哈希全部内容
+    Returns:
+        (十六进制摘要, 读取字节数)；读取失败时抛出 OSError
+    """
+    if size <= 2 * block:
+        return hash_file(path, algorithm)
+
+    h = new_hasher(algorithm)
+    view = memoryview(_get_buffer(block))[:block]
+    total = 0
+    with open(path, "rb", buffering=0) as f:
+        for offset in (0, size - block):
+            f.seek(offset)
+            n = f.readinto(view)
+            h.update(view[:n])
+            total += n
+    return h.hexdigest(), total
+
+
+def map_bounded(func: Callable[[T], R], items: Iterable[T], jobs: int = 1,
+                window: int = 0) -> Iterator[Tuple[T, R]]:
+    """
+    在有界线程池中执行 func，按完成顺序产出 (item, 结果)
+    Args:
+        func: 处理单个元素的函数（应自行处理异常）
+        items: 待处理元素，可以是生成器
+        jobs: 线程数；<=1 时在当前线程顺序执行
+        window: 同时在途的任务上限，默认 jobs*4，避免一次提交数百万个任务
+    """
+    if jobs <= 1:
+        for item in items:
+            yield item, func(item)
+        return
+
+    window = window or jobs * 4
+    source = iter(items)
+    with ThreadPoolExecutor(max_workers=jobs, thread_name_prefix="hash") as pool:
+        pending = {pool.submit(func, item): item for item in itertools.islice(source, window)}
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield pending.pop(future), future.result()
+            for item in itertools.islice(source, len(done)):
+                pending[pool.submit(func, item)] = item
@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""
+移动日志（预写式）
+执行移动计划前先把整个计划写入日志并 fsync，执行过程中逐条追加完成记录，
+每 sync_every 条（或每 SYNC_INTERVAL 秒）fsync 一次，fsync 之后才把这一批操作报告为已完成。中途崩溃后：
+- resume：按日志继续未完成的计划，无需重新扫描
+- rollback：按日志把已移动的文件移回原处
+
+日志为 JSON Lines，每行一个数组：
+    ["begin", 版本, 源目录, 目标目录]
+    ["plan", 计划序号, 操作数, [新建目录, ...]]
+    ["op", 计划序号, 操作序号, 源路径, 目标路径, 分类, 大小, mtime_ns, inode, dev]
+    ["done", 计划序号, 操作序号]
+    ["end", 计划序号]
+    ["commit"] / ["rollback"]
+崩溃时最后一行可能只写了一半，读取时忽略
+"""
+
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from move_executor import MoveExecutor
+from move_plan import MoveOp, MovePlan
+from scanner import FileRecord
+
+logger = logging.getLogger(__name__)
+
+# 日志文件名（以 . 开头，扫描时作为隐藏文件跳过）
+JOURNAL_FILENAME = ".organizer_journal.jsonl"
+JOURNAL_VERSION = 1
+# 完成记录最多积攒多少秒就 fsync（跨盘复制大文件时一批可能很慢）
+SYNC_INTERVAL = 1.0
+
+
+@dataclass
+class JournalSegment:
+    """日志中的一个移动计划"""
+    seq: int
+    new_dirs: List[str] = field(default_factory=list)
+    ops: Dict[int, MoveOp] = field(default_factory=dict)
+    done: Set[int] = field(default_factory=set)
+    ended: bool = False
+
+
+@dataclass
+class JournalState:
+    """读取日志得到的运行状态"""
+    source: str = ""
+    target: str = ""
+    segments: Dict[int, JournalSegment] = field(default_factory=dict)
+    finished: bool = False   # 已提交或已回滚
+
+    @property
+    def complete(self) -> bool:
+        return self.finished or all(seg.ended for seg in self.segments.values())
+
+
+def read_journal(path) -> Optional[JournalState]:
+    """
+    读取日志
+    Args:
+        path: 日志文件路径
+    Returns:
+        JournalState；文件不存在时返回 None
+    """
+    state = JournalState()
+    try:
+        f = open(path, "r", encoding="utf-8")
+    except FileNotFoundError:
+        return None
+
+    with f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                # 崩溃时写了一半的最后一行
+                logger.debug(f"忽略无法解析的日志行: {line!r}")
+                continue
+            kind = entry[0]
+            if kind == "op":
+                _, seq, i, src, dst, label, *stat = entry
+                state.segments[seq].ops[i] = MoveOp(FileRecord(src, *stat), dst, label)
+            elif kind == "done":
+                state.segments[entry[1]].done.add(entry[2])
+            elif kind == "plan":
+                state.segments[entry[1]] = JournalSegment(entry[1], entry[3])
+            elif kind == "end":
+                state.segments[entry[1]].ended = True
+            elif kind == "begin":
+                state.source, state.target = entry[2], entry[3]
+            elif kind in ("commit", "rollback"):
+                state.finished = True
+    return state
+
+
+class MoveJournal:
+    """追加写入的移动日志"""
+
+    def __init__(self, path, sync_every: int = 1000):
+        """
+        打开日志（追加模式）
+            Args:
+                path: 日志文件路径
+                sync_every: 每追加多少条完成记录 fsync 一次
+        """
+        self.path = os.fspath(path)
+        self.sync_every = sync_every
+        self._file = open(self.path, "a", encoding="utf-8")
+        self._unsynced = 0
+        state = read_journal(self.path)
+        self._next_seq = max(state.segments, default=-1) + 1 if state else 0
+
+    @classmethod
+    def create(cls, path, source, target, sync_every: int = 1000) -> "MoveJournal":
+        """新建日志（覆盖已完成的旧日志）"""
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(json.dumps(["begin", JOURNAL_VERSION, os.fspath(source), os.fspath(target)],
+                               ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        return cls(path, sync_every)
+
+    def _write(self, entry: list) -> None:
+        self._file.write(json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n")
+
+    def sync(self) -> None:
+        """把缓冲区内容刷到磁盘"""
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+
+    def log_plan(self, plan: MovePlan) -> int:
+        """
+        执行前写入整个计划（写完后 fsync）
+        Returns:
+            计划序号
+        """
+        seq = self._next_seq
+        self._next_seq += 1
+        self._write(["plan", seq, len(plan.moves), plan.new_dirs])
+        for i, op in enumerate(plan.moves):
+            r = op.record
+            self._write(["op", seq, i, r.path, op.dst, op.label, r.size, r.mtime_ns, r.inode, r.dev])
+        self.sync()
+        return seq
+
+    def log_done(self, seq: int, i: int) -> None:
+        """记录一个已完成的操作（批量 fsync）"""
+        self._write(["done", seq, i])
+        self._unsynced += 1
+        if self._unsynced >= self.sync_every:
+            self.sync()
+
+    def log_end(self, seq: int) -> None:
+        """计划执行完毕"""
+        self._write(["end", seq])
+        self.sync()
+
+    def commit(self) -> None:
+        """整次运行结束"""
+        self._write(["commit"])
+        self.sync()
+
+    def close(self) -> None:
+        if not self._file.closed:
+            self.sync()
+            self._file.close()
+
+
+def run_journaled(executor: MoveExecutor, plan: MovePlan, journal: MoveJournal,
+                  seq: Optional[int] = None,
+                  index: Optional[Dict[str, int]] = None) -> Iterator[Tuple[MoveOp, Optional[Exception]]]:
+    """
+    执行计划并逐条记录完成情况
+    Args:
+        executor: 移动执行器
+        plan: 移动计划
+        journal: 日志
+        seq: 已写入日志的计划序号（None 表示先写入计划）
+        index: 目标路径 -> 日志中的操作序号（继续旧计划时使用）
+    Returns:
+        同 MoveExecutor.run；每个操作在其完成记录 fsync 之后才产出
+    """
+    if seq is None:
+        seq = journal.log_plan(plan)
+    if index is None:
+        index = {op.dst: i for i, op in enumerate(plan.moves)}
+    batch: List[Tuple[MoveOp, Optional[Exception]]] = []
+    last_sync = time.monotonic()
+    for op, error in executor.run(plan):
+        if error is None:
+            journal.log_done(seq, index[op.dst])
+        batch.append((op, error))
+        if len(batch) >= journal.sync_every or time.monotonic() - last_sync >= SYNC_INTERVAL:
+            journal.sync()
+            last_sync = time.monotonic()
+            finished, batch = batch, []
+            yield from finished
+    journal.sync()
+    yield from batch
+    journal.log_end(seq)
+
+
+def _exists(path: str) -> bool:
+    return os.path.lexists(path)
+
+
+def _is_partial_copy(op: MoveOp) -> bool:
+    """
+    源和目标同时存在时，目标是否为本操作跨盘复制到一半留下的文件
+    只有跨盘操作会先写目标再删源；目标必须比源小才可能是未写完的副本。
+    同盘 rename 不会留下两份，此时目标是别的文件（如用户之后放在这里的），不能删除
+    """
+    try:
+        dst_dir_dev = os.stat(os.path.dirname(op.dst)).st_dev
+        dst_st = os.stat(op.dst, follow_symlinks=False)
+    except OSError:
+        return False
+    if op.record.dev == dst_dir_dev:
+        return False
+    return (dst_st.st_dev, dst_st.st_ino) != (op.record.dev, op.record.inode) \
+        and dst_st.st_size < op.record.size
+
+
+def pending_plan(segment: JournalSegment) -> Tuple[MovePlan, Dict[str, int]]:
+    """
+    根据磁盘现状整理出计划中尚未完成的操作
+    - 源在、目标不在：需要执行
+    - 源不在、目标在：已完成（完成记录还没来得及 fsync）
+    - 两者都在：若是跨盘复制到一半（目标比源小），删除不完整的目标后重做；否则跳过并警告
+    Returns:
+        (剩余计划, 目标路径 -> 操作序号)
+    """
+    plan = MovePlan(new_dirs=[d for d in segment.new_dirs if not os.path.isdir(d)])
+    index: Dict[str, int] = {}
+    for i, op in sorted(segment.ops.items()):
+        if i in segment.done:
+            continue
+        src_exists, dst_exists = _exists(op.src), _exists(op.dst)
+        if not src_exists:
+            if not dst_exists:
+                logger.warning(f"源文件和目标文件都不存在，跳过: {op.src}")
+            continue
+        if dst_exists:
+            if not _is_partial_copy(op):
+                logger.warning(f"目标位置已有其他文件，跳过: {op.src} -> {op.dst}")
+                continue
+            logger.info(f"删除未完成的复制: {op.dst}")
+            os.unlink(op.dst)
+        plan.moves.append(op)
+        index[op.dst] = i
+    return plan, index
+
+
+def rollback(path, workers: int = 4, max_inflight_bytes: int = 1 << 30) -> int:
+    """
+    按日志撤销一次运行：从最后一个计划开始，把移动过的文件移回原处，并删除运行中新建、现已为空的目录
+    Args:
+        path: 日志文件路径
+        workers: 跨盘复制的线程数
+        max_inflight_bytes: 跨盘复制同时在途的字节数上限
+    Returns:
+        移回的文件数
+    """
+    state = read_journal(path)
+    if state is None:
+        raise FileNotFoundError(f"日志不存在: {path}")
+
+    restored = 0
+    for seq in sorted(state.segments, reverse=True):
+        segment = state.segments[seq]
+        plan = MovePlan()
+        parents: Set[str] = set()
+        for i, op in sorted(segment.ops.items()):
+            if not _exists(op.dst):
+                continue
+            if _exists(op.src):
+                if i not in segment.done and _is_partial_copy(op):
+                    # 跨盘复制到一半：源文件仍完整，删除目标即可
+                    os.unlink(op.dst)
+                else:
+                    logger.warning(f"原位置已有同名文件，跳过: {op.src}")
+                continue
+            try:
+                st = os.stat(op.dst, follow_symlinks=False)
+            except OSError as e:
+                logger.error(f"无法读取 {op.dst}: {e}")
+                continue
+            record = FileRecord(op.dst, st.st_size, st.st_mtime_ns, st.st_ino, st.st_dev)
+            plan.moves.append(MoveOp(record, op.src, op.label))
+            parents.add(os.path.dirname(op.src))
+        plan.new_dirs = sorted(d for d in parents if not os.path.isdir(d))
+
+        executor = MoveExecutor(workers=workers, max_inflight_bytes=max_inflight_bytes)
+        for op, error in executor.run(plan):
+            if error is not None:
+                logger.error(f"移回失败 {op.src}: {error}")
+                continue
+            restored += 1
+            logger.info(f"移回: {op.src} -> {op.dst}")
+
+        # 深的目录先删
+        for directory in sorted(segment.new_dirs, key=len, reverse=True):
+            try:
+                os.rmdir(directory)
+            except OSError:
+                pass
+
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(["rollback"]) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+    logger.info(f"回滚完成！共移回 {restored} 个文件")
+    return restored
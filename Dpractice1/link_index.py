@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+符号链接索引（文件索引 目录）增量同步
+1. 单次扫描已整理的目录，得到应当被索引的文件集合
+2. 列一次索引目录，读出现有链接指向的目标（按 realpath 比较，整理目录经符号链接访问时也能对上）
+3. 两边求差：只为缺失的文件建链接，删除目标已不存在的链接（扫描跳过了隐藏文件，
+   不在扫描结果里的目标要 stat 确认后才删除）；
+   重名在内存中的已占用名集合里解决，不再对每个链接反复 exists()
+"""
+
+import logging
+import os
+from dataclasses import dataclass
+from typing import Dict, List, Set, Tuple
+
+from scanner import scan_tree
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class LinkIndexStats:
+    """一次同步的统计"""
+    created: int = 0
+    pruned: int = 0
+    kept: int = 0
+    failed: int = 0
+
+
+def _read_index(links_dir: str) -> Tuple[Dict[str, str], Set[str]]:
+    """
+    列出索引目录
+    Returns:
+        ({链接路径: 目标的真实路径}, 已占用的文件名集合)
+    """
+    links: Dict[str, str] = {}
+    used: Set[str] = set()
+    # 目标所在目录 -> realpath（同一目录下的链接只解析一次）
+    real_dirs: Dict[str, str] = {}
+    try:
+        it = os.scandir(links_dir)
+    except FileNotFoundError:
+        return links, used
+    with it:
+        for entry in it:
+            used.add(entry.name)
+            if not entry.is_symlink():
+                continue
+            try:
+                target = os.readlink(entry.path)
+            except OSError:
+                continue
+            # 旧版本可能建过相对路径的链接
+            parent, name = os.path.split(os.path.normpath(os.path.join(links_dir, target)))
+            real_parent = real_dirs.get(parent)
+            if real_parent is None:
+                real_parent = real_dirs[parent] = os.path.realpath(parent)
+            links[entry.path] = os.path.join(real_parent, name)
+    return links, used
+
+
+def _free_name(name: str, used: Set[str], counters: Dict[str, int]) -> str:
+    """在已占用名集合中为 name 找一个空位（name_1.ext、name_2.ext ...）"""
+    if name not in used:
+        used.add(name)
+        return name
+    stem, suffix = os.path.splitext(name)
+    counter = counters.get(name, 1)
+    candidate = f"{stem}_{counter}{suffix}"
+    while candidate in used:
+        counter += 1
+        candidate = f"{stem}_{counter}{suffix}"
+    counters[name] = counter + 1
+    used.add(candidate)
+    return candidate
+
+
+def sync_link_index(organize_dir, links_dir, dry_run: bool = False) -> LinkIndexStats:
+    """
+    让 links_dir 中的符号链接与 organize_dir 中的文件一一对应
+    Args:
+        organize_dir: 已整理的目录
+        links_dir: 索引目录（可以位于 organize_dir 内，扫描时会跳过）
+        dry_run: 试运行，只统计不修改
+    Returns:
+        LinkIndexStats
+    """
+    # 统一为真实路径，与 _read_index 解析出的链接目标可以直接比较
+    organize_dir = os.path.realpath(organize_dir)
+    links_dir = os.path.realpath(links_dir)
+    stats = LinkIndexStats()
+
+    files = {record.path: record.name for record in scan_tree(organize_dir, exclude=[links_dir])}
+    links, used = _read_index(links_dir)
+
+    # ---------- 删除失效链接，记下仍然有效的 ----------
+    indexed: Set[str] = set()
+    for link, target in links.items():
+        # 大多数链接直接命中扫描结果；其余（隐藏文件、整理目录外的文件）stat 确认
+        if target in files or os.path.exists(target):
+            indexed.add(target)
+            stats.kept += 1
+            continue
+        if not dry_run:
+            try:
+                os.unlink(link)
+            except OSError as e:
+                logger.error(f"删除失效链接失败 {link}: {e}")
+                stats.failed += 1
+                continue
+        used.discard(os.path.basename(link))
+        stats.pruned += 1
+        logger.debug(f"删除失效链接: {link} -> {target}")
+
+    # ---------- 为缺失的文件建链接（名字全部在内存中分配） ----------
+    counters: Dict[str, int] = {}
+    todo: List[Tuple[str, str]] = [
+        (path, os.path.join(links_dir, _free_name(name, used, counters)))
+        for path, name in files.items() if path not in indexed
+    ]
+    if todo and not dry_run:
+        os.makedirs(links_dir, exist_ok=True)
+    for target, link in todo:
+        if not dry_run:
+            try:
+                os.symlink(target, link)
+            except OSError as e:
+                logger.error(f"创建符号链接失败 {target}: {e}")
+                stats.failed += 1
+                continue
+        stats.created += 1
+        logger.debug(f"创建符号链接: {link} -> {target}")
+    return stats
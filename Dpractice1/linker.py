@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+重复文件合并
+- hardlink：让重复文件指向同一个 inode
+- reflink：通过 FICLONE ioctl 共享数据块（btrfs / xfs 等），文件仍各自独立，修改互不影响
+- delete：直接删除
+硬链接和 reflink 都先建在临时名上，再用 os.replace 原子替换，任何时刻原路径都是完整文件
+"""
+
+import errno
+import logging
+import os
+import shutil
+import time
+from dataclasses import dataclass, field
+from typing import List, Sequence, Tuple
+
+from hashing import map_bounded
+from scanner import FileRecord
+
+logger = logging.getLogger(__name__)
+
+# <linux/fs.h>: #define FICLONE _IOW(0x94, 9, int)
+FICLONE = 0x40049409
+
+LINK_MODES = ("link", "reflink", "delete")
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+
+@dataclass
+class LinkReport:
+    """一次合并的统计"""
+    groups: int = 0
+    processed: int = 0        # 处理（或试运行中将处理）的重复文件数
+    skipped: int = 0          # 已经是同一个 inode 的文件
+    failed: int = 0
+    bytes_reclaimed: int = 0
+    seconds: float = 0.0
+    removed: List[FileRecord] = field(default_factory=list)   # delete 模式下实际删除的文件
+
+
+def reflink(src, dst) -> None:
+    """
+    用 FICLONE 把 src 的数据块共享给新文件 dst（dst 必须不存在）
+    Raises:
+        OSError: 文件系统不支持（EOPNOTSUPP / EXDEV / EINVAL 等）
+    """
+    if fcntl is None:
+        raise OSError(errno.EOPNOTSUPP, "当前平台不支持 reflink")
+    with open(src, "rb") as fsrc:
+        fd = os.open(dst, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        try:
+            fcntl.ioctl(fd, FICLONE, fsrc.fileno())
+        except BaseException:
+            os.close(fd)
+            os.unlink(dst)
+            raise
+        os.close(fd)
+
+
+def _temp_name(path: str) -> str:
+    """与目标同目录的临时名（同目录才能保证 os.replace 原子）"""
+    directory, name = os.path.split(path)
+    return os.path.join(directory, f".{name}.{os.getpid()}.dedup-tmp")
+
+
+def replace_with_link(victim: str, keeper: str, mode: str) -> None:
+    """
+    把 victim 替换为指向 keeper 的硬链接 / reflink，或直接删除
+    Args:
+        victim: 要替换的重复文件
+        keeper: 保留的文件
+        mode: link / reflink / delete
+    """
+    if mode == "delete":
+        os.unlink(victim)
+        return
+
+    tmp = _temp_name(victim)
+    if mode == "link":
+        os.link(keeper, tmp)
+    elif mode == "reflink":
+        reflink(keeper, tmp)
+        try:
+            # reflink 得到的是新文件，沿用被替换文件自己的权限和时间
+            shutil.copystat(victim, tmp)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+    else:
+        raise ValueError(f"未知的合并方式: {mode}")
+
+    try:
+        os.replace(tmp, victim)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def _link_group(args: Tuple[FileRecord, Sequence[FileRecord], str, bool]) -> LinkReport:
+    """处理一组重复文件（在工作线程中执行）"""
+    keeper, victims, mode, dry_run = args
+    report = LinkReport(groups=1)
+    for victim in victims:
+        if (victim.dev, victim.inode) == (keeper.dev, keeper.inode):
+            report.skipped += 1
+            continue
+        try:
+            # 还有其他硬链接时，删掉这一个名字并不释放数据块
+            nlink = os.stat(victim.path, follow_symlinks=False).st_nlink
+            if not dry_run:
+                replace_with_link(victim.path, keeper.path, mode)
+                logger.info(f"[{mode}] {victim.path} -> {keeper.path}")
+            else:
+                logger.info(f"[试运行] {mode} {victim.path} -> {keeper.path}")
+        except OSError as e:
+            report.failed += 1
+            logger.error(f"处理失败 {victim.path}: {e}")
+            continue
+        report.processed += 1
+        if mode == "delete" and not dry_run:
+            report.removed.append(victim)
+        if nlink == 1:
+            report.bytes_reclaimed += victim.size
+    return report
+
+
+def link_duplicates(groups: List[Tuple[FileRecord, Sequence[FileRecord]]], mode: str = "link",
+                    jobs: int = 1, dry_run: bool = False) -> LinkReport:
+    """
+    合并多组重复文件，各组在线程池中并行处理（不同组通常位于不同目录）
+    Args:
+        groups: [(保留的文件, [重复文件, ...]), ...]
+        mode: link / reflink / delete
+        jobs: 线程数
+        dry_run: 试运行，只统计不修改
+    Returns:
+        LinkReport
+    """
+    if mode not in LINK_MODES:
+        raise ValueError(f"未知的合并方式: {mode}")
+
+    total = LinkReport()
+    start = time.perf_counter()
+    tasks = [(keeper, victims, mode, dry_run) for keeper, victims in groups]
+    for _, report in map_bounded(_link_group, tasks, jobs=jobs):
+        total.groups += report.groups
+        total.processed += report.processed
+        total.skipped += report.skipped
+        total.failed += report.failed
+        total.bytes_reclaimed += report.bytes_reclaimed
+        total.removed.extend(report.removed)
+    total.seconds = time.perf_counter() - start
+    return total
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+扫描清单（列式存储）
+把一次运行中每个文件的 路径 / 大小 / 修改时间 / 分类 / 哈希 / 动作 按列保存，
+之后统计"哪些分类在增长""哪些目录大文件最多"时直接读清单，不必重新扫描磁盘
+- 安装了 pyarrow：写 Parquet（zstd 压缩，分类、动作等列用字典编码）
+- 否则安装了 NumPy：写 .npz（savez_compressed，字符串列存为定长 Unicode 数组）
+"""
+
+import logging
+import os
+from typing import Dict, List, Sequence
+
+from scanner import FileRecord
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+logger = logging.getLogger(__name__)
+
+COLUMNS = ("path", "size", "mtime_ns", "category", "hash", "action", "target")
+# 取值种类很少的列，Parquet 中用字典编码，npz 中存为 编码 + 取值表
+_DICTIONARY_COLUMNS = ("category", "action")
+
+
+class ScanManifest:
+    """按列累积一次运行的文件清单"""
+
+    def __init__(self, records: Sequence[FileRecord]):
+        """
+        Args:
+            records: 首次扫描得到的文件记录（每个文件一行）
+        """
+        self.path: List[str] = [r.path for r in records]
+        self.size: List[int] = [r.size for r in records]
+        self.mtime_ns: List[int] = [r.mtime_ns for r in records]
+        n = len(self.path)
+        self.category: List[str] = [""] * n
+        self.hash: List[str] = [""] * n
+        self.action: List[str] = [""] * n
+        self.target: List[str] = [""] * n
+        # 文件当前路径 -> 行号（文件移动后随之更新）
+        self._row: Dict[str, int] = {p: i for i, p in enumerate(self.path)}
+
+    def __len__(self) -> int:
+        return len(self.path)
+
+    def set(self, path: str, **fields: str) -> None:
+        """按文件当前路径设置 category / hash 等列"""
+        i = self._row.get(path)
+        if i is None:
+            return
+        for name, value in fields.items():
+            getattr(self, name)[i] = value
+
+    def moved(self, old: str, new: str) -> None:
+        """文件已移动（多种模式依次移动时保留最终位置）"""
+        i = self._row.pop(old, None)
+        if i is None:
+            return
+        self.action[i] = "move"
+        self.target[i] = new
+        self._row[new] = i
+
+    def deleted(self, path: str) -> None:
+        """文件已删除（重复文件）"""
+        i = self._row.pop(path, None)
+        if i is not None:
+            self.action[i] = "delete"
+
+    def columns(self) -> Dict[str, list]:
+        return {name: getattr(self, name) for name in COLUMNS}
+
+    def write(self, path) -> str:
+        """
+        写入清单
+        Args:
+            path: 输出路径；以 .npz 结尾时总是写 NumPy 格式
+        Returns:
+            实际写入的路径（使用 NumPy 格式时后缀改为 .npz）
+        Raises:
+            RuntimeError: pyarrow 和 NumPy 都没有安装
+        """
+        path = os.fspath(path)
+        if pa is not None and not path.endswith(".npz"):
+            _write_parquet(self.columns(), path)
+            return path
+        if np is not None:
+            path = os.path.splitext(path)[0] + ".npz"
+            _write_npz(self.columns(), path)
+            return path
+        raise RuntimeError("写清单需要安装 pyarrow 或 numpy")
+
+
+def _write_parquet(columns: Dict[str, list], path: str) -> None:
+    arrays = {}
+    for name, values in columns.items():
+        if name in ("size", "mtime_ns"):
+            arrays[name] = pa.array(values, type=pa.int64())
+        elif name in _DICTIONARY_COLUMNS:
+            arrays[name] = pa.array(values, type=pa.string()).dictionary_encode()
+        else:
+            arrays[name] = pa.array(values, type=pa.string())
+    pq.write_table(pa.table(arrays), path, compression="zstd")
+
+
+def _write_npz(columns: Dict[str, list], path: str) -> None:
+    arrays = {}
+    for name, values in columns.items():
+        if name in ("size", "mtime_ns"):
+            arrays[name] = np.asarray(values, dtype=np.int64)
+        elif name in _DICTIONARY_COLUMNS:
+            levels, codes = np.unique(np.asarray(values, dtype=str), return_inverse=True)
+            arrays[name] = codes.astype(np.int32)
+            arrays[f"{name}_levels"] = levels
+        else:
+            # 定长 Unicode 数组，无需 pickle 即可读回
+            arrays[name] = np.asarray(values, dtype=str)
+    np.savez_compressed(path, **arrays)
+
+
+def load_manifest(path) -> Dict[str, list]:
+    """
+    读取清单
+    Args:
+        path: .parquet 或 .npz 文件
+    Returns:
+        {列名: 值列表}
+    """
+    path = os.fspath(path)
+    if path.endswith(".npz"):
+        if np is None:
+            raise RuntimeError("读取 .npz 清单需要安装 numpy")
+        with np.load(path, allow_pickle=False) as data:
+            columns = {}
+            for name in COLUMNS:
+                if name in _DICTIONARY_COLUMNS:
+                    columns[name] = data[f"{name}_levels"][data[name]].tolist()
+                else:
+                    columns[name] = data[name].tolist()
+            return columns
+    if pq is None:
+        raise RuntimeError("读取 Parquet 清单需要安装 pyarrow")
+    return pq.read_table(path).to_pydict()
+
@@ -5,18 +5,33 @@
 """
 
 import os
-import shutil
 import sys
 import re
 import datetime
-import hashlib
 from pathlib import Path
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, List, Optional, Set, Tuple
 import argparse
 import json
 import logging
 from collections import defaultdict
 
+from capture_time import CaptureTimeExtractor
+from categories import CategoryTable
+from dedup_engine import DedupEngine
+from hash_cache import CACHE_FILENAME, HashCache
+from hashing import available_algorithms, hash_file, register_hasher, resolve_algorithm
+from journal import (JOURNAL_FILENAME, MoveJournal, pending_plan, read_journal, rollback,
+                     run_journaled)
+from link_index import sync_link_index
+from manifest import ScanManifest
+from move_executor import MoveExecutor
+from move_plan import MovePlan, MovePlanner
+from scanner import FileRecord, restat, scan_tree
+from size_histogram import SizeHistogram, bucket_labels, bucket_of
+from snapshot import SNAPSHOT_FILENAME, DirSnapshot
+from sweeper import DirTally
+from watcher import watch_loop
+
 # 设置日志
 logging.basicConfig(
     level=logging.INFO,
@@ -24,6 +39,9 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# 运行报告（大小分布、自适应分档边界等），写在目标目录下
+REPORT_FILENAME = ".organizer_report.json"
+
 
 class FileOrganizer:
     """文件整理器"""
@@ -42,13 +60,28 @@ class FileOrganizer:
         '电子书': ['.epub', '.mobi', '.azw3']
     }
 
-    def __init__(self, source_dir: str, target_dir: str = None):
+    # 注册自定义哈希算法：FileOrganizer.register_hasher("name", factory)
+    register_hasher = staticmethod(register_hasher)
+
+    def __init__(self, source_dir: str, target_dir: str = None, jobs: int = 1,
+                 hash_algorithm: str = "md5", move_workers: int = 4, max_inflight_mb: int = 1024,
+                 incremental: bool = False, sniff_content: bool = False, journal: bool = True,
+                 manifest_path: str = None, capture_time: bool = False):
         """
         初始化整理器
 
         Args:
             source_dir: 源目录路径
             target_dir: 目标目录路径（默认为源目录）
+            jobs: 并行哈希的线程数
+            hash_algorithm: 去重使用的哈希算法（如 md5 / blake2b-128 / xxh3 / fast）
+            move_workers: 跨盘复制的线程数
+            max_inflight_mb: 跨盘复制同时在途的数据量上限（MB）
+            incremental: 增量模式，只重新扫描 mtime 变化过的目录
+            sniff_content: 没有扩展名的文件读取文件头判断类型
+            journal: 记录移动日志（可用 --resume 继续、--rollback 撤销）
+            manifest_path: 运行结束时把文件清单（路径/大小/分类/哈希/动作）写成列式文件
+            capture_time: 按日期整理时优先使用照片/视频文件头中的拍摄时间
         """
         self.source_dir = Path(source_dir).expanduser().resolve()
         self.target_dir = Path(target_dir).expanduser().resolve() if target_dir else self.source_dir
@@ -60,7 +93,169 @@ class FileOrganizer:
             self.target_dir.mkdir(parents=True, exist_ok=True)
 
         self.categories = self.DEFAULT_CATEGORIES.copy()
+        # 扩展名 -> 分类 查找表，修改 categories 后需重新编译
+        self._category_table = CategoryTable(self.categories, sniff=sniff_content)
         self.duplicates = []
+        self.jobs = jobs
+        self.hash_algorithm = resolve_algorithm(hash_algorithm)
+        self.move_workers = move_workers
+        self.max_inflight_mb = max_inflight_mb
+        self.incremental = incremental
+        self.capture_time = capture_time
+
+        # 单次扫描结果及其待更新的位置变化（见 _scan / _relocate）
+        self._records: Optional[List[FileRecord]] = None
+        self._relocated: Dict[str, Optional[FileRecord]] = {}
+        # 扫描时记录的各目录子项数，随移动增减，清理空目录时直接使用
+        self._tally: Optional[DirTally] = None
+        # 扫描时顺带统计的文件大小分布（自适应分档用），与 _report 一起在 close() 时写出
+        self._histogram: Optional[SizeHistogram] = None
+        self._report: Dict = {}
+
+        # 持久化哈希缓存（存放在目标目录，首次用到时才打开）
+        self._cache: Optional[HashCache] = None
+        # 增量模式下本次扫描生成的目录快照，close() 时保存
+        self._snapshot: Optional[DirSnapshot] = None
+        # 复用快照、尚未重新 stat 的目录（见 _refresh_reused）
+        self._stale_dirs: Set[str] = set()
+        # 移动日志（存放在目标目录，第一次实际移动时才创建）
+        self.use_journal = journal
+        self._journal: Optional[MoveJournal] = None
+        # 列式文件清单（首次扫描时创建，close() 时写出）
+        self.manifest_path = manifest_path
+        self._manifest: Optional[ScanManifest] = None
+
+    def _get_cache(self) -> HashCache:
+        """懒加载哈希缓存"""
+        if self._cache is None:
+            self._cache = HashCache(self.target_dir / CACHE_FILENAME)
+        return self._cache
+
+    def _get_journal(self) -> Optional[MoveJournal]:
+        """懒创建移动日志；上次运行未完成时拒绝覆盖"""
+        if not self.use_journal:
+            return None
+        if self._journal is None:
+            path = self.target_dir / JOURNAL_FILENAME
+            state = read_journal(path)
+            if state is not None and not state.complete:
+                raise RuntimeError(f"上次运行未完成（{path}），请先使用 --resume 继续或 --rollback 撤销")
+            self._journal = MoveJournal.create(path, self.source_dir, self.target_dir)
+        return self._journal
+
+    def close(self):
+        """提交并关闭哈希缓存和移动日志，增量模式下保存目录快照，写出文件清单"""
+        if self._cache is not None:
+            self._cache.close()
+            self._cache = None
+        if self._journal is not None:
+            self._journal.commit()
+            self._journal.close()
+            self._journal = None
+        if self._snapshot is not None:
+            try:
+                self._snapshot.save(self.target_dir / SNAPSHOT_FILENAME)
+            except OSError as e:
+                logger.error(f"保存目录快照失败: {e}")
+            self._snapshot = None
+        if self._manifest is not None:
+            try:
+                written = self._manifest.write(self.manifest_path)
+                logger.info(f"文件清单已写入: {written}（{len(self._manifest)} 行）")
+            except (OSError, RuntimeError) as e:
+                logger.error(f"写入文件清单失败: {e}")
+            self._manifest = None
+        if self._report:
+            try:
+                with open(self.target_dir / REPORT_FILENAME, 'w', encoding='utf-8') as f:
+                    json.dump(self._report, f, ensure_ascii=False, indent=2)
+            except OSError as e:
+                logger.error(f"写入运行报告失败: {e}")
+            self._report = {}
+
+    def _scan(self) -> List[FileRecord]:
+        """
+        单次遍历源目录，同一次运行中的各整理模式共享扫描结果；
+        已移动或删除的文件在下次取用时更新，不再重新遍历
+        """
+        if self._records is None:
+            # 目标目录位于源目录内时整棵跳过（避免循环）
+            exclude = [self.target_dir] if self.target_dir != self.source_dir else []
+            self._histogram = SizeHistogram()
+            if self.incremental:
+                # 只重新列出 mtime 变化过的目录，其余复用上次的快照
+                previous = DirSnapshot.load(self.target_dir / SNAPSHOT_FILENAME, self.source_dir)
+                self._snapshot = DirSnapshot(self.source_dir)
+                self._records = list(self._histogram.observe(self._snapshot.scan(previous, exclude=exclude)))
+                self._tally = DirTally({directory: len(state.files) + len(state.subdirs)
+                                        for directory, state in self._snapshot.dirs.items()})
+                self._stale_dirs = set(self._snapshot.reused_dirs)
+                logger.info(f"增量扫描：复用 {self._snapshot.reused} 个目录，"
+                            f"重新扫描 {self._snapshot.rescanned} 个目录")
+            else:
+                counts: Dict[str, int] = {}
+                self._records = list(self._histogram.observe(
+                    scan_tree(self.source_dir, exclude=exclude, dir_counts=counts)))
+                self._tally = DirTally(counts)
+            logger.info(f"扫描完成，共找到 {len(self._records)} 个文件")
+            self._report["size_histogram"] = self._histogram.to_dict()
+            if self.manifest_path:
+                self._manifest = ScanManifest(self._records)
+        elif self._relocated:
+            self._records = [new for rec in self._records
+                             if (new := self._relocated.get(rec.path, rec)) is not None]
+            self._relocated.clear()
+        return self._records
+
+    def _refresh_reused(self) -> List[FileRecord]:
+        """
+        增量模式下复用快照的文件记录可能过时（原地改写不改变目录 mtime），
+        按修改时间/大小分类前重新 stat 这些文件：已不存在的剔除，大小有变化时重算大小分布。
+        同一次运行只刷新一次，之后返回的记录都是最新的
+        """
+        records = self._scan()
+        if not self._stale_dirs:
+            return records
+
+        fresh: List[FileRecord] = []
+        resized = False
+        for record in records:
+            if os.path.dirname(record.path) not in self._stale_dirs:
+                fresh.append(record)
+                continue
+            new = restat(record)
+            if new is None:
+                self._relocate(record, None)
+                continue
+            resized = resized or new.size != record.size
+            fresh.append(new)
+        logger.debug(f"重新 stat {len(self._stale_dirs)} 个复用目录中的文件")
+        self._stale_dirs.clear()
+
+        self._records = fresh
+        self._relocated.clear()
+        if resized and self._histogram is not None:
+            self._histogram = SizeHistogram()
+            for record in fresh:
+                self._histogram.add(record.size)
+            self._report["size_histogram"] = self._histogram.to_dict()
+        return fresh
+
+    def _relocate(self, record: FileRecord, new_path: Optional[Path]):
+        """记录文件的新位置；被删除或移出源目录的文件从扫描结果中剔除"""
+        if self._manifest is not None:
+            if new_path is None:
+                self._manifest.deleted(record.path)
+            else:
+                self._manifest.moved(record.path, str(new_path))
+        if self._tally is not None:
+            self._tally.remove_entry(record.path)
+            if new_path is not None:
+                self._tally.add_entry(str(new_path))
+        if new_path is None or self.target_dir != self.source_dir:
+            self._relocated[record.path] = None
+        else:
+            self._relocated[record.path] = record._replace(path=str(new_path))
 
     def load_custom_categories(self, config_file: str):
         """加载自定义分类配置"""
@@ -70,103 +265,156 @@ class FileOrganizer:
                 with open(config_path, 'r', encoding='utf-8') as f:
                     custom_categories = json.load(f)
                 self.categories.update(custom_categories)
+                self._category_table = CategoryTable(self.categories,
+                                                     sniff=self._category_table.sniff)
                 logger.info(f"已加载自定义分类配置: {config_file}")
             except Exception as e:
                 logger.error(f"加载配置文件失败: {e}")
 
     def get_file_category(self, file_path: Path) -> str:
-        """根据扩展名获取文件分类"""
-        suffix = file_path.suffix.lower()
-
-        for category, extensions in self.categories.items():
-            if suffix in extensions:
-                return category
-
-        # 未分类的文件
-        return '其他文件'
+        """根据扩展名获取文件分类（支持 .tar.gz 这类多段后缀）"""
+        return self._category_table.lookup(file_path)
 
     def get_file_hash(self, file_path: Path) -> str:
-        """计算文件的MD5哈希值"""
-        hash_md5 = hashlib.md5()
+        """计算文件的哈希值（算法由 hash_algorithm 指定，默认 MD5）"""
         try:
-            with open(file_path, 'rb') as f:
-                for chunk in iter(lambda: f.read(4096), b""):
-                    hash_md5.update(chunk)
-            return hash_md5.hexdigest()
+            return hash_file(file_path, self.hash_algorithm)[0]
         except Exception as e:
             logger.error(f"计算文件哈希失败 {file_path}: {e}")
             return ""
 
-    def organize_by_category(self, dry_run: bool = False, delete_duplicates: bool = False):
+    def _apply_plan(self, plan: MovePlan, dry_run: bool) -> int:
         """
-        按文件类型整理
+        执行移动计划并更新扫描结果
 
         Args:
-            dry_run: 试运行，不实际移动文件
-            delete_duplicates: 删除重复文件
-        """
-        logger.info(f"开始按类型整理文件: {self.source_dir}")
+            plan: 规划阶段生成的移动计划
+            dry_run: 试运行，只打印不移动
 
-        file_count = 0
-        duplicate_count = 0
+        Returns:
+            实际移动的文件数
+        """
+        if dry_run:
+            for op in plan.moves:
+                logger.info(f"[试运行] 将移动: {op.record.name} -> {op.label}/")
+                if self._manifest is not None:
+                    self._manifest.set(op.src, action="would-move", target=op.dst)
+            return 0
+
+        # 同盘直接 rename，跨盘交给线程池复制
+        executor = MoveExecutor(workers=self.move_workers,
+                                max_inflight_bytes=self.max_inflight_mb * 1024 * 1024)
+        # 先把整个计划写入日志，执行中逐条记录完成情况
+        journal = self._get_journal()
+        results = executor.run(plan) if journal is None else run_journaled(executor, plan, journal)
         moved_count = 0
-        hashes = {}
+        for op, error in results:
+            if error is not None:
+                logger.error(f"移动文件失败 {op.src}: {error}")
+                continue
+            self._relocate(op.record, Path(op.dst))
+            moved_count += 1
+            logger.info(f"移动文件: {op.record.name} -> {op.label}/")
+        return moved_count
 
-        # 遍历源目录
-        for item in self.source_dir.rglob('*'):
-            if item.is_file() and not item.name.startswith('.'):
-                file_count += 1
+    def resume(self) -> int:
+        """
+        按移动日志继续上次中断的整理（不重新扫描源目录）
 
-                # 跳过目标目录中的文件（避免循环）
-                if self.target_dir in item.parents:
+        Returns:
+            本次移动的文件数
+        """
+        path = self.target_dir / JOURNAL_FILENAME
+        state = read_journal(path)
+        if state is None or state.complete:
+            logger.info("没有需要继续的整理计划")
+            return 0
+
+        executor = MoveExecutor(workers=self.move_workers,
+                                max_inflight_bytes=self.max_inflight_mb * 1024 * 1024)
+        journal = MoveJournal(path)
+        moved_count = 0
+        try:
+            for seq in sorted(state.segments):
+                segment = state.segments[seq]
+                if segment.ended:
                     continue
-
-                # 计算文件哈希（用于去重）
-                file_hash = self.get_file_hash(item)
-
-                # 检查重复文件
-                if delete_duplicates and file_hash:
-                    if file_hash in hashes:
-                        duplicate_count += 1
-                        self.duplicates.append((item, hashes[file_hash]))
-                        if not dry_run:
-                            try:
-                                item.unlink()
-                                logger.info(f"删除重复文件: {item}")
-                            except Exception as e:
-                                logger.error(f"删除文件失败 {item}: {e}")
+                plan, index = pending_plan(segment)
+                logger.info(f"继续计划 #{seq}：剩余 {len(plan.moves)} / {len(segment.ops)} 个文件")
+                for op, error in run_journaled(executor, plan, journal, seq, index):
+                    if error is not None:
+                        logger.error(f"移动文件失败 {op.src}: {error}")
                         continue
-                    hashes[file_hash] = item
+                    moved_count += 1
+                    logger.info(f"移动文件: {op.record.name} -> {op.label}/")
+            journal.commit()
+        finally:
+            journal.close()
 
-                # 获取分类
-                category = self.get_file_category(item)
-                target_folder = self.target_dir / category
+        logger.info(f"继续整理完成！共移动 {moved_count} 个文件")
+        return moved_count
 
-                # 创建目标文件夹
-                if not target_folder.exists() and not dry_run:
-                    target_folder.mkdir(parents=True, exist_ok=True)
+    def organize_by_category(self, dry_run: bool = False, delete_duplicates: bool = False):
+        """
+        按文件类型整理
 
-                # 构建目标路径
-                target_path = target_folder / item.name
+        Args:
+            dry_run: 试运行，不实际移动文件
+            delete_duplicates: 删除重复文件
+        """
+        logger.info(f"开始按类型整理文件: {self.source_dir}")
 
-                # 处理文件名冲突
-                counter = 1
-                while target_path.exists():
-                    stem = item.stem
-                    suffix = item.suffix
-                    target_path = target_folder / f"{stem}_{counter}{suffix}"
-                    counter += 1
+        file_count = 0
+        duplicate_count = 0
 
-                # 移动文件
+        # 预先找出重复文件 {重复文件路径: 保留文件路径}，每组保留扫描顺序中的第一个
+        duplicate_of = {}
+        if delete_duplicates:
+            engine = DedupEngine(algorithm=self.hash_algorithm, cache=self._get_cache(),
+                                 jobs=self.jobs, refresh=self.incremental)
+            groups = engine.find_groups(self._scan())
+            for digest, (keeper, *rest) in groups.items():
+                for dup in rest:
+                    duplicate_of[dup.path] = keeper.path
+                if self._manifest is not None:
+                    for record in (keeper, *rest):
+                        self._manifest.set(record.path, hash=digest)
+
+        # 规划阶段：遍历扫描结果（目标目录已在扫描时跳过），重名在内存中解决
+        planner = MovePlanner()
+        for record in self._scan():
+            item = Path(record.path)
+            file_count += 1
+
+            # 检查重复文件
+            if record.path in duplicate_of:
+                duplicate_count += 1
+                self.duplicates.append((item, Path(duplicate_of[record.path])))
                 if not dry_run:
                     try:
-                        shutil.move(str(item), str(target_path))
-                        moved_count += 1
-                        logger.info(f"移动文件: {item.name} -> {category}/")
+                        item.unlink()
+                        self._relocate(record, None)
+                        logger.info(f"删除重复文件: {item}")
                     except Exception as e:
-                        logger.error(f"移动文件失败 {item}: {e}")
-                else:
-                    logger.info(f"[试运行] 将移动: {item.name} -> {category}/")
+                        logger.error(f"删除文件失败 {item}: {e}")
+                elif self._manifest is not None:
+                    self._manifest.set(record.path, action="would-delete")
+                continue
+
+            # 获取分类
+            category = self.get_file_category(item)
+            target_folder = self.target_dir / category
+            if self._manifest is not None:
+                self._manifest.set(record.path, category=category)
+
+            # 已在目标文件夹中的文件无需移动
+            if item.parent == target_folder:
+                continue
+
+            planner.add(record, target_folder, label=category)
+
+        # 执行阶段
+        moved_count = self._apply_plan(planner.plan, dry_run)
 
         logger.info(f"整理完成！共处理 {file_count} 个文件，移动 {moved_count} 个，发现 {duplicate_count} 个重复文件")
         return moved_count
@@ -181,128 +429,164 @@ class FileOrganizer:
         """
         logger.info(f"开始按日期整理文件: {self.source_dir}")
 
-        moved_count = 0
+        # 增量模式下复用的记录先重新 stat，原地改写过的文件按新的修改时间归档
+        records = self._refresh_reused()
+        # 拍摄时间只读文件头，结果按 inode + mtime 缓存；读不到的文件退回修改时间
+        taken: Dict[str, float] = {}
+        if self.capture_time:
+            extractor = CaptureTimeExtractor(cache=self._get_cache(), jobs=self.jobs)
+            taken = extractor.extract(records)
+            logger.info(f"读取到 {extractor.found} 个文件的拍摄时间（实际读取 {extractor.read} 个文件）")
 
-        for item in self.source_dir.rglob('*'):
-            if item.is_file() and not item.name.startswith('.'):
-                # 获取文件修改时间
-                mtime = item.stat().st_mtime
-                date_str = datetime.datetime.fromtimestamp(mtime).strftime(date_format)
+        planner = MovePlanner()
+        for record in records:
+            # 修改时间来自扫描时的 stat（复用快照的已在 _refresh_reused 中更新），无需再次调用
+            timestamp = taken.get(record.path, record.mtime)
+            date_str = datetime.datetime.fromtimestamp(timestamp).strftime(date_format)
 
-                # 创建日期文件夹
-                target_folder = self.target_dir / date_str
-                if not target_folder.exists() and not dry_run:
-                    target_folder.mkdir(parents=True, exist_ok=True)
+            # 日期文件夹
+            target_folder = self.target_dir / date_str
+            if Path(record.path).parent == target_folder:
+                continue
 
-                # 移动文件
-                target_path = target_folder / item.name
+            planner.add(record, target_folder, label=date_str)
 
-                # 处理文件名冲突
-                counter = 1
-                while target_path.exists():
-                    stem = item.stem
-                    suffix = item.suffix
-                    target_path = target_folder / f"{stem}_{counter}{suffix}"
-                    counter += 1
-
-                if not dry_run:
-                    try:
-                        shutil.move(str(item), str(target_path))
-                        moved_count += 1
-                        logger.info(f"移动文件: {item.name} -> {date_str}/")
-                    except Exception as e:
-                        logger.error(f"移动文件失败 {item}: {e}")
-                else:
-                    logger.info(f"[试运行] 将移动: {item.name} -> {date_str}/")
+        moved_count = self._apply_plan(planner.plan, dry_run)
 
         logger.info(f"按日期整理完成！共移动 {moved_count} 个文件")
         return moved_count
 
-    def organize_by_size(self, size_limits: List[int] = None, dry_run: bool = False):
+    def organize_by_size(self, size_limits: List[int] = None, dry_run: bool = False,
+                         buckets: int = 0):
         """
         按文件大小整理
 
         Args:
             size_limits: 大小阈值列表 [小文件上限, 中文件上限]，单位MB
             dry_run: 试运行
+            buckets: 大于 0 时忽略 size_limits，按扫描时统计的大小分布自动分成约 buckets 档，
+                     每档文件数大致相同
         """
         if size_limits is None:
             size_limits = [10, 100]  # 10MB以下为小文件，10-100MB为中文件，100MB以上为大文件
 
         logger.info(f"开始按大小整理文件: {self.source_dir}")
 
-        size_categories = ['小文件', '中文件', '大文件']
-        moved_count = 0
+        records = self._refresh_reused()
+        if buckets > 0:
+            histogram = self._histogram
+            if histogram is None:
+                # organize_batch 直接给出的记录没有经过扫描
+                histogram = SizeHistogram()
+                for record in records:
+                    histogram.add(record.size)
+            edges = histogram.edges(buckets)
+            size_categories = bucket_labels(edges)
+            self._report["size_buckets"] = {"edges": edges, "labels": size_categories}
+            logger.info(f"自适应分档边界: {', '.join(size_categories)}")
+        else:
+            edges = [size_limits[0] * 1024 * 1024, size_limits[1] * 1024 * 1024]
+            size_categories = ['小文件', '中文件', '大文件']
 
-        for item in self.source_dir.rglob('*'):
-            if item.is_file() and not item.name.startswith('.'):
-                size_mb = item.stat().st_size / (1024 * 1024)
-
-                # 确定分类
-                if size_mb <= size_limits[0]:
-                    category = size_categories[0]
-                elif size_mb <= size_limits[1]:
-                    category = size_categories[1]
-                else:
-                    category = size_categories[2]
-
-                # 创建目标文件夹
-                target_folder = self.target_dir / category
-                if not target_folder.exists() and not dry_run:
-                    target_folder.mkdir(parents=True, exist_ok=True)
-
-                # 移动文件
-                target_path = target_folder / item.name
-
-                # 处理文件名冲突
-                counter = 1
-                while target_path.exists():
-                    stem = item.stem
-                    suffix = item.suffix
-                    target_path = target_folder / f"{stem}_{counter}{suffix}"
-                    counter += 1
+        planner = MovePlanner()
+        for record in records:
+            # 确定分类（等于边界的文件归入较小的一档）
+            category = size_categories[bucket_of(record.size, edges)]
 
-                if not dry_run:
-                    try:
-                        shutil.move(str(item), str(target_path))
-                        moved_count += 1
-                        logger.info(f"移动文件: {item.name} ({size_mb:.1f}MB) -> {category}/")
-                    except Exception as e:
-                        logger.error(f"移动文件失败 {item}: {e}")
-                else:
-                    logger.info(f"[试运行] 将移动: {item.name} ({size_mb:.1f}MB) -> {category}/")
+            # 目标文件夹
+            target_folder = self.target_dir / category
+            if Path(record.path).parent == target_folder:
+                continue
+
+            planner.add(record, target_folder, label=category)
+
+        moved_count = self._apply_plan(planner.plan, dry_run)
 
         logger.info(f"按大小整理完成！共移动 {moved_count} 个文件")
         return moved_count
 
+    def organize_batch(self, records: List[FileRecord], mode: str = "type",
+                       date_format: str = "%Y-%m", size_limits: List[int] = None,
+                       dry_run: bool = False) -> List[str]:
+        """
+        对一批文件应用整理规则（不遍历源目录，供 watch 模式使用）
+
+        Args:
+            records: 待整理的文件记录
+            mode: 整理模式 type / date / size / all
+            date_format: 日期格式
+            size_limits: 大小阈值
+            dry_run: 试运行
+
+        Returns:
+            整理后仍位于源目录中的文件路径（目标目录与源目录相同时即移动后的新路径）
+        """
+        self._records = list(records)
+        self._relocated.clear()
+        self._tally = None
+        self._histogram = None
+
+        if mode in ('type', 'all'):
+            self.organize_by_category(dry_run=dry_run)
+        if mode in ('date', 'all'):
+            self.organize_by_date(date_format=date_format, dry_run=dry_run)
+        if mode in ('size', 'all'):
+            self.organize_by_size(size_limits=size_limits, dry_run=dry_run)
+
+        return [record.path for record in self._scan()]
+
+    def watch(self, mode: str = "type", date_format: str = "%Y-%m", size_limits: List[int] = None,
+              dry_run: bool = False, settle: float = 2.0, interval: float = 1.0,
+              use_inotify: bool = True):
+        """
+        持续监视源目录，新文件写完后立即按规则整理
+
+        Args:
+            mode: 整理模式 type / date / size / all
+            date_format: 日期格式
+            size_limits: 大小阈值
+            dry_run: 试运行
+            settle: 文件大小保持不变多少秒后才整理（避免移动写到一半的文件）
+            interval: 每轮等待事件的最长秒数
+            use_inotify: 优先使用 inotify（不可用时自动退回轮询）
+        """
+        exclude = [self.target_dir] if self.target_dir != self.source_dir else []
+
+        def handle_batch(batch: List[FileRecord]) -> List[str]:
+            logger.info(f"处理 {len(batch)} 个新文件")
+            return self.organize_batch(batch, mode=mode, date_format=date_format,
+                                       size_limits=size_limits, dry_run=dry_run)
+
+        watch_loop(self.source_dir, handle_batch, exclude=exclude, settle=settle,
+                   interval=interval, use_inotify=use_inotify)
+
     def clean_empty_folders(self, dry_run: bool = False):
-        """清理空文件夹"""
+        """清理空文件夹（只含隐藏文件的也算空），使用扫描时记录的目录子项数，不再遍历目录树"""
         logger.info("开始清理空文件夹...")
 
-        deleted_count = 0
-        for root, dirs, files in os.walk(self.source_dir, topdown=False):
-            for dir_name in dirs:
-                dir_path = Path(root) / dir_name
-                try:
-                    if not any(dir_path.iterdir()):  # 文件夹为空
-                        if not dry_run:
-                            dir_path.rmdir()
-                            logger.info(f"删除空文件夹: {dir_path}")
-                        else:
-                            logger.info(f"[试运行] 将删除空文件夹: {dir_path}")
-                        deleted_count += 1
-                except Exception as e:
-                    logger.error(f"删除文件夹失败 {dir_path}: {e}")
-
-        logger.info(f"清理完成！共删除 {deleted_count} 个空文件夹")
-        return deleted_count
-
-    def create_symlinks(self, organize_dir: str):
+        if self._tally is None:
+            # 尚未扫描，或扫描结果来自 watch 模式的单个批次
+            self._records = None
+            self._scan()
+
+        removed = self._tally.sweep(str(self.source_dir), dry_run=dry_run, jobs=self.jobs)
+        for directory in removed:
+            if dry_run:
+                logger.info(f"[试运行] 将删除空文件夹: {directory}")
+            else:
+                logger.info(f"删除空文件夹: {directory}")
+
+        logger.info(f"清理完成！共删除 {len(removed)} 个空文件夹")
+        return len(removed)
+
+    def create_symlinks(self, organize_dir: str, dry_run: bool = False):
         """
         创建符号链接（适用于已整理的目录）
+        增量同步 文件索引 目录：只为新文件建链接，删除目标已不存在的链接
 
         Args:
             organize_dir: 已整理的目录
+            dry_run: 试运行
         """
         organize_path = Path(organize_dir)
         if not organize_path.exists():
@@ -310,25 +594,10 @@ class FileOrganizer:
             return
 
         links_dir = self.source_dir / "文件索引"
-        links_dir.mkdir(exist_ok=True)
-
-        for item in organize_path.rglob('*'):
-            if item.is_file():
-                link_path = links_dir / item.name
-
-                # 处理文件名冲突
-                counter = 1
-                while link_path.exists():
-                    stem = item.stem
-                    suffix = item.suffix
-                    link_path = links_dir / f"{stem}_{counter}{suffix}"
-                    counter += 1
-
-                try:
-                    link_path.symlink_to(item)
-                    logger.info(f"创建符号链接: {link_path.name}")
-                except Exception as e:
-                    logger.error(f"创建符号链接失败 {item.name}: {e}")
+        stats = sync_link_index(organize_path, links_dir, dry_run=dry_run)
+        logger.info(f"{'[试运行] ' if dry_run else ''}文件索引已更新: 新建 {stats.created} 个链接，"
+                    f"删除失效链接 {stats.pruned} 个，保留 {stats.kept} 个，失败 {stats.failed} 个")
+        return stats
 
 
 def create_config_file(config_path: str = "file_organizer_config.json"):
@@ -354,10 +623,71 @@ def create_config_file(config_path: str = "file_organizer_config.json"):
     logger.info(f"配置文件已创建: {config_path}")
 
 
+def watch_main(argv: List[str]):
+    """watch 子命令：python master.py watch 源目录 [选项]"""
+    parser = argparse.ArgumentParser(prog='master.py watch', description='持续监视目录并自动整理新文件')
+    parser.add_argument('source', help='源目录路径')
+    parser.add_argument('-t', '--target', help='目标目录路径（默认同源目录）')
+    parser.add_argument('-m', '--mode', choices=['type', 'date', 'size', 'all'],
+                        default='type', help='整理模式: type(按类型), date(按日期), size(按大小), all(全部)')
+    parser.add_argument('-c', '--config', help='配置文件路径')
+    parser.add_argument('-d', '--date-format', default='%Y-%m',
+                        help='日期格式 (默认: %%Y-%%m, 如 2024-01)')
+    parser.add_argument('-s', '--size-limits', type=int, nargs=2,
+                        default=[10, 100], help='大小阈值 [小文件上限 中文件上限] MB')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='试运行，不实际移动文件')
+    parser.add_argument('--sniff', action='store_true',
+                        help='没有扩展名的文件读取文件头判断类型')
+    parser.add_argument('--capture-time', action='store_true',
+                        help='按日期整理时使用 JPEG Exif / MP4 中的拍摄时间（读不到时用修改时间）')
+    parser.add_argument('--settle', type=float, default=2.0,
+                        help='文件大小保持不变多少秒后才整理（默认: 2）')
+    parser.add_argument('--interval', type=float, default=1.0,
+                        help='每轮等待事件/轮询的间隔秒数（默认: 1）')
+    parser.add_argument('--poll', action='store_true',
+                        help='不使用 inotify，强制轮询')
+    parser.add_argument('--move-workers', type=int, default=4,
+                        help='跨盘复制的线程数（默认: 4）')
+    parser.add_argument('--inflight-mb', type=int, default=1024,
+                        help='跨盘复制同时在途的数据量上限 MB（默认: 1024）')
+    parser.add_argument('-v', '--verbose', action='store_true',
+                        help='详细输出')
+
+    args = parser.parse_args(argv)
+
+    if args.verbose:
+        logger.setLevel(logging.DEBUG)
+
+    try:
+        # 监视会一直运行，不记录移动日志（否则日志无限增长）
+        organizer = FileOrganizer(args.source, args.target,
+                                  move_workers=args.move_workers,
+                                  max_inflight_mb=args.inflight_mb,
+                                  sniff_content=args.sniff, journal=False,
+                                  capture_time=args.capture_time)
+        if args.config:
+            organizer.load_custom_categories(args.config)
+
+        organizer.watch(mode=args.mode, date_format=args.date_format,
+                        size_limits=args.size_limits, dry_run=args.dry_run,
+                        settle=args.settle, interval=args.interval,
+                        use_inotify=not args.poll)
+        organizer.close()
+    except Exception as e:
+        logger.error(f"监视过程中出错: {e}")
+        sys.exit(1)
+
+
 def main():
     """主函数"""
+    # 子命令：持续监视
+    if len(sys.argv) > 1 and sys.argv[1] == 'watch':
+        watch_main(sys.argv[2:])
+        return
+
     parser = argparse.ArgumentParser(description='自动整理文件脚本')
-    parser.add_argument('source', help='源目录路径')
+    parser.add_argument('source', nargs='?', help='源目录路径（--rollback 时不需要）')
     parser.add_argument('-t', '--target', help='目标目录路径（默认同源目录）')
     parser.add_argument('-m', '--mode', choices=['type', 'date', 'size', 'all'],
                         default='type', help='整理模式: type(按类型), date(按日期), size(按大小), all(全部)')
@@ -366,8 +696,14 @@ def main():
                         help='日期格式 (默认: %%Y-%%m, 如 2024-01)')
     parser.add_argument('-s', '--size-limits', type=int, nargs=2,
                         default=[10, 100], help='大小阈值 [小文件上限 中文件上限] MB')
+    parser.add_argument('--size-buckets', type=int, default=0, metavar='N',
+                        help='按实际大小分布自动分成 N 档（每档文件数大致相同），代替 --size-limits')
     parser.add_argument('--dry-run', action='store_true',
                         help='试运行，不实际移动文件')
+    parser.add_argument('--sniff', action='store_true',
+                        help='没有扩展名的文件读取文件头判断类型')
+    parser.add_argument('--capture-time', action='store_true',
+                        help='按日期整理时使用 JPEG Exif / MP4 中的拍摄时间（读不到时用修改时间）')
     parser.add_argument('--delete-duplicates', action='store_true',
                         help='删除重复文件')
     parser.add_argument('--clean-empty', action='store_true',
@@ -375,10 +711,28 @@ def main():
     parser.add_argument('--create-config', action='store_true',
                         help='创建配置文件模板')
     parser.add_argument('--create-links', help='为已整理的目录创建符号链接')
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help='并行哈希的线程数（默认: 1）')
+    parser.add_argument('--move-workers', type=int, default=4,
+                        help='跨盘复制的线程数（默认: 4）')
+    parser.add_argument('--inflight-mb', type=int, default=1024,
+                        help='跨盘复制同时在途的数据量上限 MB（默认: 1024）')
+    parser.add_argument('--incremental', action='store_true',
+                        help='增量模式：根据上次运行保存的目录快照，只重新扫描有变化的目录')
+    parser.add_argument('--resume', action='store_true',
+                        help='按移动日志继续上次中断的整理，不重新扫描')
+    parser.add_argument('--rollback', metavar='JOURNAL',
+                        help=f'按移动日志撤销一次整理（日志位于目标目录下的 {JOURNAL_FILENAME}）')
+    parser.add_argument('--manifest', metavar='PATH',
+                        help='把本次运行的文件清单写成 Parquet（需要 pyarrow；否则写 NumPy .npz）')
+    parser.add_argument('--hash', default='md5', choices=available_algorithms(), metavar='ALGO',
+                        help='去重哈希算法（默认: md5；fast = xxh3，未安装 xxhash 时为 blake2b-128）')
     parser.add_argument('-v', '--verbose', action='store_true',
                         help='详细输出')
 
     args = parser.parse_args()
+    if args.source is None and not args.rollback and not args.create_config:
+        parser.error('需要指定源目录')
 
     # 设置日志级别
     if args.verbose:
@@ -390,13 +744,32 @@ def main():
         return
 
     try:
+        # 撤销上次整理
+        if args.rollback:
+            rollback(args.rollback, workers=args.move_workers,
+                     max_inflight_bytes=args.inflight_mb * 1024 * 1024)
+            return
+
         # 初始化整理器
-        organizer = FileOrganizer(args.source, args.target)
+        organizer = FileOrganizer(args.source, args.target, jobs=args.jobs,
+                                  hash_algorithm=args.hash,
+                                  move_workers=args.move_workers,
+                                  max_inflight_mb=args.inflight_mb,
+                                  incremental=args.incremental,
+                                  sniff_content=args.sniff,
+                                  manifest_path=args.manifest,
+                                  capture_time=args.capture_time)
 
         # 加载配置文件
         if args.config:
             organizer.load_custom_categories(args.config)
 
+        # 继续上次中断的整理
+        if args.resume:
+            organizer.resume()
+            organizer.close()
+            return
+
         # 执行整理
         if args.mode in ['type', 'all']:
             organizer.organize_by_category(
@@ -413,7 +786,8 @@ def main():
         if args.mode in ['size', 'all']:
             organizer.organize_by_size(
                 size_limits=args.size_limits,
-                dry_run=args.dry_run
+                dry_run=args.dry_run,
+                buckets=args.size_buckets
             )
 
         # 清理空文件夹
@@ -422,7 +796,9 @@ def main():
 
         # 创建符号链接
         if args.create_links:
-            organizer.create_symlinks(args.create_links)
+            organizer.create_symlinks(args.create_links, dry_run=args.dry_run)
+
+        organizer.close()
 
         if not args.dry_run:
             logger.info("文件整理完成！")
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+批量移动规划
+每个目标目录只列一次目录，重名的 _N 后缀全部在内存集合里解决，得到完整的移动计划
+（由 move_executor.MoveExecutor 执行），系统调用数与文件数成正比，而不是 文件数 × 冲突数
+"""
+
+import os
+from dataclasses import dataclass, field
+from typing import Dict, List, Set, Tuple
+
+from scanner import FileRecord
+
+
+@dataclass
+class MoveOp:
+    """一次移动操作"""
+    record: FileRecord   # 源文件记录
+    dst: str             # 目标路径（已解决重名）
+    label: str = ""      # 日志用的分类名
+
+    @property
+    def src(self) -> str:
+        return self.record.path
+
+
+@dataclass
+class MovePlan:
+    """完整的移动计划"""
+    moves: List[MoveOp] = field(default_factory=list)
+    new_dirs: List[str] = field(default_factory=list)   # 需要新建的目标目录
+
+
+class MovePlanner:
+    """为一批文件规划目标路径"""
+
+    def __init__(self):
+        self.plan = MovePlan()
+        # 目标目录 -> 已占用的文件名（目录只在第一次用到时列一次）
+        self._used: Dict[str, Set[str]] = {}
+        # (目标目录, 原文件名) -> 下一个待尝试的序号，避免重复从 _1 开始试
+        self._next_counter: Dict[Tuple[str, str], int] = {}
+
+    def _used_names(self, directory: str) -> Set[str]:
+        """取目标目录已占用的文件名集合"""
+        names = self._used.get(directory)
+        if names is None:
+            try:
+                names = set(os.listdir(directory))
+            except FileNotFoundError:
+                names = set()
+                self.plan.new_dirs.append(directory)
+            self._used[directory] = names
+        return names
+
+    def add(self, record: FileRecord, target_dir, label: str = "") -> MoveOp:
+        """
+        把文件加入计划
+        Args:
+            record: 源文件记录
+            target_dir: 目标文件夹
+            label: 日志用的分类名
+        Returns:
+            MoveOp，dst 为解决重名后的目标路径（name_1.ext、name_2.ext ...）
+        """
+        directory = os.fspath(target_dir)
+        names = self._used_names(directory)
+
+        name = record.name
+        if name in names:
+            stem, suffix = os.path.splitext(name)
+            counter = self._next_counter.get((directory, name), 1)
+            candidate = f"{stem}_{counter}{suffix}"
+            while candidate in names:
+                counter += 1
+                candidate = f"{stem}_{counter}{suffix}"
+            self._next_counter[(directory, name)] = counter + 1
+            name = candidate
+        names.add(name)
+
+        op = MoveOp(record, os.path.join(directory, name), label)
+        self.plan.moves.append(op)
+        return op
+
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+单次遍历扫描器
+用 os.scandir 遍历一次目录树，复用 DirEntry 缓存的 stat 结果，
+为每个文件产出一条紧凑记录，供各种整理模式共享
+"""
+
+import os
+import logging
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class FileRecord(NamedTuple):
+    """单个文件的紧凑记录（路径用 str 保存，避免为每个文件构造 Path 对象）"""
+    path: str
+    size: int
+    mtime_ns: int
+    inode: int
+    dev: int
+
+    @property
+    def mtime(self) -> float:
+        """修改时间（秒）"""
+        return self.mtime_ns / 1e9
+
+    @property
+    def name(self) -> str:
+        """文件名"""
+        return os.path.basename(self.path)
+
+
+def scan_directory(path: str, excluded=frozenset(),
+                   skip_hidden: bool = True) -> Tuple[List[FileRecord], List[str]]:
+    """
+    列出单个目录（不递归）
+    Args:
+        path: 目录路径
+        excluded: 需要跳过的子目录路径集合
+        skip_hidden: 跳过以 . 开头的隐藏文件
+    Returns:
+        (该目录下的文件记录, 子目录路径列表)；目录无法读取时抛出 OSError
+    """
+    files: List[FileRecord] = []
+    subdirs: List[str] = []
+    with os.scandir(path) as it:
+        for entry in it:
+            try:
+                # is_dir/is_file 基于 d_type，不产生额外系统调用；符号链接不跟随
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.path not in excluded:
+                        subdirs.append(entry.path)
+                    continue
+                if not entry.is_file(follow_symlinks=False):
+                    continue
+                if skip_hidden and entry.name.startswith('.'):
+                    continue
+                st = entry.stat(follow_symlinks=False)
+            except OSError as e:
+                logger.debug(f"跳过 {entry.path}: {e}")
+                continue
+            files.append(FileRecord(entry.path, st.st_size, st.st_mtime_ns, st.st_ino, st.st_dev))
+    return files, subdirs
+
+
+def scan_tree(root, exclude: Iterable = (), skip_hidden: bool = True,
+              dir_counts: Optional[Dict[str, int]] = None) -> Iterator[FileRecord]:
+    """
+    遍历目录树，逐个产出文件记录
+    Args:
+        root: 根目录
+        exclude: 需要整棵跳过的目录（如位于源目录内的目标目录）
+        skip_hidden: 跳过以 . 开头的隐藏文件
+        dir_counts: 传入字典时顺便记录 {目录: 文件数 + 子目录数}（供清理空目录使用）
+    Returns:
+        FileRecord 生成器；每个文件只做一次 stat
+    """
+    excluded = {os.fspath(p) for p in exclude}
+    stack = [os.fspath(root)]
+
+    while stack:
+        current = stack.pop()
+        try:
+            files, subdirs = scan_directory(current, excluded, skip_hidden)
+        except OSError as e:
+            logger.warning(f"无法读取目录 {current}: {e}")
+            continue
+
+        if dir_counts is not None:
+            dir_counts[current] = len(files) + len(subdirs)
+        yield from files
+        # 逆序入栈，保持按目录项顺序深度优先
+        stack.extend(reversed(subdirs))
+
+
+def restat(record: FileRecord) -> Optional[FileRecord]:
+    """重新 stat 文件，得到最新的大小和修改时间；文件已不存在时返回 None"""
+    try:
+        st = os.stat(record.path, follow_symlinks=False)
+    except OSError:
+        return None
+    return FileRecord(record.path, st.st_size, st.st_mtime_ns, st.st_ino, st.st_dev)
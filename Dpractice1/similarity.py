@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+相似文件检测（内容定义分块）
+精确去重只能发现逐字节相同的文件；重新封装的视频、追加写入的日志往往大部分内容相同，
+但只要有一个字节不同，整文件哈希就完全不同。这里：
+1. 用 Gear 滚动哈希按内容切块：块边界由附近 32 字节的内容决定，
+   文件中间插入或删除数据只影响附近一两个块，其余块的指纹不变
+2. 每块计算 8 字节指纹，连同块长度一起存入 HashCache（文件未变化时不再读取）
+3. 用 指纹 -> 文件 的倒排索引统计每对文件共享的字节数，超过阈值的文件对即为相似文件
+
+纯 Python 逐字节滚动（约每秒几 MB），速度远低于哈希，因此：
+- 每个文件只对前 MAX_BYTES（默认 256MB）分块，相似度按这一段计算；几 GB 的视频不会耗上几小时
+- 分块在进程池中执行（受 GIL 限制，线程池无法并行）
+- 只处理较大的文件，并依赖缓存避免重复计算
+"""
+
+import hashlib
+import logging
+import struct
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from hash_cache import HashCache
+from scanner import FileRecord
+
+logger = logging.getLogger(__name__)
+
+# 默认分块大小：最小 / 平均 / 最大
+MIN_CHUNK = 256 * 1024
+AVG_CHUNK = 1024 * 1024
+MAX_CHUNK = 4 * 1024 * 1024
+# 每个文件只分块的前多少字节（0 表示整个文件）
+MAX_BYTES = 256 * 1024 * 1024
+
+# 每块的打包格式：8 字节指纹 + 4 字节块长度
+_CHUNK = struct.Struct("<8sI")
+
+# 同一块出现在太多文件中（如全零块）时不参与配对，避免文件对数量平方级增长
+MAX_FILES_PER_CHUNK = 64
+
+# Gear 表：256 个固定的 32 位伪随机数（由 blake2b 生成，保证每次运行一致）
+GEAR = [int.from_bytes(hashlib.blake2b(bytes([i]), digest_size=4).digest(), "little")
+        for i in range(256)]
+
+
+class Chunker:
+    """Gear 滚动哈希分块器"""
+
+    def __init__(self, min_size: int = MIN_CHUNK, avg_size: int = AVG_CHUNK,
+                 max_size: int = MAX_CHUNK, max_bytes: int = MAX_BYTES):
+        """
+        初始化分块器
+            Args:
+                min_size: 最小块长度（前 min_size 字节不找边界，直接跳过）
+                avg_size: 期望的平均块长度（取不超过它的 2 的幂）
+                max_size: 最大块长度（到达后强制切分）
+                max_bytes: 只处理文件开头的这么多字节（0 表示整个文件）
+        """
+        self.min_size = min_size
+        self.max_size = max_size
+        self.max_bytes = max_bytes
+        bits = avg_size.bit_length() - 1
+        # 用哈希的高位判断边界：高位受最近 32 个字节共同影响
+        self.mask = ((1 << bits) - 1) << (32 - bits)
+        self.params = f"gear:{min_size}:{1 << bits}:{max_size}:{max_bytes}"
+
+    def _boundary(self, data, start: int, end: int) -> int:
+        """在 data[start:end] 中找第一个切分点，返回块长度"""
+        n = end - start
+        if n <= self.min_size:
+            return n
+        mask = self.mask
+        gear = GEAR
+        h = 0
+        i = start + self.min_size
+        for b in data[i:end]:
+            h = ((h << 1) + gear[b]) & 0xFFFFFFFF
+            i += 1
+            if not h & mask:
+                return i - start
+        return n
+
+    def fingerprints(self, path) -> bytes:
+        """
+        对文件（前 max_bytes 字节）分块并计算每块的指纹
+        Args:
+            path: 文件路径
+        Returns:
+            打包后的 (指纹, 块长度) 序列，见 unpack_fingerprints
+        """
+        out = bytearray()
+        read_size = self.max_size * 4
+        budget = self.max_bytes or float("inf")
+        with open(path, "rb") as f:
+            def read(n: int) -> bytes:
+                nonlocal budget
+                n = int(min(n, budget))
+                data = f.read(n) if n > 0 else b""
+                budget -= len(data)
+                return data
+
+            data = read(read_size)
+            pos = 0
+            while pos < len(data):
+                if len(data) - pos < self.max_size:
+                    # 剩余数据不足一个最大块时补读，保证边界判断不受缓冲区截断影响
+                    more = read(read_size)
+                    if more:
+                        data = data[pos:] + more
+                        pos = 0
+                end = min(len(data), pos + self.max_size)
+                length = self._boundary(memoryview(data), pos, end)
+                digest = hashlib.blake2b(memoryview(data)[pos:pos + length], digest_size=8).digest()
+                out += _CHUNK.pack(digest, length)
+                pos += length
+        return bytes(out)
+
+
+def _chunk_file(task: Tuple[Chunker, str]) -> Tuple[Optional[bytes], float]:
+    """计算单个文件的指纹（模块级函数，可在子进程中执行）"""
+    chunker, path = task
+    start = time.perf_counter()
+    try:
+        return chunker.fingerprints(path), time.perf_counter() - start
+    except OSError as e:
+        logger.error(f"分块失败 {path}: {e}")
+        return None, 0.0
+
+
+def unpack_fingerprints(packed: bytes) -> List[Tuple[bytes, int]]:
+    """解包为 [(指纹, 块长度), ...]"""
+    return list(_CHUNK.iter_unpack(packed))
+
+
+@dataclass
+class SimilarPair:
+    """一对相似文件"""
+    a: FileRecord
+    b: FileRecord
+    shared_bytes: int        # 两者共享的块的总字节数（即可节省的空间）
+    similarity: float        # 共享字节数 / 较小文件中参与分块的大小
+
+
+class SimilarityFinder:
+    """基于分块指纹查找相似文件"""
+
+    def __init__(self, threshold: float = 0.5, min_file_size: int = 8 * 1024 * 1024,
+                 chunker: Optional[Chunker] = None, cache: Optional[HashCache] = None,
+                 jobs: int = 1):
+        """
+        初始化
+            Args:
+                threshold: 相似度阈值（共享字节数 / 较小文件大小）
+                min_file_size: 只处理不小于该大小的文件
+                chunker: 分块器（默认参数见 MIN_CHUNK / AVG_CHUNK / MAX_CHUNK）
+                cache: 哈希缓存（可选），指纹存放在其中的 chunks 表
+                jobs: 并行分块的进程数
+        """
+        self.threshold = threshold
+        self.min_file_size = min_file_size
+        self.chunker = chunker or Chunker()
+        self.cache = cache
+        self.jobs = max(1, jobs)
+        self.chunked = 0          # 本次实际读取分块的文件数
+        self.seconds = 0.0
+
+    def _chunk_all(self, records: List[FileRecord]) -> Iterable[Tuple[FileRecord, Tuple]]:
+        """分块（jobs > 1 时在进程池中执行），按输入顺序产出 (记录, (指纹, 耗时))"""
+        tasks = [(self.chunker, record.path) for record in records]
+        if self.jobs == 1 or len(tasks) < 2:
+            return zip(records, map(_chunk_file, tasks))
+        with ProcessPoolExecutor(max_workers=min(self.jobs, len(tasks))) as pool:
+            return zip(records, list(pool.map(_chunk_file, tasks)))
+
+    def find_pairs(self, records: Iterable[FileRecord]) -> List[SimilarPair]:
+        """
+        查找相似文件对
+        Args:
+            records: 扫描得到的文件记录
+        Returns:
+            按共享字节数从大到小排序的相似文件对
+        """
+        params = self.chunker.params
+        candidates = [r for r in records if r.size >= self.min_file_size]
+        logger.info(f"相似检测：{len(candidates)} 个文件不小于 {self.min_file_size / 1024 / 1024:.0f}MB")
+
+        # 先查缓存（主线程），未命中的交给进程池分块
+        chunks: Dict[FileRecord, List[Tuple[bytes, int]]] = {}
+        misses: List[FileRecord] = []
+        for record in candidates:
+            packed = self.cache.get_chunks(record, params) if self.cache else None
+            if packed is None:
+                misses.append(record)
+            else:
+                chunks[record] = unpack_fingerprints(packed)
+
+        self.chunked = 0
+        self.seconds = 0.0
+        for record, (packed, seconds) in self._chunk_all(misses):
+            if packed is None:
+                continue
+            self.chunked += 1
+            self.seconds += seconds
+            if self.cache is not None:
+                self.cache.put_chunks(record, params, packed)
+            chunks[record] = unpack_fingerprints(packed)
+
+        # 倒排索引：指纹 -> [(文件序号, 块长度)]，同一文件内重复的块只算一次
+        files = list(chunks)
+        index: Dict[bytes, List[Tuple[int, int]]] = defaultdict(list)
+        for n, record in enumerate(files):
+            seen = set()
+            for digest, length in chunks[record]:
+                if digest not in seen:
+                    seen.add(digest)
+                    index[digest].append((n, length))
+
+        shared: Dict[Tuple[int, int], int] = defaultdict(int)
+        for owners in index.values():
+            if len(owners) < 2 or len(owners) > MAX_FILES_PER_CHUNK:
+                continue
+            for i in range(len(owners)):
+                for j in range(i + 1, len(owners)):
+                    shared[(owners[i][0], owners[j][0])] += owners[i][1]
+
+        pairs = []
+        for (i, j), nbytes in shared.items():
+            a, b = files[i], files[j]
+            covered = min(a.size, b.size)
+            if self.chunker.max_bytes:
+                covered = min(covered, self.chunker.max_bytes)
+            similarity = nbytes / max(1, covered)
+            if similarity >= self.threshold:
+                pairs.append(SimilarPair(a, b, nbytes, min(similarity, 1.0)))
+        pairs.sort(key=lambda p: p.shared_bytes, reverse=True)
+        return pairs
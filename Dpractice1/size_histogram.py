@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+文件大小分布（流式对数直方图）
+固定的 10MB / 100MB 阈值在实际目录中往往让几乎所有文件落进同一档。
+扫描时每个文件只做一次 O(1) 的计数：桶按 2 的幂划分，每个倍程再细分 BINS_PER_OCTAVE 份，
+相对误差约 9%，桶数固定（最多几百个），与文件数无关；
+整理时直接从直方图取分位点作为分档边界，不需要对文件大小排序或再遍历一次
+"""
+
+import bisect
+import math
+from typing import Dict, Iterable, Iterator, List
+
+from scanner import FileRecord
+
+# 每个 2 倍区间细分的桶数
+BINS_PER_OCTAVE = 8
+
+
+def _bin_index(size: int) -> int:
+    """大小 -> 桶号（0 字节单独一个桶）"""
+    if size <= 0:
+        return -1
+    return int(math.log2(size) * BINS_PER_OCTAVE)
+
+
+def _bin_upper(index: int) -> float:
+    """桶的上界（字节）"""
+    if index < 0:
+        return 0.0
+    return 2.0 ** ((index + 1) / BINS_PER_OCTAVE)
+
+
+def _round_edge(size: float) -> int:
+    """
+    边界在其显示单位（B/KB/MB...）下取两位有效数字，
+    目录名更整齐，同一分布多次运行得到相同的名字，且不同边界不会显示成同一个名字
+    """
+    if size < 1:
+        return 0
+    unit = 1
+    while size >= unit * 1024 and unit < 1024 ** 4:
+        unit *= 1024
+    value = size / unit
+    step = 10 ** (int(math.floor(math.log10(value))) - 1)
+    return int(round(round(value / step) * step * unit))
+
+
+def format_size(size: int) -> str:
+    """字节数 -> 简短的可读形式（用于目录名）"""
+    value = float(size)
+    for unit in ("B", "KB", "MB", "GB", "TB"):
+        if value < 1024 or unit == "TB":
+            return f"{value:.0f}{unit}" if value >= 10 or unit == "B" else f"{value:.1f}{unit}"
+        value /= 1024
+
+
+class SizeHistogram:
+    """对数分桶的文件大小直方图"""
+
+    def __init__(self):
+        self.bins: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0
+        self.largest = 0
+
+    def add(self, size: int) -> None:
+        index = _bin_index(size)
+        self.bins[index] = self.bins.get(index, 0) + 1
+        self.count += 1
+        self.total += size
+        self.largest = max(self.largest, size)
+
+    def observe(self, records: Iterable[FileRecord]) -> Iterator[FileRecord]:
+        """边扫描边计数：原样产出记录"""
+        for record in records:
+            self.add(record.size)
+            yield record
+
+    def quantile(self, q: float) -> float:
+        """
+        近似分位数
+        Args:
+            q: 0~1
+        Returns:
+            第 q 分位所在桶的上界（字节）
+        """
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for index in sorted(self.bins):
+            seen += self.bins[index]
+            if seen >= target:
+                return _bin_upper(index)
+        return _bin_upper(max(self.bins))
+
+    def edges(self, buckets: int) -> List[int]:
+        """
+        把文件按数量大致均分成 buckets 档的边界
+        Returns:
+            递增的边界列表（至多 buckets - 1 个；分布集中时相同的边界会合并，
+            不小于最大文件的边界会被去掉，没有文件或所有文件同样大小时为空）
+        """
+        edges: List[int] = []
+        for i in range(1, buckets):
+            edge = _round_edge(self.quantile(i / buckets))
+            if edge >= self.largest:
+                # 之后的档都是空的
+                break
+            if not edges or edge > edges[-1]:
+                edges.append(edge)
+        return edges
+
+    def to_dict(self) -> Dict:
+        """用于运行报告：{"桶下界-桶上界": 文件数}，按大小排序"""
+        bins = {}
+        for index in sorted(self.bins):
+            lower = 0 if index < 0 else int(2.0 ** (index / BINS_PER_OCTAVE))
+            bins[f"{lower}-{int(_bin_upper(index))}"] = self.bins[index]
+        return {
+            "bins_per_octave": BINS_PER_OCTAVE,
+            "files": self.count,
+            "bytes": self.total,
+            "bins": bins,
+        }
+
+
+def bucket_labels(edges: List[int]) -> List[str]:
+    """分档边界 -> 各档目录名（如 0-12KB、12KB-1.5MB、1.5MB以上）"""
+    if not edges:
+        return ["全部"]
+    labels = [f"0-{format_size(edges[0])}"]
+    labels += [f"{format_size(a)}-{format_size(b)}" for a, b in zip(edges, edges[1:])]
+    labels.append(f"{format_size(edges[-1])}以上")
+    return labels
+
+
+def bucket_of(size: int, edges: List[int]) -> int:
+    """文件所在档的序号（边界值归入较小的一档）"""
+    return bisect.bisect_left(edges, size)
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+目录快照（增量整理）
+每次运行后保存每个目录的 mtime 和其中文件的身份信息，下次运行时：
+- 目录 mtime 未变化：目录项没有增删改名，直接复用快照里的文件和子目录列表
+- 目录 mtime 变化：重新 scandir 该目录
+整棵树只需对每个目录 stat 一次，文件数再多也不用重新列目录；
+本次运行移入/移出文件的目录 mtime 会随之变化，下次自然会被重新列出
+
+注意：原地改写文件内容不会改变目录 mtime，复用的大小/修改时间可能是旧的，
+用到它们之前需要重新 stat：去重只 stat 候选文件（见 DedupEngine 的 refresh 参数），
+按日期/大小整理时 stat 复用目录中的文件（见 reused_dirs 和 scanner.restat）
+"""
+
+import gzip
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List, Optional, Set
+
+from scanner import FileRecord, scan_directory
+
+logger = logging.getLogger(__name__)
+
+# 快照文件名（以 . 开头，扫描时作为隐藏文件跳过）
+SNAPSHOT_FILENAME = ".organizer_snapshot.json.gz"
+SNAPSHOT_VERSION = 1
+
+# mtime 距扫描时刻太近的目录不信任：同一时间片内的后续修改可能不会改变 mtime
+RACY_SECONDS = 2
+
+
+@dataclass
+class DirState:
+    """单个目录的快照"""
+    mtime_ns: Optional[int]                  # None 表示不可信，下次必须重新列目录
+    subdirs: List[str] = field(default_factory=list)
+    files: List[FileRecord] = field(default_factory=list)
+
+
+class DirSnapshot:
+    """整棵目录树的快照"""
+
+    def __init__(self, root: str, dirs: Dict[str, DirState] = None):
+        self.root = os.fspath(root)
+        self.dirs: Dict[str, DirState] = dirs or {}
+        self.reused = 0      # 本次扫描复用的目录数
+        self.reused_dirs: Set[str] = set()   # 这些目录中的文件记录来自快照，大小/修改时间可能过时
+        self.rescanned = 0   # 本次扫描重新列出的目录数
+
+    @classmethod
+    def load(cls, path, root) -> "DirSnapshot":
+        """读取快照；文件不存在、已损坏或属于其他根目录时返回空快照"""
+        root = os.fspath(root)
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return cls(root)
+        except (OSError, ValueError) as e:
+            logger.warning(f"快照无法读取，将完整扫描: {e}")
+            return cls(root)
+
+        if data.get("version") != SNAPSHOT_VERSION or data.get("root") != root:
+            return cls(root)
+
+        dirs = {}
+        for directory, (mtime_ns, subdirs, files) in data["dirs"].items():
+            dirs[directory] = DirState(
+                mtime_ns,
+                [os.path.join(directory, name) for name in subdirs],
+                [FileRecord(os.path.join(directory, name), *rest) for name, *rest in files],
+            )
+        return cls(root, dirs)
+
+    def save(self, path) -> None:
+        """写入快照（先写临时文件再替换，中途崩溃不会留下半个快照）"""
+        data = {
+            "version": SNAPSHOT_VERSION,
+            "root": self.root,
+            "dirs": {
+                directory: [
+                    state.mtime_ns,
+                    [os.path.basename(p) for p in state.subdirs],
+                    [[r.name, r.size, r.mtime_ns, r.inode, r.dev] for r in state.files],
+                ]
+                for directory, state in self.dirs.items()
+            },
+        }
+        tmp = f"{os.fspath(path)}.tmp"
+        with gzip.open(tmp, "wt", encoding="utf-8", compresslevel=1) as f:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp, path)
+
+    def scan(self, previous: "DirSnapshot", exclude: Iterable = (),
+             skip_hidden: bool = True) -> Iterator[FileRecord]:
+        """
+        基于上次的快照增量遍历目录树，同时把本次结果记录到 self
+        Args:
+            previous: 上次运行保存的快照
+            exclude: 需要整棵跳过的目录
+            skip_hidden: 跳过隐藏文件
+        Returns:
+            FileRecord 生成器
+        """
+        excluded = {os.fspath(p) for p in exclude}
+        racy_before = time.time_ns() - RACY_SECONDS * 10 ** 9
+        stack = [self.root]
+
+        while stack:
+            current = stack.pop()
+            try:
+                mtime_ns = os.stat(current).st_mtime_ns
+            except OSError as e:
+                logger.warning(f"无法读取目录 {current}: {e}")
+                continue
+
+            old = previous.dirs.get(current)
+            if old is not None and old.mtime_ns is not None and old.mtime_ns == mtime_ns:
+                files, subdirs = old.files, old.subdirs
+                self.reused += 1
+                self.reused_dirs.add(current)
+            else:
+                try:
+                    files, subdirs = scan_directory(current, excluded, skip_hidden)
+                except OSError as e:
+                    logger.warning(f"无法读取目录 {current}: {e}")
+                    continue
+                self.rescanned += 1
+
+            self.dirs[current] = DirState(mtime_ns if mtime_ns < racy_before else None,
+                                          subdirs, files)
+            yield from files
+            stack.extend(reversed(subdirs))
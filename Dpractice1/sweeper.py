@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+空目录清理
+扫描时已经知道每个目录有多少个子项（非隐藏文件 + 子目录），整理过程中文件移出/移入时随之增减，
+清理时只需找出计数为 0 的目录，自底向上一层一层 rmdir，不用再遍历或列目录：
+- 同一深度的目录互不影响，每层交给线程池并行删除
+- 删掉一个目录后父目录计数减一，父目录可能随之变空
+- rmdir 只能删除空目录，计数不准（如扫描时跳过的隐藏文件、符号链接）时会安全失败；
+  此时才列一次该目录，若只剩系统生成的文件（JUNK_FILES）则删掉它们（逐个记日志）再 rmdir，
+  其他隐藏文件（.env、.gitignore 等）一律保留，目录也随之保留
+- 试运行不删除，但同样列出计数为 0 的目录，只报告真正能删除的目录
+"""
+
+import errno
+import logging
+import os
+from collections import defaultdict
+from functools import partial
+from typing import AbstractSet, Dict, List, Optional
+
+from hashing import map_bounded
+
+logger = logging.getLogger(__name__)
+
+# 清理空目录时可以一并删除的系统生成文件（按小写比较）
+JUNK_FILES = frozenset({".ds_store", "thumbs.db", "desktop.ini"})
+
+
+class DirTally:
+    """目录 -> 子项数"""
+
+    def __init__(self, counts: Optional[Dict[str, int]] = None):
+        """
+        Args:
+            counts: 扫描时得到的 {目录: 非隐藏文件数 + 子目录数}（见 scanner.scan_tree 的 dir_counts）
+        """
+        self.counts: Dict[str, int] = counts if counts is not None else {}
+
+    def remove_entry(self, path: str) -> None:
+        """path 被移走或删除"""
+        parent = os.path.dirname(path)
+        if parent in self.counts:
+            self.counts[parent] -= 1
+
+    def add_entry(self, path: str) -> None:
+        """path 被移入（所在目录可能是新建的）"""
+        parent = os.path.dirname(path)
+        if parent in self.counts:
+            self.counts[parent] += 1
+        elif os.path.dirname(parent) in self.counts:
+            self.counts[parent] = 1
+            self.counts[os.path.dirname(parent)] += 1
+
+    def sweep(self, root: str, dry_run: bool = False, jobs: int = 1) -> List[str]:
+        """
+        自底向上删除空目录（root 本身保留）
+        Args:
+            root: 根目录
+            dry_run: 试运行，不删除，只报告能删除的目录
+            jobs: 每层并行删除的线程数
+        Returns:
+            删除（或试运行中将删除）的目录
+        """
+        root = os.fspath(root)
+        levels: Dict[int, List[str]] = defaultdict(list)
+        for directory in self.counts:
+            if directory != root:
+                levels[directory.count(os.sep)].append(directory)
+
+        removed: List[str] = []
+        for depth in sorted(levels, reverse=True):
+            # 计数在处理更深一层时已经更新
+            empty = [d for d in levels[depth] if self.counts.get(d) == 0]
+            if dry_run:
+                # 更深层"已删除"的子目录实际还在，列目录时当作不存在
+                check = partial(_would_remove, removed=frozenset(removed))
+                results = map_bounded(check, empty, jobs=jobs)
+            else:
+                results = map_bounded(_remove_dir, empty, jobs=jobs)
+            for directory, ok in results:
+                if not ok:
+                    continue
+                removed.append(directory)
+                del self.counts[directory]
+                self.remove_entry(directory)
+        return removed
+
+
+def _junk_only(directory: str, removed: AbstractSet[str] = frozenset()) -> Optional[List[str]]:
+    """
+    列出计数之外还剩的内容
+    Returns:
+        只剩 JUNK_FILES（以及 removed 中的子目录）时返回这些文件的路径，还有其他内容时返回 None
+    """
+    junk: List[str] = []
+    with os.scandir(directory) as it:
+        for entry in it:
+            if entry.path in removed:
+                continue
+            if entry.name.lower() not in JUNK_FILES or not entry.is_file(follow_symlinks=False):
+                return None
+            junk.append(entry.path)
+    return junk
+
+
+def _remove_dir(directory: str) -> bool:
+    """rmdir；目录里只剩系统生成的文件时先删掉它们（在工作线程中执行）"""
+    try:
+        os.rmdir(directory)
+        return True
+    except OSError as e:
+        if e.errno not in (errno.ENOTEMPTY, errno.EEXIST):
+            logger.error(f"删除文件夹失败 {directory}: {e}")
+            return False
+
+    try:
+        junk = _junk_only(directory)
+        if junk is None:
+            logger.debug(f"保留 {directory}：还有计数之外的文件")
+            return False
+        for path in junk:
+            os.unlink(path)
+            logger.info(f"删除系统生成的文件: {path}")
+        os.rmdir(directory)
+        return True
+    except OSError as e:
+        logger.debug(f"跳过 {directory}: {e}")
+        return False
+
+
+def _would_remove(directory: str, removed: AbstractSet[str]) -> bool:
+    """试运行：目录为空或只剩系统生成的文件时才报告为可删除（在工作线程中执行）"""
+    try:
+        junk = _junk_only(directory, removed)
+    except OSError as e:
+        logger.debug(f"跳过 {directory}: {e}")
+        return False
+    if junk is None:
+        return False
+    for path in junk:
+        logger.info(f"[试运行] 将删除系统生成的文件: {path}")
+    return True
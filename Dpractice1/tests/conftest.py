@@ -0,0 +1,22 @@
+# Dpractice1/tests/conftest.py
+import sys
+from pathlib import Path
+
+import pytest
+
+# 被测模块都在 Dpractice1 根目录下，以顶层模块方式互相导入
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+@pytest.fixture
+def make_files(tmp_path):
+    """按 {相对路径: 内容} 创建文件，返回源目录"""
+    def make(files, root="src"):
+        base = tmp_path / root
+        for rel, content in files.items():
+            path = base / rel
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(content if isinstance(content, bytes) else content.encode())
+        base.mkdir(exist_ok=True)
+        return base
+    return make
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+拍摄时间：Exif DateTimeOriginal、MP4 mvhd，以及截断/畸形输入
+"""
+import datetime
+import struct
+
+import pytest
+
+from capture_time import (CACHE_KEY, CaptureTimeExtractor, read_capture_time,
+                          _MP4_EPOCH_OFFSET)
+from hash_cache import HashCache
+from scanner import scan_tree
+
+TAKEN = b"2019:07:04 12:30:00\0"
+TAKEN_TS = datetime.datetime(2019, 7, 4, 12, 30).timestamp()
+
+
+def _tiff(order="<", original=TAKEN):
+    """最小 TIFF 结构：IFD0 只有指向 Exif IFD 的条目，Exif IFD 只有 DateTimeOriginal"""
+    exif_offset = 8 + 2 + 12 + 4
+    data_offset = exif_offset + 2 + 12 + 4
+    ifd0 = struct.pack(order + "H", 1) + struct.pack(order + "HHII", 0x8769, 4, 1, exif_offset)
+    exif = struct.pack(order + "H", 1) + struct.pack(order + "HHII", 0x9003, 2, len(original), data_offset)
+    head = (b"II*\0" if order == "<" else b"MM\0*") + struct.pack(order + "I", 8)
+    return head + ifd0 + b"\0\0\0\0" + exif + b"\0\0\0\0" + original
+
+
+def _jpeg(app1_payload, before=b""):
+    segment = b"\xff\xe1" + struct.pack(">H", len(app1_payload) + 2) + app1_payload
+    return b"\xff\xd8" + before + segment + b"\xff\xda\0\x02" + b"\0" * 16 + b"\xff\xd9"
+
+
+def _box(kind, payload):
+    return struct.pack(">I4s", 8 + len(payload), kind) + payload
+
+
+def _mvhd(created, version=0):
+    if version == 1:
+        return _box(b"mvhd", bytes([1, 0, 0, 0]) + struct.pack(">QQ", created, created) + b"\0" * 80)
+    return _box(b"mvhd", bytes(4) + struct.pack(">II", created, created) + b"\0" * 80)
+
+
+def _mp4(*boxes):
+    return _box(b"ftyp", b"isom\0\0\0\0") + b"".join(boxes)
+
+
+def _write(tmp_path, name, data):
+    path = tmp_path / name
+    path.write_bytes(data)
+    return path
+
+
+@pytest.mark.parametrize("order", ["<", ">"])
+def test_exif_datetime_original(tmp_path, order):
+    data = _jpeg(b"Exif\0\0" + _tiff(order))
+    assert read_capture_time(_write(tmp_path, "a.jpg", data)) == TAKEN_TS
+
+
+def test_exif_skips_other_segments(tmp_path):
+    app0 = b"\xff\xe0" + struct.pack(">H", 16) + b"JFIF\0" + b"\0" * 9
+    data = _jpeg(b"Exif\0\0" + _tiff(), before=app0 + b"\xff\xff")   # 含填充字节
+    assert read_capture_time(_write(tmp_path, "a.JPEG", data)) == TAKEN_TS
+
+
+@pytest.mark.parametrize("data", [
+    b"",
+    b"\xff\xd8",                                             # 只有 SOI
+    b"\xff\xd8\xff\xe1\x00",                                 # 段长度被截断
+    b"\xff\xd8\xff\xe1\x00\x40Exif\0\0II*\0",                # APP1 内容被截断
+    b"\xff\xd8\xff\xe1\x00\x00",                             # 段长度小于 2
+    b"\xff\xd8\xff\xe0\x00\x01",
+    b"\xff\xd8\x00\x00",                                     # 不是标记
+    b"\x89PNG\r\n\x1a\n",                                    # 不是 JPEG
+])
+def test_malformed_jpeg_returns_none(tmp_path, data):
+    assert read_capture_time(_write(tmp_path, "bad.jpg", data)) is None
+
+
+def test_exif_with_bad_offsets_returns_none(tmp_path):
+    tiff = bytearray(_tiff())
+    tiff[4:8] = struct.pack("<I", 10_000)                   # IFD0 偏移越界
+    data = _jpeg(b"Exif\0\0" + bytes(tiff))
+    assert read_capture_time(_write(tmp_path, "a.jpg", data)) is None
+
+
+def test_exif_with_invalid_date_returns_none(tmp_path):
+    data = _jpeg(b"Exif\0\0" + _tiff(original=b"0000:00:00 00:00:00\0"))
+    assert read_capture_time(_write(tmp_path, "a.jpg", data)) is None
+
+
+@pytest.mark.parametrize("version", [0, 1])
+def test_mp4_mvhd(tmp_path, version):
+    created = int(TAKEN_TS) + _MP4_EPOCH_OFFSET
+    data = _mp4(_box(b"mdat", b"\0" * 1000), _box(b"moov", _mvhd(created, version)))
+    assert read_capture_time(_write(tmp_path, "a.mp4", data)) == float(int(TAKEN_TS))
+
+
+def test_mp4_zero_creation_time(tmp_path):
+    data = _mp4(_box(b"moov", _mvhd(0)))
+    assert read_capture_time(_write(tmp_path, "a.mov", data)) is None
+
+
+@pytest.mark.parametrize("data", [
+    b"",
+    _box(b"ftyp", b"isom"),                                   # 没有 moov
+    _mp4(_box(b"moov", b""))[:-2],                            # moov 头被截断
+    _mp4(_box(b"moov", _mvhd(4_000_000_000))[:20]),           # mvhd 被截断
+    _mp4(_box(b"moov", _box(b"mvhd", bytes([1, 0, 0, 0]) + b"\0" * 4))),   # 版本 1 但字段不足
+    _mp4(struct.pack(">I4s", 1, b"moov") + b"\0\0"),          # 64 位长度被截断
+    _mp4(struct.pack(">I4s", 4, b"moov")),                    # 长度小于头部
+    _mp4(struct.pack(">I4s", 0x7FFFFFFF, b"mdat")),           # 长度超出文件
+])
+def test_malformed_mp4_returns_none(tmp_path, data):
+    assert read_capture_time(_write(tmp_path, "bad.mp4", data)) is None
+
+
+def test_unsupported_suffix(tmp_path):
+    assert read_capture_time(_write(tmp_path, "a.png", _jpeg(b"Exif\0\0" + _tiff()))) is None
+
+
+def test_extractor_caches_results(make_files, tmp_path):
+    src = make_files({"a.jpg": _jpeg(b"Exif\0\0" + _tiff()), "b.jpg": b"broken", "c.txt": "x"})
+    records = list(scan_tree(src))
+
+    with HashCache(tmp_path / "cache.db") as cache:
+        first = CaptureTimeExtractor(cache=cache)
+        assert first.extract(records) == {str(src / "a.jpg"): TAKEN_TS}
+        assert first.read == 2
+        cache.flush()
+
+        second = CaptureTimeExtractor(cache=cache)
+        assert second.extract(records) == {str(src / "a.jpg"): TAKEN_TS}
+        assert second.read == 0                               # "没有拍摄时间" 也被缓存
+        assert cache.get_meta(records[0], CACHE_KEY) is not None
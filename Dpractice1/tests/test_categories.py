@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+CategoryTable：多段后缀、内容嗅探
+"""
+import pytest
+
+from categories import CategoryTable, normalize_suffix, sniff_suffix
+
+CATEGORIES = {
+    "压缩包": [".zip", ".tar.gz", "TAR.BZ2", ".gz"],
+    "图片": [".jpg", ".png", ".webp"],
+    "文档": [".pdf"],
+    "视频": [".mp4"],
+}
+
+
+@pytest.fixture
+def table():
+    return CategoryTable(CATEGORIES)
+
+
+@pytest.mark.parametrize("name, expected", [
+    ("backup.tar.gz", "压缩包"),
+    ("BACKUP.TAR.BZ2", "压缩包"),      # 大小写不敏感
+    ("log.2024.gz", "压缩包"),         # 只有最后一段能匹配
+    ("photo.final.jpg", "图片"),
+    ("report.pdf", "文档"),
+    ("archive.tar", None),             # .tar 单独没有配置
+    ("README", None),
+    (".bashrc", None),                 # 开头的点不算后缀
+    (".hidden.pdf", "文档"),
+])
+def test_match_name(table, name, expected):
+    assert table.match_name(name) == expected
+
+
+def test_normalize_suffix():
+    assert normalize_suffix("TAR.GZ") == ".tar.gz"
+    assert normalize_suffix(" .Pdf") == ".pdf"
+
+
+def test_first_category_wins():
+    table = CategoryTable({"A": [".txt"], "B": ["txt"]})
+    assert table.lookup("x.txt") == "A"
+    assert len(table) == 1
+
+
+def test_unknown_goes_to_default(table):
+    assert table.lookup("/tmp/a.xyz") == "其他文件"
+
+
+@pytest.mark.parametrize("head, suffix", [
+    (b"%PDF-1.7\n", ".pdf"),
+    (b"\x89PNG\r\n\x1a\n\0\0\0\rIHDR", ".png"),
+    (b"\xff\xd8\xff\xe0\0\x10JFIF", ".jpg"),
+    (b"\0\0\0\x18ftypmp42", ".mp4"),
+    (b"RIFF\0\0\0\0WEBPVP8 ", ".webp"),
+    (b"RIFF\0\0\0\0XXXX", None),       # 未知的 RIFF 格式
+    (b"hello world", None),
+    (b"", None),
+])
+def test_sniff_suffix(head, suffix):
+    assert sniff_suffix(head) == suffix
+
+
+def test_sniff_only_files_without_extension(tmp_path):
+    (tmp_path / "noext").write_bytes(b"%PDF-1.4 ...")
+    (tmp_path / "fake.txt").write_bytes(b"%PDF-1.4 ...")
+    (tmp_path / "blob").write_bytes(b"\x00\x01\x02")
+
+    sniffing = CategoryTable(CATEGORIES, sniff=True)
+    assert sniffing.lookup(tmp_path / "noext") == "文档"
+    assert sniffing.lookup(tmp_path / "fake.txt") == "其他文件"   # 有扩展名时不读文件
+    assert sniffing.lookup(tmp_path / "blob") == "其他文件"
+    assert CategoryTable(CATEGORIES).lookup(tmp_path / "noext") == "其他文件"
+
+
+def test_sniff_unreadable_file_falls_back(tmp_path):
+    assert CategoryTable(CATEGORIES, sniff=True).lookup(tmp_path / "missing") == "其他文件"
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+三阶段去重、删除重复后清理空目录
+"""
+import pytest
+
+from dedup_engine import DedupEngine
+from scanner import scan_tree
+from sweeper import DirTally
+
+
+def test_find_groups(make_files):
+    """大小相同但内容不同的文件不会被分到一组；组键带算法名"""
+    src = make_files({
+        "a.bin": b"same" * 100,
+        "x/b.bin": b"same" * 100,
+        "c.bin": b"diff" * 100,   # 同大小、不同内容
+        "d.bin": b"short",
+    })
+    groups = DedupEngine(algorithm="sha256").find_groups(scan_tree(src))
+
+    assert len(groups) == 1
+    key, records = next(iter(groups.items()))
+    assert key.startswith("sha256:")
+    assert sorted(r.name for r in records) == ["a.bin", "b.bin"]
+
+
+def _sweep(src, **kwargs):
+    counts = {}
+    list(scan_tree(src, dir_counts=counts))
+    return sorted(DirTally(counts).sweep(str(src), **kwargs))
+
+
+def test_sweep_removes_junk_only_dirs(make_files, caplog):
+    """计数为 0、只剩系统生成文件的目录会被删除（逐个记日志），父目录随之变空时一并删除"""
+    src = make_files({"a/b/.DS_Store": "", "a/.DS_Store": "", "keep/file.txt": "x"})
+
+    with caplog.at_level("INFO", logger="sweeper"):
+        removed = _sweep(src)
+
+    assert removed == sorted([str(src / "a" / "b"), str(src / "a")])
+    assert (src / "keep").is_dir()
+    assert sum("删除系统生成的文件" in r.getMessage() for r in caplog.records) == 2
+
+
+def test_sweep_keeps_dirs_with_other_hidden_files(make_files):
+    """.env、.gitignore 等不在白名单中的隐藏文件不删除，所在目录和父目录保留"""
+    src = make_files({"proj/.env": "SECRET=1", "proj/sub/.gitignore": "*", "junk/.DS_Store": ""})
+
+    removed = _sweep(src)
+
+    assert removed == [str(src / "junk")]
+    assert (src / "proj" / ".env").read_text() == "SECRET=1"
+    assert (src / "proj" / "sub" / ".gitignore").exists()
+
+
+def test_sweep_dry_run_checks_contents(make_files):
+    """试运行同样列目录：只报告真正能删除的目录，且不删除任何东西"""
+    src = make_files({"a/b/.DS_Store": "", "secret/.htpasswd": "x", "keep/file.txt": "x"})
+    (src / "empty").mkdir()
+
+    removed = _sweep(src, dry_run=True)
+
+    assert removed == sorted([str(src / "a"), str(src / "a" / "b"), str(src / "empty")])
+    assert (src / "a" / "b" / ".DS_Store").exists()
+    assert (src / "empty").is_dir()
+
+
+def test_dedup_delete_then_clean(make_files):
+    pytest.importorskip("tqdm")
+    import v007
+
+    src = make_files({"keep/deep/a.txt": "dup", "only/b.txt": "dup"})
+    organizer = v007.FileOrganizer(str(src))
+
+    organizer.dedup(mode="delete")
+    removed = organizer.clean_empty_folders()
+
+    # 保留路径层级最深的文件，另一个删除后其所在目录变空
+    assert (src / "keep" / "deep" / "a.txt").exists()
+    assert not (src / "only").exists()
+    assert removed == 1
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+移动日志：崩溃后继续、回滚
+"""
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import master
+from journal import JOURNAL_FILENAME, MoveJournal, pending_plan, read_journal, rollback
+from move_plan import MoveOp, MovePlanner
+from scanner import scan_tree
+
+MASTER = Path(__file__).resolve().parent.parent / "master.py"
+
+
+def _crash_halfway(src, target):
+    """写入计划并只执行前一半移动，且不写完成记录（模拟完成记录尚未 fsync 时崩溃）"""
+    planner = MovePlanner()
+    for record in sorted(scan_tree(src), key=lambda r: r.path):
+        planner.add(record, target / "docs", label="docs")
+    plan = planner.plan
+
+    journal = MoveJournal.create(target / JOURNAL_FILENAME, src, target)
+    journal.log_plan(plan)
+    os.makedirs(target / "docs")
+    half = plan.moves[:len(plan.moves) // 2]
+    for op in half:
+        os.rename(op.src, op.dst)
+    journal.close()
+    return plan
+
+
+def test_resume_after_crash(make_files, tmp_path):
+    src = make_files({f"f{i}.txt": str(i) for i in range(6)})
+    target = tmp_path / "out"
+    target.mkdir()
+    plan = _crash_halfway(src, target)
+
+    state = read_journal(target / JOURNAL_FILENAME)
+    assert not state.complete
+
+    organizer = master.FileOrganizer(str(src), str(target))
+    moved = organizer.resume()
+    organizer.close()
+
+    assert moved == 3
+    for op in plan.moves:
+        assert not os.path.exists(op.src)
+        assert Path(op.dst).read_text() == Path(op.dst).stem[1:]
+    assert read_journal(target / JOURNAL_FILENAME).complete
+
+
+def test_resume_keeps_unrelated_file_at_dst(make_files, tmp_path):
+    """已完成的同盘 rename 丢了完成记录、原位置又出现同名文件时，不删除目标"""
+    src = make_files({"a.txt": "moved", "b.txt": "other"})
+    target = tmp_path / "out"
+    target.mkdir()
+    plan = _crash_halfway(src, target)
+
+    done = plan.moves[0]
+    Path(done.src).write_text("new file by user")
+
+    state = read_journal(target / JOURNAL_FILENAME)
+    remaining, _ = pending_plan(state.segments[0])
+
+    assert Path(done.dst).read_text() == "moved"
+    assert [op.dst for op in remaining.moves] == [plan.moves[1].dst]
+
+
+def test_pending_plan_removes_partial_cross_device_copy(make_files, tmp_path):
+    """跨盘复制到一半（目标比源小）时删除目标并重做"""
+    src = make_files({"big.bin": b"x" * 1000})
+    target = tmp_path / "out"
+    target.mkdir()
+    plan = _crash_halfway(src, target)   # 一个文件，前一半为空：没有执行移动
+
+    op = plan.moves[0]
+    Path(op.dst).write_bytes(b"x" * 10)
+    # 源文件记录的设备号与目标目录不同，即跨盘操作
+    cross = MoveOp(op.record._replace(dev=op.record.dev + 1), op.dst, op.label)
+    state = read_journal(target / JOURNAL_FILENAME)
+    state.segments[0].ops[0] = cross
+
+    remaining, _ = pending_plan(state.segments[0])
+
+    assert not os.path.exists(op.dst)
+    assert len(remaining.moves) == 1
+
+
+def _organize(src, target):
+    organizer = master.FileOrganizer(str(src), str(target))
+    organizer.organize_by_category()
+    organizer.close()
+
+
+def test_rollback_function(make_files, tmp_path):
+    src = make_files({"a.pdf": "a", "sub/b.jpg": "b"})
+    target = tmp_path / "out"
+    _organize(src, target)
+    assert not (src / "a.pdf").exists()
+
+    restored = rollback(target / JOURNAL_FILENAME)
+
+    assert restored == 2
+    assert (src / "a.pdf").read_text() == "a"
+    assert (src / "sub" / "b.jpg").read_text() == "b"
+    assert not (target / "文档").exists()
+
+
+def test_rollback_cli_without_source(make_files, tmp_path):
+    src = make_files({"a.pdf": "a"})
+    target = tmp_path / "out"
+    _organize(src, target)
+
+    rc = subprocess.run([sys.executable, str(MASTER), "--rollback", str(target / JOURNAL_FILENAME)],
+                        capture_output=True, text=True)
+
+    assert rc.returncode == 0, rc.stderr
+    assert (src / "a.pdf").read_text() == "a"
+
+
+def test_rollback_cli_with_source(make_files, tmp_path):
+    src = make_files({"a.pdf": "a"})
+    target = tmp_path / "out"
+    _organize(src, target)
+
+    rc = subprocess.run([sys.executable, str(MASTER), str(src),
+                         "--rollback", str(target / JOURNAL_FILENAME)],
+                        capture_output=True, text=True)
+
+    assert rc.returncode == 0, rc.stderr
+    assert (src / "a.pdf").read_text() == "a"
+
+
+def test_cli_requires_source_without_rollback():
+    rc = subprocess.run([sys.executable, str(MASTER)], capture_output=True, text=True)
+    assert rc.returncode == 2
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+符号链接索引增量同步
+"""
+import os
+
+from link_index import sync_link_index
+
+
+def _links(links_dir):
+    return {name: os.readlink(links_dir / name) for name in sorted(os.listdir(links_dir))}
+
+
+def test_creates_links_with_collision_suffixes(make_files, tmp_path):
+    org = make_files({"文档/a.pdf": "1", "备份/a.pdf": "2", "图片/b.jpg": "3"}, root="org")
+    links_dir = tmp_path / "index"
+
+    stats = sync_link_index(org, links_dir)
+
+    assert stats.created == 3
+    assert sorted(_links(links_dir)) == ["a.pdf", "a_1.pdf", "b.jpg"]
+    assert all(os.path.exists(links_dir / name) for name in _links(links_dir))
+
+
+def test_second_sync_is_noop(make_files, tmp_path):
+    org = make_files({"a.txt": "1", "sub/b.txt": "2"}, root="org")
+    links_dir = tmp_path / "index"
+    sync_link_index(org, links_dir)
+
+    stats = sync_link_index(org, links_dir)
+
+    assert (stats.created, stats.pruned, stats.kept) == (0, 0, 2)
+
+
+def test_prunes_links_to_removed_files(make_files, tmp_path):
+    org = make_files({"a.txt": "1", "b.txt": "2"}, root="org")
+    links_dir = tmp_path / "index"
+    sync_link_index(org, links_dir)
+    (org / "a.txt").unlink()
+
+    stats = sync_link_index(org, links_dir)
+
+    assert (stats.pruned, stats.kept) == (1, 1)
+    assert sorted(_links(links_dir)) == ["b.txt"]
+
+
+def test_keeps_valid_links_to_hidden_files(make_files, tmp_path):
+    """扫描跳过隐藏文件，但旧版本为它们建过的有效链接不能当成失效链接删除"""
+    org = make_files({".env": "secret", "a.txt": "1"}, root="org")
+    links_dir = tmp_path / "index"
+    links_dir.mkdir()
+    os.symlink(org / ".env", links_dir / ".env")
+
+    stats = sync_link_index(org, links_dir)
+
+    assert stats.pruned == 0
+    assert sorted(_links(links_dir)) == [".env", "a.txt"]
+
+
+def test_organize_dir_through_symlink(make_files, tmp_path):
+    """整理目录经符号链接访问、或换一种写法时，已有链接照常复用"""
+    org = make_files({"a.txt": "1", "sub/b.txt": "2"}, root="org")
+    alias = tmp_path / "alias"
+    os.symlink(org, alias)
+    links_dir = tmp_path / "index"
+    sync_link_index(org, links_dir)
+
+    via_alias = sync_link_index(alias, links_dir)
+    spelled = sync_link_index(str(tmp_path / "x" / ".." / "org"), links_dir)
+
+    assert (via_alias.created, via_alias.pruned, via_alias.kept) == (0, 0, 2)
+    assert (spelled.created, spelled.pruned, spelled.kept) == (0, 0, 2)
+
+
+def test_relative_links_from_old_versions(make_files, tmp_path):
+    org = make_files({"a.txt": "1"}, root="org")
+    links_dir = tmp_path / "index"
+    links_dir.mkdir()
+    os.symlink(os.path.join("..", "org", "a.txt"), links_dir / "a.txt")
+
+    stats = sync_link_index(org, links_dir)
+
+    assert (stats.created, stats.kept) == (0, 1)
+
+
+def test_dry_run_changes_nothing(make_files, tmp_path):
+    org = make_files({"a.txt": "1"}, root="org")
+    links_dir = tmp_path / "index"
+
+    stats = sync_link_index(org, links_dir, dry_run=True)
+
+    assert stats.created == 1
+    assert not links_dir.exists()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+列式清单：Parquet / npz 写入后读回一致
+"""
+import pytest
+
+import manifest
+from manifest import COLUMNS, ScanManifest, load_manifest
+from scanner import FileRecord
+
+RECORDS = [
+    FileRecord("/src/报告.pdf", 1024, 1_600_000_000_000_000_000, 1, 1),
+    FileRecord("/src/a.jpg", 2 ** 40, 1_700_000_000_123_456_789, 2, 1),
+    FileRecord("/src/dup.jpg", 0, 1, 3, 1),
+]
+
+
+def _manifest():
+    m = ScanManifest(RECORDS)
+    m.set("/src/报告.pdf", category="文档", hash="md5:abc")
+    m.moved("/src/报告.pdf", "/out/文档/报告.pdf")
+    m.moved("/out/文档/报告.pdf", "/out/2024-01/报告.pdf")     # 多个模式依次移动，保留最终位置
+    m.set("/src/a.jpg", category="图片")
+    m.deleted("/src/dup.jpg")
+    m.set("/missing", category="x")                           # 不在清单中的路径忽略
+    return m
+
+
+def _expected():
+    return {
+        "path": [r.path for r in RECORDS],
+        "size": [r.size for r in RECORDS],
+        "mtime_ns": [r.mtime_ns for r in RECORDS],
+        "category": ["文档", "图片", ""],
+        "hash": ["md5:abc", "", ""],
+        "action": ["move", "", "delete"],
+        "target": ["/out/2024-01/报告.pdf", "", ""],
+    }
+
+
+def test_columns():
+    assert _manifest().columns() == _expected()
+
+
+def test_parquet_round_trip(tmp_path):
+    pytest.importorskip("pyarrow")
+    written = _manifest().write(tmp_path / "run.parquet")
+    assert written == str(tmp_path / "run.parquet")
+    assert load_manifest(written) == _expected()
+
+
+def test_npz_round_trip(tmp_path):
+    pytest.importorskip("numpy")
+    written = _manifest().write(tmp_path / "run.npz")
+    assert written == str(tmp_path / "run.npz")
+    assert load_manifest(written) == _expected()
+
+
+def test_falls_back_to_npz_without_pyarrow(tmp_path, monkeypatch):
+    pytest.importorskip("numpy")
+    monkeypatch.setattr(manifest, "pa", None)
+    written = _manifest().write(tmp_path / "run.parquet")
+    assert written == str(tmp_path / "run.npz")
+    assert load_manifest(written) == _expected()
+
+
+@pytest.mark.parametrize("name", ["empty.npz", "empty.parquet"])
+def test_empty_manifest(tmp_path, name):
+    pytest.importorskip("numpy" if name.endswith(".npz") else "pyarrow")
+    written = ScanManifest([]).write(tmp_path / name)
+    assert load_manifest(written) == {column: [] for column in COLUMNS}
+
+
+def test_no_backend(tmp_path, monkeypatch):
+    monkeypatch.setattr(manifest, "pa", None)
+    monkeypatch.setattr(manifest, "np", None)
+    with pytest.raises(RuntimeError):
+        _manifest().write(tmp_path / "run.parquet")
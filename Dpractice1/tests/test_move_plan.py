@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+MovePlanner 重名处理测试
+"""
+import os
+
+from move_plan import MovePlanner
+from scanner import scan_tree
+
+
+def test_collision_suffixes(make_files, tmp_path):
+    """目标目录已有同名文件、同一批内也重名时依次得到 _1、_2"""
+    src = make_files({"a/report.pdf": "1", "b/report.pdf": "2", "c/report.pdf": "3"})
+    target = tmp_path / "out"
+    target.mkdir()
+    (target / "report.pdf").write_text("existing")
+
+    planner = MovePlanner()
+    records = sorted(scan_tree(src), key=lambda r: r.path)
+    names = [os.path.basename(planner.add(r, target).dst) for r in records]
+
+    assert names == ["report_1.pdf", "report_2.pdf", "report_3.pdf"]
+    assert planner.plan.new_dirs == []
+
+
+def test_skips_taken_suffix(make_files, tmp_path):
+    """已被占用的 _1 不会被覆盖"""
+    src = make_files({"x/a.txt": "1"})
+    target = tmp_path / "out"
+    target.mkdir()
+    (target / "a.txt").write_text("old")
+    (target / "a_1.txt").write_text("old")
+
+    planner = MovePlanner()
+    op = planner.add(next(iter(scan_tree(src))), target)
+
+    assert os.path.basename(op.dst) == "a_2.txt"
+
+
+def test_new_dir_recorded_once(make_files, tmp_path):
+    """不存在的目标目录只记录一次"""
+    src = make_files({"a.txt": "1", "b.txt": "2"})
+    target = tmp_path / "out" / "文档"
+
+    planner = MovePlanner()
+    for record in scan_tree(src):
+        planner.add(record, target)
+
+    assert planner.plan.new_dirs == [str(target)]
+    assert len(planner.plan.moves) == 2
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+内容定义分块：边界稳定性、长度约束、相似文件配对
+"""
+import random
+
+import pytest
+
+from similarity import Chunker, SimilarityFinder, unpack_fingerprints
+from scanner import scan_tree
+
+# 小参数，测试数据只需几百 KB
+SMALL = dict(min_size=256, avg_size=1024, max_size=4096)
+
+
+def _data(n, seed=1):
+    return random.Random(seed).randbytes(n)
+
+
+def _chunks(tmp_path, data, name="f.bin", **kwargs):
+    path = tmp_path / name
+    path.write_bytes(data)
+    return unpack_fingerprints(Chunker(**{**SMALL, **kwargs}).fingerprints(path))
+
+
+def test_lengths_cover_file_and_respect_limits(tmp_path):
+    data = _data(200_000)
+    chunks = _chunks(tmp_path, data)
+    lengths = [length for _, length in chunks]
+
+    assert sum(lengths) == len(data)
+    assert all(SMALL["min_size"] < n <= SMALL["max_size"] for n in lengths[:-1])
+    # 平均块长度应在期望值附近（远离 min / max）
+    assert 600 < len(data) / len(chunks) < 2500
+
+
+def test_deterministic(tmp_path):
+    data = _data(50_000)
+    assert _chunks(tmp_path, data, "a") == _chunks(tmp_path, data, "b")
+
+
+def test_insertion_only_shifts_nearby_boundaries(tmp_path):
+    """开头插入数据后，插入点之后的块大部分保持不变"""
+    data = _data(200_000)
+    before = _chunks(tmp_path, data, "a")
+    after = _chunks(tmp_path, b"inserted!" * 37 + data, "b")
+
+    kept = set(before) & set(after)
+    assert len(kept) >= len(before) - 3
+
+
+def test_byte_change_in_middle_affects_few_chunks(tmp_path):
+    data = bytearray(_data(200_000))
+    before = _chunks(tmp_path, bytes(data), "a")
+    data[100_000] ^= 0xFF
+    after = _chunks(tmp_path, bytes(data), "b")
+
+    assert len(set(before) - set(after)) <= 2
+
+
+def test_boundaries_independent_of_read_buffer(tmp_path):
+    """文件大于读取缓冲区（max_size * 4）时，补读不影响切分结果：与整块内存中切分一致"""
+    data = _data(100_000)
+    assert len(data) > 4 * SMALL["max_size"]
+    chunker = Chunker(**SMALL)
+    view = memoryview(data)
+    expected, pos = [], 0
+    while pos < len(data):
+        length = chunker._boundary(view, pos, min(len(data), pos + chunker.max_size))
+        expected.append(length)
+        pos += length
+
+    assert [length for _, length in _chunks(tmp_path, data)] == expected
+
+
+def test_max_bytes_limits_input(tmp_path):
+    data = _data(100_000)
+    limited = _chunks(tmp_path, data, max_bytes=30_000)
+    assert sum(length for _, length in limited) == 30_000
+    assert "30000" in Chunker(**SMALL, max_bytes=30_000).params
+
+
+def test_empty_file(tmp_path):
+    assert _chunks(tmp_path, b"") == []
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_finder_pairs_similar_files(make_files, jobs):
+    base = _data(150_000)
+    src = make_files({
+        "a.bin": base,
+        "b.bin": base[:75_000] + _data(2_000, seed=7) + base[75_000:],   # 中间插入
+        "c.bin": _data(150_000, seed=3),                                  # 无关文件
+    })
+    finder = SimilarityFinder(threshold=0.5, min_file_size=1, chunker=Chunker(**SMALL), jobs=jobs)
+    pairs = finder.find_pairs(scan_tree(src))
+
+    assert [sorted((p.a.name, p.b.name)) for p in pairs] == [["a.bin", "b.bin"]]
+    assert pairs[0].similarity > 0.9
+    assert finder.chunked == 3
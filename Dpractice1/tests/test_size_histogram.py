@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+流式对数直方图与自适应分档
+"""
+import random
+
+import pytest
+
+from scanner import FileRecord
+from size_histogram import (BINS_PER_OCTAVE, SizeHistogram, bucket_labels, bucket_of,
+                            format_size)
+
+
+def _histogram(sizes):
+    h = SizeHistogram()
+    for size in sizes:
+        h.add(size)
+    return h
+
+
+def test_empty():
+    h = SizeHistogram()
+    assert h.quantile(0.5) == 0.0
+    assert h.edges(4) == []
+    assert bucket_labels(h.edges(4)) == ["全部"]
+    assert h.to_dict() == {"bins_per_octave": BINS_PER_OCTAVE, "files": 0, "bytes": 0, "bins": {}}
+
+
+@pytest.mark.parametrize("size", [0, 1, 1000, 1024, 10 ** 9])
+def test_single_size_gives_one_bucket(size):
+    h = _histogram([size] * 100)
+    edges = h.edges(4)
+    assert edges == []
+    assert {bucket_of(size, edges)} == {0}
+
+
+def test_quantile_relative_error():
+    sizes = [random.Random(i).randint(1, 10 ** 9) for i in range(2000)]
+    h = _histogram(sizes)
+    exact = sorted(sizes)[len(sizes) // 2]
+    # 桶宽为 2^(1/8)，分位点落在真实值所在桶的上界
+    assert exact <= h.quantile(0.5) <= exact * 2 ** (1 / BINS_PER_OCTAVE) * 1.001
+
+
+def test_edges_split_counts_evenly():
+    sizes = [random.Random(i).lognormvariate(12, 3) for i in range(4000)]
+    sizes = [int(s) + 1 for s in sizes]
+    edges = _histogram(sizes).edges(4)
+    counts = [0] * (len(edges) + 1)
+    for size in sizes:
+        counts[bucket_of(size, edges)] += 1
+
+    assert len(edges) == 3
+    assert all(800 <= c <= 1200 for c in counts)
+
+
+def test_huge_range():
+    """1 字节到 1PB：边界递增，目录名互不相同且单位正确"""
+    h = _histogram([2 ** k for k in range(51)])
+    edges = h.edges(8)
+    labels = bucket_labels(edges)
+
+    assert edges == sorted(set(edges))
+    assert len(labels) == len(set(labels)) == len(edges) + 1
+    assert labels[0].startswith("0-") and labels[-1].endswith("TB以上")
+    assert bucket_of(2 ** 50, edges) == len(edges)
+
+
+def test_boundary_goes_to_lower_bucket():
+    assert bucket_of(100, [100, 200]) == 0
+    assert bucket_of(101, [100, 200]) == 1
+
+
+def test_observe_passes_records_through():
+    records = [FileRecord("a", 10, 0, 1, 1), FileRecord("b", 20, 0, 2, 1)]
+    h = SizeHistogram()
+    assert list(h.observe(iter(records))) == records
+    assert (h.count, h.total, h.largest) == (2, 30, 20)
+
+
+@pytest.mark.parametrize("size, text", [
+    (0, "0B"), (999, "999B"), (1536, "1.5KB"), (10 * 1024, "10KB"),
+    (3 * 1024 ** 3, "3.0GB"), (2048 * 1024 ** 4, "2048TB"),
+])
+def test_format_size(size, text):
+    assert format_size(size) == text
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+增量快照：复用与重新扫描、复用记录在按日期/大小整理前重新 stat
+"""
+import datetime
+import os
+
+import master
+from snapshot import SNAPSHOT_FILENAME, DirSnapshot
+
+# 足够久以前的时间，目录 mtime 不会落入 RACY_SECONDS 窗口
+OLD = datetime.datetime(2020, 1, 15).timestamp()
+
+
+def _age(*paths, when=OLD):
+    for path in paths:
+        os.utime(path, (when, when))
+
+
+def _scan(root, previous):
+    snapshot = DirSnapshot(str(root))
+    records = sorted(r.name for r in snapshot.scan(previous))
+    return snapshot, records
+
+
+def test_first_scan_lists_every_dir(make_files):
+    src = make_files({"a.txt": "1", "sub/b.txt": "2", "sub/deep/c.txt": "3"})
+    snapshot, names = _scan(src, DirSnapshot(str(src)))
+    assert names == ["a.txt", "b.txt", "c.txt"]
+    assert (snapshot.reused, snapshot.rescanned) == (0, 3)
+
+
+def test_unchanged_dirs_are_reused(make_files, tmp_path):
+    src = make_files({"a.txt": "1", "sub/b.txt": "2"})
+    _age(src, src / "sub")
+    first, _ = _scan(src, DirSnapshot(str(src)))
+    first.save(tmp_path / SNAPSHOT_FILENAME)
+
+    previous = DirSnapshot.load(tmp_path / SNAPSHOT_FILENAME, src)
+    snapshot, names = _scan(src, previous)
+
+    assert names == ["a.txt", "b.txt"]
+    assert (snapshot.reused, snapshot.rescanned) == (2, 0)
+    assert snapshot.reused_dirs == {str(src), str(src / "sub")}
+
+
+def test_changed_dir_is_rescanned(make_files, tmp_path):
+    src = make_files({"a.txt": "1", "sub/b.txt": "2"})
+    _age(src, src / "sub")
+    first, _ = _scan(src, DirSnapshot(str(src)))
+
+    (src / "sub" / "new.txt").write_text("3")
+    _age(src / "sub", when=OLD + 60)
+    snapshot, names = _scan(src, first)
+
+    assert names == ["a.txt", "b.txt", "new.txt"]
+    assert snapshot.reused_dirs == {str(src)}
+    assert snapshot.rescanned == 1
+
+
+def test_recent_dir_mtime_is_not_trusted(make_files):
+    """目录 mtime 距扫描时刻太近时不记录，下次必须重新列出"""
+    src = make_files({"a.txt": "1"})
+    first, _ = _scan(src, DirSnapshot(str(src)))
+    snapshot, _ = _scan(src, first)
+    assert snapshot.reused == 0
+
+
+def test_snapshot_for_other_root_is_ignored(make_files, tmp_path):
+    src = make_files({"a.txt": "1"})
+    _scan(src, DirSnapshot(str(src)))[0].save(tmp_path / SNAPSHOT_FILENAME)
+    assert DirSnapshot.load(tmp_path / SNAPSHOT_FILENAME, tmp_path / "other").dirs == {}
+
+
+def _first_run(src, target):
+    organizer = master.FileOrganizer(str(src), str(target), incremental=True)
+    organizer._scan()
+    organizer.close()
+
+
+def test_incremental_date_mode_uses_fresh_mtime(make_files, tmp_path):
+    """原地改写不改变目录 mtime：复用的记录重新 stat 后按新的修改时间归档"""
+    src = make_files({"photos/a.jpg": "old"})
+    target = tmp_path / "out"
+    _age(src / "photos" / "a.jpg")
+    _age(src, src / "photos")
+    _first_run(src, target)
+
+    (src / "photos" / "a.jpg").write_text("rewritten in place")
+    _age(src / "photos" / "a.jpg", when=datetime.datetime(2021, 6, 1).timestamp())
+    _age(src, src / "photos")
+
+    organizer = master.FileOrganizer(str(src), str(target), incremental=True, journal=False)
+    organizer.organize_by_date(date_format="%Y-%m")
+    assert organizer._snapshot.reused == 2
+    organizer.close()
+
+    assert (target / "2021-06" / "a.jpg").read_text() == "rewritten in place"
+    assert not (target / "2020-01").exists()
+
+
+def test_incremental_size_mode_uses_fresh_size(make_files, tmp_path):
+    src = make_files({"a.bin": b"x"})
+    target = tmp_path / "out"
+    _age(src)
+    _first_run(src, target)
+
+    with open(src / "a.bin", "r+b") as f:
+        f.write(b"y" * (2 * 1024 * 1024))
+    _age(src)
+
+    organizer = master.FileOrganizer(str(src), str(target), incremental=True, journal=False)
+    organizer.organize_by_size(size_limits=[1, 100])
+    organizer.close()
+
+    assert (target / "中文件" / "a.bin").stat().st_size == 2 * 1024 * 1024
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+watch 模式：去抖合并、轮询监视
+"""
+import pytest
+
+import watcher
+from watcher import PollingWatcher, StabilityDebouncer
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(watcher.time, "monotonic", fake)
+    return fake
+
+
+def test_repeated_events_coalesce_into_one_record(tmp_path, clock):
+    path = tmp_path / "download.part"
+    path.write_text("a")
+    debouncer = StabilityDebouncer(settle=2.0)
+    for _ in range(5):
+        debouncer.touch(str(path))
+
+    assert len(debouncer) == 1
+    assert debouncer.pop_ready() == []      # 第一次只记下当前状态
+    clock.now += 2.0
+    ready = debouncer.pop_ready()
+
+    assert [r.path for r in ready] == [str(path)]
+    assert len(debouncer) == 0
+
+
+def test_growing_file_is_not_ready(tmp_path, clock):
+    path = tmp_path / "video.mp4"
+    path.write_text("a")
+    debouncer = StabilityDebouncer(settle=2.0)
+    debouncer.touch(str(path))
+    debouncer.pop_ready()
+
+    clock.now += 1.5
+    path.write_text("ab")                   # 还在写入：大小变化，重新计时
+    assert debouncer.pop_ready() == []
+    clock.now += 1.5
+    assert debouncer.pop_ready() == []
+    clock.now += 0.5
+    assert [r.size for r in debouncer.pop_ready()] == [2]
+
+
+def test_touch_restarts_settle_window(tmp_path, clock):
+    path = tmp_path / "a.txt"
+    path.write_text("a")
+    debouncer = StabilityDebouncer(settle=2.0)
+    debouncer.touch(str(path))
+    debouncer.pop_ready()
+    clock.now += 1.9
+    debouncer.touch(str(path))              # 新事件
+    debouncer.pop_ready()
+    clock.now += 1.9
+    assert debouncer.pop_ready() == []
+
+
+def test_vanished_file_is_dropped(tmp_path, clock):
+    path = tmp_path / "tmp.crdownload"
+    path.write_text("a")
+    debouncer = StabilityDebouncer(settle=0)
+    debouncer.touch(str(path))
+    path.unlink()
+
+    assert debouncer.pop_ready() == []
+    assert len(debouncer) == 0
+
+
+def test_polling_watcher_reports_new_files_only(make_files, monkeypatch):
+    src = make_files({"old.txt": "1"})
+    monkeypatch.setattr(watcher.time, "sleep", lambda s: None)
+    poller = PollingWatcher(src)
+
+    (src / "sub").mkdir()
+    (src / "sub" / "new.txt").write_text("2")
+    (src / "new.txt").write_text("3")
+
+    assert poller.poll(0) == {str(src / "new.txt"), str(src / "sub" / "new.txt")}
+    assert poller.poll(0) == set()
+
+
+def test_watch_loop_handles_each_file_once(make_files, monkeypatch):
+    src = make_files({"a.txt": "1"})
+    monkeypatch.setattr(watcher.time, "sleep", lambda s: None)
+    batches = []
+
+    def handle(batch):
+        batches.append([r.name for r in batch])
+        return [r.path for r in batch]
+
+    watcher.watch_loop(src, handle, settle=0, use_inotify=False, max_rounds=3)
+
+    assert batches == [["a.txt"]]
@@ -3,16 +3,24 @@
 自动整理文件脚本 - 整体完善
 """
 
-from typing import List
+from typing import Dict, List, Optional
 import datetime
-import shutil
-import hashlib
 from pathlib import Path
 import logging
-import os
 from tqdm import tqdm
 import argparse
 
+from categories import CategoryTable
+from dedup_engine import DedupEngine
+from hash_cache import CACHE_FILENAME, HashCache
+from hashing import available_algorithms, hash_file, register_hasher, resolve_algorithm
+from linker import LINK_MODES, link_duplicates
+from move_executor import MoveExecutor
+from move_plan import MovePlan, MovePlanner
+from scanner import FileRecord, scan_tree
+from similarity import SimilarityFinder
+from sweeper import DirTally
+
 # 设置日志
 logging.basicConfig(
     level = logging.INFO,
@@ -37,19 +45,30 @@ class FileOrganizer:
         '电子书': ['.epub', '.mobi', '.azw3']
     }
 
-    def __init__(self, source_dir: str, target_dir: str = None):
+    # 注册自定义哈希算法：FileOrganizer.register_hasher("name", factory)
+    register_hasher = staticmethod(register_hasher)
+
+    def __init__(self, source_dir: str, target_dir: str = None, jobs: int = 1,
+                 hash_algorithm: str = "sha256", move_workers: int = 4,
+                 max_inflight_mb: int = 1024, sniff_content: bool = False):
         """
         初始化整理器
             Args:
                 source_dir: 源目录路径
                 target_dir: 目标目录路径
+                jobs: 并行哈希的线程数
+                hash_algorithm: 去重使用的哈希算法（如 sha256 / blake2b-128 / xxh3 / fast）
+                move_workers: 跨盘复制的线程数
+                max_inflight_mb: 跨盘复制同时在途的数据量上限（MB）
+                sniff_content: 没有扩展名的文件读取文件头判断类型
         """
         # 将路径字符串转换为Path对象，并解析~和绝对路径,路径三件套
         self.source_dir = Path(source_dir).expanduser().resolve()
         self.target_dir = Path(target_dir).expanduser().resolve() if (
             target_dir) else self.source_dir
 
-        fh = logging.FileHandler(self.target_dir / "organizer.log", encoding="utf-8")
+        self.log_path = self.target_dir / "organizer.log"
+        fh = logging.FileHandler(self.log_path, encoding="utf-8")
         fh.setFormatter(logging.Formatter("%(asctime)s - %(levelname)s - %(message)s"))
         logger.addHandler(fh)
 
@@ -62,19 +81,68 @@ class FileOrganizer:
 
         # 实例属性：分类规则和重复文件记录
         self.categories = self.DEFAULT_CATEGORIES.copy()
+        # 预编译的 扩展名 -> 分类 查找表（修改 categories 后需重新编译）
+        self._category_table = CategoryTable(self.categories, sniff=sniff_content)
         self.duplicates= []
-
-    def _move_atom(self, src: Path, dst: Path) -> None:
-        """同盘用 rename，跨盘用 copy2+unlink，失败回滚"""
-        try:
-            if src.stat().st_dev == dst.stat().st_dev:  # 同盘设备号相同
-                src.rename(dst)
-            else:
-                shutil.copy2(src, dst)
-                src.unlink()
-        except Exception:
-            dst.unlink(missing_ok=True)
-            raise
+        self.jobs = jobs
+        self.hash_algorithm = resolve_algorithm(hash_algorithm)
+        self.move_workers = move_workers
+        self.max_inflight_mb = max_inflight_mb
+
+        # 单次扫描结果及其待更新的位置变化（见 _scan / _relocate）
+        self._records: Optional[List[FileRecord]] = None
+        self._relocated: Dict[str, Optional[FileRecord]] = {}
+        # 扫描时记录的各目录子项数，随移动增减，清理空目录时直接使用
+        self._tally: Optional[DirTally] = None
+
+        # 哈希缓存：与 organizer.log 同目录，首次用到时才打开
+        self._cache: Optional[HashCache] = None
+
+    def _get_cache(self) -> HashCache:
+        """懒加载持久化哈希缓存"""
+        if self._cache is None:
+            self._cache = HashCache(self.target_dir / CACHE_FILENAME)
+        return self._cache
+
+    def close(self) -> None:
+        """提交并关闭哈希缓存"""
+        if self._cache is not None:
+            self._cache.close()
+            self._cache = None
+
+    def _scan(self) -> List[FileRecord]:
+        """
+        单次遍历源目录，各整理模式共享同一份扫描结果
+        Returns:
+            文件记录列表；已移动或删除的文件在下次取用时更新，不再重新遍历
+        """
+        if self._records is None:
+            # 目标目录位于源目录内时整棵跳过（防止循环移动）
+            exclude = [self.target_dir] if self.target_dir != self.source_dir else []
+            # 自身的日志文件不参与整理
+            log_path = str(self.log_path)
+            counts: Dict[str, int] = {}
+            self._records = [record for record in scan_tree(self.source_dir, exclude=exclude,
+                                                            dir_counts=counts)
+                             if record.path != log_path]
+            self._tally = DirTally(counts)
+            logger.info(f"扫描完成，共找到{len(self._records)}个文件")
+        elif self._relocated:
+            self._records = [new for rec in self._records
+                             if (new := self._relocated.get(rec.path, rec)) is not None]
+            self._relocated.clear()
+        return self._records
+
+    def _relocate(self, record: FileRecord, new_path: Optional[Path]) -> None:
+        """记录文件的新位置；被删除或移出源目录的文件从扫描结果中剔除"""
+        if self._tally is not None:
+            self._tally.remove_entry(record.path)
+            if new_path is not None:
+                self._tally.add_entry(str(new_path))
+        if new_path is None or self.target_dir != self.source_dir:
+            self._relocated[record.path] = None
+        else:
+            self._relocated[record.path] = record._replace(path=str(new_path))
 
     def get_file_category(self, file_path: Path) -> str:
         """
@@ -84,15 +152,36 @@ class FileOrganizer:
         Returns:
             分类名称字符串
         """
-        # 获取小写扩展名（如.pdf）
-        suffix = file_path.suffix.lower()
+        # 查表：先匹配 .tar.gz 这类多段后缀，再匹配单个后缀
+        return self._category_table.lookup(file_path)
 
-        # 遍历分类字典，查找匹配的扩展名
-        for category_n, extensions in self.categories.items():
-            if suffix in extensions:
-                return category_n
+    def _apply_plan(self, plan: MovePlan, dry_run: bool) -> int:
+        """
+        执行移动计划并更新扫描结果
+        Args:
+            plan: 规划阶段生成的移动计划
+            dry_run: 为True时只打印计划
+        Returns:
+            实际移动的文件数
+        """
+        # ---------- 日志：无论 dry_run 都打印 ----------
+        for op in plan.moves:
+            logger.info(f"{'[试运行] ' if dry_run else ''}将移动: {op.src} -> {op.dst}")
+
+        if dry_run:  # 只打印不干活
+            return 0
 
-        return '其他文件'
+        # ---------- 真正移动：同盘 rename，跨盘交给线程池复制 ----------
+        executor = MoveExecutor(workers=self.move_workers,
+                                max_inflight_bytes=self.max_inflight_mb * 1024 * 1024)
+        moved_count = 0
+        for op, error in tqdm(executor.run(plan), total=len(plan.moves), desc="整理中"):
+            if error is not None:
+                logger.error(f"移动失败 {op.src}: {error}")
+                continue
+            self._relocate(op.record, Path(op.dst))
+            moved_count += 1
+        return moved_count
 
     def organize_by_category(self, dry_run: bool = False):
         """
@@ -101,45 +190,24 @@ class FileOrganizer:
             dry_run: 为True时只记录日志，不实际移动文件
         """
         logger.info(f"{'[试运行]' if dry_run else ''}开始按类型整理:{self.source_dir}")
-        moved_count = 0
 
-        # 遍历所有文件
-        for item in tqdm(list(self.source_dir.rglob('*')), desc="整理中"):
-            # 只处理普通文件，并跳过隐藏文件
-            if not (item.is_file() or not item.name.startswith('.')):
-                continue
-
-            # 跳过目标目录中的文件（防止循环移动）
-            if self.target_dir in item.parents:
-                logger.info(f"跳过目标目录中的文件：{item}")
-                continue
+        # ---------- 规划：目标目录只列一次，重名自动加序号在内存中完成 ----------
+        planner = MovePlanner()
+        # 遍历扫描结果（只含普通文件，隐藏文件和目标目录已在扫描时跳过）
+        for record in self._scan():
+            item = Path(record.path)
 
             # 获取分类并构建目标路径
             category_n = self.get_file_category(item)
             target_folder = self.target_dir / category_n
 
-            # ---------- 统一先算目标路径 ----------
-            target_path = target_folder / item.name
-            counter = 1
-
-            while target_path.exists():  # 重名自动加序号
-                stem, suffix = item.stem, item.suffix
-                target_path = target_folder / f"{stem}_{counter}{suffix}"
-                counter += 1
-
-            # ---------- 日志：无论 dry_run 都打印 ----------
-            logger.info(f"{'[试运行] ' if dry_run else ''}将移动: {item} -> {target_path}")
-
-            if dry_run:  # 只打印不干活
+            # 已在目标文件夹中的文件无需移动
+            if item.parent == target_folder:
                 continue
 
-            # ---------- 真正移动 ----------
-            target_folder.mkdir(parents=True, exist_ok=True)
-            try:
-                self._move_atom(item, target_path)
-                moved_count += 1
-            except Exception as e:
-                    logger.error(f"移动失败 {item}: {e}")
+            planner.add(record, target_folder, label=category_n)
+
+        moved_count = self._apply_plan(planner.plan, dry_run)
 
         logger.info(f"整理完成！共移动 {moved_count} 个文件")
         return moved_count
@@ -155,17 +223,11 @@ class FileOrganizer:
             dry_run: 试运行模式
         """
         logger.info(f"{'[试运行]' if dry_run else ''}开始按日期整理:{self.source_dir}")
-        moved_count = 0
-
-        for item in tqdm(list(self.source_dir.rglob('*')), desc="整理中"):
-            if not (item.is_file() and not item.name.startswith('.')):
-                continue
-
-            if self.target_dir in item.parents:
-                continue
 
-            # 获取文件修改时间
-            m_time = item.stat().st_mtime # 返回时间戳（秒）
+        planner = MovePlanner()
+        for record in self._scan():
+            # 获取文件修改时间（来自扫描时的 stat，不再重复调用）
+            m_time = record.mtime # 返回时间戳（秒）
 
             # 将时间戳转换为datatime对象
             date_obj = datetime.datetime.fromtimestamp(m_time)
@@ -173,30 +235,14 @@ class FileOrganizer:
             # 格式化为字符串（如"2024-01"）
             date_str = date_obj.strftime(date_format)
 
-            # 创建日期文件夹
+            # 日期文件夹
             target_folder = self.target_dir / date_str
+            if Path(record.path).parent == target_folder:
+                continue
 
-            # ---------- 统一先算目标路径 ----------
-            target_path = target_folder / item.name
-            counter = 1
-
-            while target_path.exists():
-                stem, suffix = item.stem, item.suffix
-                target_path = target_folder / f"{stem}_{counter}{suffix}"
-                counter += 1
-
-            # ---------- 日志：无论 dry_run 都打印 ----------
-            logger.info(f"{'[试运行] ' if dry_run else ''}将移动: {item} -> {target_path}")
-
-            if dry_run: continue
-
-            target_folder.mkdir(parents=True, exist_ok=True)
+            planner.add(record, target_folder, label=date_str)
 
-            try:
-                self._move_atom(item, target_path)
-                moved_count += 1
-            except Exception as e:
-                logger.error(f"移动失败 {item}: {e}")
+        moved_count = self._apply_plan(planner.plan, dry_run)
 
         logger.info(f"按日期整理完成！共移动 {moved_count} 个文件")
         return moved_count
@@ -221,17 +267,11 @@ class FileOrganizer:
 
         # 定义大小分类
         size_categories = ['小文件', '中文件', '大文件']
-        moved_count = 0
-
-        for item in tqdm(list(self.source_dir.rglob('*')), desc="整理中"):
-            if not (item.is_file() or not item.name.startswith('.')):
-                continue
-
-            if self.target_dir in item.parents:
-                continue
 
+        planner = MovePlanner()
+        for record in self._scan():
             # 获取文件大小
-            size_mb = item.stat().st_size / (1024*1024)
+            size_mb = record.size / (1024*1024)
 
             # 根据阈值确定分类
             if size_mb <= size_limits[0]:
@@ -241,29 +281,14 @@ class FileOrganizer:
             else:
                 category = size_categories[2]
 
-            # 创建目标文件夹
+            # 目标文件夹
             target_folder = self.target_dir / category
+            if Path(record.path).parent == target_folder:
+                continue
 
-            # ---------- 统一先算目标路径 ----------
-            target_path = target_folder / item.name
-            counter = 1
-
-            while target_path.exists():
-                stem, suffix = item.stem, item.suffix
-                target_path = target_folder / f"{stem}_{counter}{suffix}"
-                counter += 1
-
-            # ---------- 日志：无论 dry_run 都打印 ----------
-            logger.info(f"{'[试运行] ' if dry_run else ''}将移动: {item} -> {target_path}")
-
-            if dry_run: continue
+            planner.add(record, target_folder, label=category)
 
-            target_folder.mkdir(parents = True, exist_ok = True)
-            try:
-                self._move_atom(item, target_path)
-                moved_count += 1
-            except Exception as e:
-                logger.error(f"移动失败 {item}: {e}")
+        moved_count = self._apply_plan(planner.plan, dry_run)
         logger.info(f"按文件大小整理完成！共移动 {moved_count} 个文件")
         return moved_count
 
@@ -273,134 +298,121 @@ class FileOrganizer:
         Returns:
             文件路径对象列表
         """
-        file_list = []
-
-        # 使用rglob递归遍历所有文件和目录
-        for item in self.source_dir.rglob('*'):
-        # 检查是否是文件且不以下划线开头
-            if item.is_file() and not item.name.startswith('.'):
-                file_list.append(item)
+        # 复用单次扫描结果（已跳过隐藏文件）
+        return [Path(record.path) for record in self._scan()]
 
-        logger.info(f"扫描完成，共找到{len(file_list)}个文件")
-        return file_list
-
-    def get_file_hash(self, file_path: Path, algorithm="sha256") -> str:
+    def get_file_hash(self, file_path: Path, algorithm: str = None) -> str:
         """
         计算文件哈希
         :param file_path: 文件路径
-        :param algorithm: 算法名  sha256 / md5 / blake2b ...
+        :param algorithm: 算法名  sha256 / md5 / blake2b-128 / xxh3 ...，默认用 self.hash_algorithm
         :return: 十六进制哈希串；失败返回 None（与空串区分）
         """
+        algorithm = resolve_algorithm(algorithm or self.hash_algorithm)
         try:
-            h = hashlib.new(algorithm)
-            with file_path.open("rb") as f:
-                for chunk in iter(lambda: f.read(1 << 16), b""):  # 64 KB 块
-                    h.update(chunk)
-            return h.hexdigest()
+            # 文件未变化（设备号、inode、大小、mtime_ns 均相同）时直接用缓存
+            st = file_path.stat()
+            record = FileRecord(str(file_path), st.st_size, st.st_mtime_ns, st.st_ino, st.st_dev)
+            cache = self._get_cache()
+            cached = cache.get(record, algorithm)
+            if cached:
+                return cached
+
+            digest, _ = hash_file(file_path, algorithm)  # 1 MB 复用缓冲区
+            cache.put(record, algorithm, digest)
+            return digest
         except Exception as e:
             logger.error(f"计算哈希失败 {file_path}: {e}")
             return None
 
+    def _duplicate_groups(self) -> Dict[str, List[FileRecord]]:
+        """分级筛选：大小 -> 首尾部分哈希 -> 全量哈希，大小唯一的文件不读取"""
+        engine = DedupEngine(algorithm=self.hash_algorithm, cache=self._get_cache(), jobs=self.jobs)
+        return engine.find_groups(self._scan())
+
     def find_duplicates(self) -> dict[str, list[Path]]:
         """
         查找所有重复文件
         Returns:
-            字典: {哈希值: [文件路径列表]}
+            字典: {"算法:哈希值": [文件路径列表]}
         """
-        hash_dict = {}
-        duplicates = {}
-
-        #扫描所有文件
-        for file_path in self.source_dir.rglob('*'):
-            if file_path.is_file() and not file_path.name.startswith('.'):
-                # 计算哈希
-                file_hash = self.get_file_hash(file_path)
-
-                if not file_hash:
-                    continue
-
-                # 如果哈希已存在，说明是重复文件
-                if file_hash in hash_dict:
-                    if file_hash not in duplicates:
-                        duplicates[file_hash] = [hash_dict[file_hash]]
-                        duplicates[file_hash].append(file_path)
-                else:
-                    # 记录首次出现文件
-                    hash_dict[file_hash] = file_path
+        duplicates = {
+            file_hash: [Path(record.path) for record in records]
+            for file_hash, records in self._duplicate_groups().items()
+        }
 
         logger.info(f"扫描完成，发现{len(duplicates)}组重复文件")
         return duplicates
 
-    def clean_empty_folders(self, dry_run: bool = False) -> List[Path]:
-        """自底向上删空目录（含仅藏隐藏文件）"""
-        emptied: List[Path] = []
-        for root, dirs, _ in os.walk(self.source_dir, topdown=False):
-            for dn in dirs:
-                dp = Path(root) / dn
-                if not dp.is_dir():
-                    continue
-                # 仅含隐藏文件也视为空
-                if all(p.name.startswith('.') for p in dp.iterdir()):
-                    if not dry_run:
-                        try:
-                            for p in dp.iterdir():  # 先删隐藏文件
-                                p.unlink()
-                            dp.rmdir()
-                            emptied.append(dp)
-                            logger.info(f"删除空目录：{dp}")
-                        except Exception as e:
-                            logger.debug(f"跳过 {dp}：{e}")
-                    else:
-                        logger.info(f"[试运行] 将删空目录：{dp}")
-                        emptied.append(dp)
-        return emptied
+    def find_similar(self, threshold: float = 0.5, min_size_mb: float = 8) -> list:
+        """
+        查找内容大部分相同的大文件（重新封装的视频、追加写入的日志等）
+        Args:
+            threshold: 相似度阈值，共享字节数 / 较小文件的大小
+            min_size_mb: 只比较不小于该大小的文件
+        Returns:
+            SimilarPair 列表，按共享字节数从大到小排序
+        """
+        finder = SimilarityFinder(threshold=threshold, min_file_size=int(min_size_mb * 1024 * 1024),
+                                  cache=self._get_cache(), jobs=self.jobs)
+        pairs = finder.find_pairs(self._scan())
+        for pair in pairs:
+            logger.info(f"相似 {pair.similarity:.0%}（共享 {pair.shared_bytes / 1024 / 1024:.1f}MB）："
+                        f"{pair.a.path} <-> {pair.b.path}")
+        logger.info(f"相似检测完成：分块 {finder.chunked} 个文件（累计耗时 {finder.seconds:.2f}s），"
+                    f"发现 {len(pairs)} 对相似文件，"
+                    f"共享内容合计 {sum(p.shared_bytes for p in pairs) / 1024 / 1024:.1f}MB")
+        return pairs
 
     def dedup(self, mode: str = "link", dry_run: bool = False) -> int:
         """
-        mode: "link" 创建硬链接； "delete" 删除后者； "keep-longest" 保留路径最长的文件
+        mode: "link" 替换为硬链接；"reflink" 共享数据块（需文件系统支持）；"delete" 删除
+        每组保留路径层级最深的文件；链接先建在临时名上再 os.replace，各组并行处理
         返回实际处理组数
         """
-        groups = self.find_duplicates()
-        done = 0
-        for hash_v, files in groups.items():
-            keeper, *rest = sorted(files, key=lambda p: (-len(p.parts), p))
-            for victim in rest:
-                if not dry_run:
-                    try:
-                        if mode == "link":
-                            victim.unlink()
-                            victim.hardlink_to(keeper)  # py3.10+
-                        elif mode == "delete":
-                            victim.unlink()
-                        logger.info(f"[{mode}] {victim} -> {keeper}")
-                    except Exception as e:
-                        logger.error(f"处理失败 {victim}: {e}")
-                else:
-                    logger.info(f"[试运行] {mode} {victim} -> {keeper}")
-            done += 1
-        return done
-
-    def clean_empty_folders(self, dry_run: bool = False):
-        """清理空文件夹"""
+        groups = self._duplicate_groups()
+        logger.info(f"扫描完成，发现{len(groups)}组重复文件")
+
+        tasks = []
+        for records in groups.values():
+            keeper, *rest = sorted(records, key=lambda r: (-len(Path(r.path).parts), r.path))
+            tasks.append((keeper, rest))
+
+        report = link_duplicates(tasks, mode=mode, jobs=self.jobs, dry_run=dry_run)
+        # 被删除的文件从扫描结果和目录计数中剔除，之后清理空目录才能看到变空的目录
+        for victim in report.removed:
+            self._relocate(victim, None)
+        logger.info(
+            f"{'[试运行] ' if dry_run else ''}去重完成（{mode}）：{report.groups} 组，"
+            f"处理 {report.processed} 个文件，失败 {report.failed} 个，"
+            f"已是同一文件 {report.skipped} 个，"
+            f"{'可' if dry_run else '已'}释放 {report.bytes_reclaimed / 1024 / 1024:.1f}MB，"
+            f"耗时 {report.seconds:.2f}s"
+        )
+        return report.groups
+
+    def clean_empty_folders(self, dry_run: bool = False) -> int:
+        """
+        自底向上删除空目录（只含隐藏文件的也算空）
+        使用扫描时记录的各目录子项数（随整理过程中的移动增减），不再重新遍历和列目录；
+        同一层的目录并行删除
+        Returns:
+            删除的目录数
+        """
         logger.info("开始清理空文件夹...")
 
-        deleted_count = 0
-        for root, dirs, files in os.walk(self.source_dir, topdown=False):
-            for dir_name in dirs:
-                dir_path = Path(root) / dir_name
-                try:
-                    if not any(dir_path.iterdir()):  # 文件夹为空
-                        if not dry_run:
-                            dir_path.rmdir()
-                            logger.info(f"删除空文件夹: {dir_path}")
-                        else:
-                            logger.info(f"[试运行] 将删除空文件夹: {dir_path}")
-                        deleted_count += 1
-                except Exception as e:
-                    logger.error(f"删除文件夹失败 {dir_path}: {e}")
-
-        logger.info(f"清理完成！共删除 {deleted_count} 个空文件夹")
-        return deleted_count
+        if self._tally is None:
+            self._scan()
+
+        removed = self._tally.sweep(str(self.source_dir), dry_run=dry_run, jobs=self.jobs)
+        for directory in removed:
+            if dry_run:
+                logger.info(f"[试运行] 将删除空文件夹: {directory}")
+            else:
+                logger.info(f"删除空文件夹: {directory}")
+
+        logger.info(f"清理完成！共删除 {len(removed)} 个空文件夹")
+        return len(removed)
 
 
 if __name__ == "__main__":
@@ -413,14 +425,32 @@ if __name__ == "__main__":
                     default="type", help="整理方式")
     parser.add_argument("-f", "--date-format", default="%Y-%m-%d",
                     help="日期整理时的格式，默认 %%Y-%%m-%%d")
-    parser.add_argument("--dedup", choices=["link", "delete"],
-                        help="对重复文件建硬链或删除")
+    parser.add_argument("--sniff", action="store_true",
+                        help="没有扩展名的文件读取文件头判断类型")
+    parser.add_argument("--dedup", choices=LINK_MODES,
+                        help="对重复文件建硬链、reflink（共享数据块）或删除")
+    parser.add_argument("--similar", action="store_true",
+                        help="报告内容大部分相同的大文件（内容定义分块，每个文件只比较前 256MB）")
+    parser.add_argument("--similar-threshold", type=float, default=0.5,
+                        help="相似度阈值，共享内容占较小文件的比例（默认 0.5）")
+    parser.add_argument("--similar-min-mb", type=float, default=8,
+                        help="只比较不小于该大小的文件 MB（默认 8）")
     parser.add_argument("--clean-empty", action="store_true",
                         help="整理后删除空文件夹")
+    parser.add_argument("-j", "--jobs", type=int, default=1,
+                        help="并行哈希的线程数（默认 1）")
+    parser.add_argument("--move-workers", type=int, default=4,
+                        help="跨盘复制的线程数（默认 4）")
+    parser.add_argument("--inflight-mb", type=int, default=1024,
+                        help="跨盘复制同时在途的数据量上限 MB（默认 1024）")
+    parser.add_argument("--hash", default="sha256", choices=available_algorithms(),
+                        metavar="ALGO", help="去重哈希算法，fast = xxh3（未安装时 blake2b-128）")
     parser.add_argument("-v", "--verbose", action="store_true",
                         help="更详细的 DEBUG 日志")
     args = parser.parse_args()
-    org = FileOrganizer(args.src, args.dst)
+    org = FileOrganizer(args.src, args.dst, jobs = args.jobs, hash_algorithm = args.hash,
+                        move_workers = args.move_workers, max_inflight_mb = args.inflight_mb,
+                        sniff_content = args.sniff)
 
     if args.mode in {"type", "all"}:
         org.organize_by_category(dry_run = args.dry_run)
@@ -428,7 +458,10 @@ if __name__ == "__main__":
         org.organize_by_date(date_format = args.date_format, dry_run = args.dry_run)
     if args.mode in {"size", "all"}:
         org.organize_by_size(dry_run = args.dry_run)
+    if args.similar:
+        org.find_similar(threshold = args.similar_threshold, min_size_mb = args.similar_min_mb)
     if args.dedup:
         org.dedup(mode=args.dedup, dry_run = args.dry_run)
     if args.clean_empty:
-        org.clean_empty_folders(dry_run = args.dry_run)
\ No newline at end of file
+        org.clean_empty_folders(dry_run = args.dry_run)
+    org.close()
\ No newline at end of file
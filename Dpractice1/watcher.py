@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+目录监视（watch 模式）
+- Linux 下通过 ctypes 调用 inotify，递归监视源目录，只拿到有变化的路径
+- 其他平台或 inotify 不可用时退回轮询：用目录快照增量扫描，只重新列出 mtime 变化的目录
+- 去抖：文件大小和修改时间在 settle 秒内保持不变，才认为已经写完
+"""
+
+import ctypes
+import ctypes.util
+import errno
+import logging
+import os
+import select
+import struct
+import sys
+import time
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from scanner import FileRecord, scan_tree
+from snapshot import DirSnapshot
+
+logger = logging.getLogger(__name__)
+
+# inotify 事件掩码（见 <sys/inotify.h>）
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE_SELF
+
+_EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, len
+
+
+class InotifyWatcher:
+    """基于 inotify 的递归目录监视"""
+
+    def __init__(self, root, exclude: Iterable = ()):
+        """
+        Args:
+            root: 要监视的根目录
+            exclude: 不监视的子目录（如位于源目录内的目标目录）
+        Raises:
+            OSError: 当前平台不支持 inotify
+        """
+        if not sys.platform.startswith("linux"):
+            raise OSError(errno.ENOSYS, "inotify 仅在 Linux 上可用")
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or None, use_errno=True)
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+
+        self.root = os.fspath(root)
+        self._excluded = {os.fspath(p) for p in exclude}
+        self._wd_to_dir: Dict[int, str] = {}
+        self._add_tree(self.root)
+
+    def _add_watch(self, directory: str) -> None:
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), WATCH_MASK)
+        if wd < 0:
+            err = ctypes.get_errno()
+            logger.warning(f"无法监视目录 {directory}: {os.strerror(err)}")
+            return
+        self._wd_to_dir[wd] = directory
+
+    def _add_tree(self, top: str) -> None:
+        """为 top 及其所有子目录添加监视"""
+        self._add_watch(top)
+        for dirpath, dirnames, _ in os.walk(top):
+            dirnames[:] = [d for d in dirnames if os.path.join(dirpath, d) not in self._excluded]
+            for d in dirnames:
+                self._add_watch(os.path.join(dirpath, d))
+
+    def poll(self, timeout: float) -> Set[str]:
+        """
+        等待事件
+        Args:
+            timeout: 最长等待秒数
+        Returns:
+            有变化的文件路径集合（新建目录中已有的文件也会一并返回）
+        """
+        changed: Set[str] = set()
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return changed
+
+        while True:
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                wd, mask, _cookie, length = _EVENT_HEADER.unpack_from(data, offset)
+                offset += _EVENT_HEADER.size
+                name = data[offset:offset + length].rstrip(b"\0")
+                offset += length
+
+                if mask & IN_Q_OVERFLOW:
+                    # 事件队列溢出：丢失了事件，退回一次完整扫描
+                    logger.warning("inotify 事件队列溢出，重新扫描整个目录")
+                    changed.update(record.path for record in scan_tree(self.root, self._excluded))
+                    continue
+                if mask & IN_IGNORED:
+                    self._wd_to_dir.pop(wd, None)
+                    continue
+                directory = self._wd_to_dir.get(wd)
+                if directory is None or not name:
+                    continue
+
+                path = os.path.join(directory, os.fsdecode(name))
+                if mask & IN_ISDIR:
+                    if mask & (IN_CREATE | IN_MOVED_TO) and path not in self._excluded:
+                        # 新目录：加监视，并补上添加监视之前已经出现的文件
+                        self._add_tree(path)
+                        changed.update(record.path for record in scan_tree(path, self._excluded))
+                else:
+                    changed.add(path)
+        return changed
+
+    def close(self) -> None:
+        os.close(self._fd)
+
+
+class PollingWatcher:
+    """轮询监视：用目录快照增量扫描，只重新列出 mtime 变化的目录"""
+
+    def __init__(self, root, exclude: Iterable = ()):
+        self.root = os.fspath(root)
+        self._exclude = [os.fspath(p) for p in exclude]
+        self._snapshot = DirSnapshot(self.root)
+        self._known: Dict[str, Tuple[int, int]] = {}
+        for record in self._snapshot.scan(DirSnapshot(self.root), self._exclude):
+            self._known[record.path] = (record.size, record.mtime_ns)
+
+    def poll(self, timeout: float) -> Set[str]:
+        """等待 timeout 秒后扫描一次，返回新出现的文件路径"""
+        time.sleep(timeout)
+        previous, self._snapshot = self._snapshot, DirSnapshot(self.root)
+        known: Dict[str, Tuple[int, int]] = {}
+        changed: Set[str] = set()
+        for record in self._snapshot.scan(previous, self._exclude):
+            known[record.path] = (record.size, record.mtime_ns)
+            if record.path not in self._known:
+                changed.add(record.path)
+        self._known = known
+        return changed
+
+    def close(self) -> None:
+        pass
+
+
+def create_watcher(root, exclude: Iterable = (), use_inotify: bool = True):
+    """优先使用 inotify，不可用时退回轮询"""
+    if use_inotify:
+        try:
+            return InotifyWatcher(root, exclude)
+        except (OSError, AttributeError) as e:
+            logger.info(f"inotify 不可用（{e}），改用轮询")
+    return PollingWatcher(root, exclude)
+
+
+class StabilityDebouncer:
+    """文件大小和修改时间保持 settle 秒不变才视为写完，避免整理下载到一半的文件"""
+
+    def __init__(self, settle: float = 2.0):
+        self.settle = settle
+        # 路径 -> ((大小, mtime_ns), 该状态首次被观察到的时刻)
+        self._pending: Dict[str, Tuple[Tuple[int, int], float]] = {}
+
+    def touch(self, path: str) -> None:
+        """记录一个有变化的文件（重新开始计时）"""
+        self._pending[path] = ((-1, -1), time.monotonic())
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def pop_ready(self) -> List[FileRecord]:
+        """取出已经稳定的文件；已消失的文件直接丢弃"""
+        now = time.monotonic()
+        ready: List[FileRecord] = []
+        for path, (seen, since) in list(self._pending.items()):
+            try:
+                st = os.stat(path, follow_symlinks=False)
+            except OSError:
+                del self._pending[path]
+                continue
+            current = (st.st_size, st.st_mtime_ns)
+            if current != seen:
+                self._pending[path] = (current, now)
+            elif now - since >= self.settle:
+                del self._pending[path]
+                ready.append(FileRecord(path, st.st_size, st.st_mtime_ns, st.st_ino, st.st_dev))
+        return ready
+
+
+def watch_loop(root, handle_batch, exclude: Iterable = (), settle: float = 2.0,
+               interval: float = 1.0, use_inotify: bool = True, max_batch: int = 1000,
+               max_rounds: Optional[int] = None) -> None:
+    """
+    监视主循环
+    Args:
+        root: 源目录
+        handle_batch: 回调，参数为一批已稳定的文件记录，返回整理后文件的新路径
+        exclude: 不监视的子目录
+        settle: 文件保持不变多少秒才处理
+        interval: 每轮等待事件的最长秒数
+        use_inotify: 是否尝试 inotify
+        max_batch: 每批最多处理的文件数
+        max_rounds: 最多运行的轮数（None 表示一直运行，直到 Ctrl+C）
+    """
+    watcher = create_watcher(root, exclude, use_inotify)
+    debouncer = StabilityDebouncer(settle)
+    # 自己移动产生的事件在一段时间内忽略，避免文件被反复整理
+    own_moves: Dict[str, float] = {}
+
+    # 启动时已经存在的文件也要整理
+    for record in scan_tree(root, exclude):
+        debouncer.touch(record.path)
+
+    logger.info(f"开始监视 {root}（{type(watcher).__name__}），按 Ctrl+C 退出")
+    rounds = 0
+    try:
+        while max_rounds is None or rounds < max_rounds:
+            rounds += 1
+            now = time.monotonic()
+            for path in watcher.poll(interval):
+                if own_moves.get(path, 0) > now:
+                    continue
+                if os.path.basename(path).startswith('.'):
+                    continue
+                debouncer.touch(path)
+            own_moves = {p: t for p, t in own_moves.items() if t > now}
+
+            ready = debouncer.pop_ready()
+            for start in range(0, len(ready), max_batch):
+                batch = ready[start:start + max_batch]
+                expire = time.monotonic() + settle + 2 * interval
+                for new_path in handle_batch(batch):
+                    own_moves[new_path] = expire
+    except KeyboardInterrupt:
+        logger.info("已停止监视")
+    finally:
+        watcher.close()